@@ -9,14 +9,12 @@ import pandas as pd
 import numpy as np
 from datetime import datetime
 from collections import Counter
-from sentence_transformers import SentenceTransformer
-import hdbscan
-import joblib
-from sklearn.cluster import KMeans
-from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
 from rapidfuzz import fuzz
 from typing import List, Dict, Optional, Tuple
 
+# sentence_transformers, hdbscan, sklearn, joblib and vaderSentiment are imported
+# on first use - they dominate import time and most callers never need them
+
 # Lazy loading for classifier and vectorizer (only when needed)
 _classifier = None
 _vectorizer = None
@@ -27,6 +25,7 @@ def get_classifier():
     global _classifier, _vectorizer, FILTERING_ENABLED
     if _classifier is None:
         try:
+            import joblib
             _classifier = joblib.load('AutoClassifier.pkl')
             try:
                 _vectorizer = joblib.load("AutoVectorizer.pkl")
@@ -42,11 +41,18 @@ _EMBEDDER = None
 def get_embedder(name: str = 'all-MiniLM-L6-v2'):
     global _EMBEDDER
     if _EMBEDDER is None:
+        from sentence_transformers import SentenceTransformer
         _EMBEDDER = SentenceTransformer(name)
     return _EMBEDDER
 
 # Initialize sentiment analyzer
-analyzer = SentimentIntensityAnalyzer()
+_ANALYZER = None
+def get_sentiment_analyzer():
+    global _ANALYZER
+    if _ANALYZER is None:
+        from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+        _ANALYZER = SentimentIntensityAnalyzer()
+    return _ANALYZER
 
 # Constants
 MAX_TXTS_PER_CLUSTER = 50
@@ -91,7 +97,7 @@ def vader_score(text: str) -> float:
     """Returns the VADER compound sentiment score for a given text."""
     if not isinstance(text, str) or not text.strip():
         return 0.0
-    return analyzer.polarity_scores(text)['compound']
+    return get_sentiment_analyzer().polarity_scores(text)['compound']
 
 
 def fuzzy_hit(s: str, word_bank: List[str], thresh: int = 70) -> bool:
@@ -214,6 +220,9 @@ def cluster_texts_from_df(
     if min_samples is None:
         min_samples = max(1, min_cluster_size // 2)
 
+    import hdbscan
+    from sklearn.cluster import KMeans
+
     clusterer = hdbscan.HDBSCAN(
         min_cluster_size=min_cluster_size,
         min_samples=min_samples
@@ -0,0 +1,69 @@
+"""
+Bounded worker pools for blocking work done by the API
+Scraping (PRAW, requests, sleeps) runs in a thread pool and analysis
+(embeddings, HDBSCAN) runs in a separate process pool, so neither blocks
+the event loop that serves /health and every other request.
+"""
+
+import asyncio
+import functools
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from typing import Any, Callable
+
+from env_config import env_int
+
+_io_pool = None
+_cpu_pool = None
+_lock = threading.Lock()
+
+
+def get_io_pool() -> ThreadPoolExecutor:
+    """Thread pool for scraping and other network-bound work (IO_POOL_WORKERS, default 16)"""
+    global _io_pool
+    with _lock:
+        if _io_pool is None:
+            _io_pool = ThreadPoolExecutor(
+                max_workers=env_int("IO_POOL_WORKERS", 16),
+                thread_name_prefix="io"
+            )
+        return _io_pool
+
+
+def get_cpu_pool() -> ProcessPoolExecutor:
+    """Process pool for analysis work (CPU_POOL_WORKERS, default min(2, cpu count))"""
+    global _cpu_pool
+    with _lock:
+        if _cpu_pool is None:
+            # spawn keeps the children clean of the server's threads and sockets
+            _cpu_pool = ProcessPoolExecutor(
+                max_workers=env_int("CPU_POOL_WORKERS", min(2, os.cpu_count() or 1)),
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return _cpu_pool
+
+
+async def run_io(func: Callable, *args, **kwargs) -> Any:
+    """Run a blocking I/O call in the I/O thread pool"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_io_pool(), functools.partial(func, *args, **kwargs))
+
+
+async def run_cpu(func: Callable, *args, **kwargs) -> Any:
+    """Run a CPU-heavy call in the analysis process pool (func and args must be picklable)"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_cpu_pool(), functools.partial(func, *args, **kwargs))
+
+
+def shutdown_pools():
+    """Stop both pools; called on application shutdown"""
+    global _io_pool, _cpu_pool
+    with _lock:
+        if _io_pool is not None:
+            _io_pool.shutdown(wait=False, cancel_futures=True)
+            _io_pool = None
+        if _cpu_pool is not None:
+            _cpu_pool.shutdown(wait=False, cancel_futures=True)
+            _cpu_pool = None
@@ -0,0 +1,177 @@
+"""
+In-process job queue for long scrapes and analyses
+A job is submitted, returns an id immediately and runs on the event loop with
+at most JOB_CONCURRENCY jobs active at once (the blocking parts still go through
+the I/O and CPU pools). Finished jobs are kept for JOB_RETENTION_SECONDS, and
+at most JOB_MAX_JOBS jobs are tracked: the oldest finished ones make room for
+new submissions, and a submission is refused while every slot is still
+queued or running. Retained results are also capped at JOB_MAX_RESULT_MB in
+total (serialized size): the largest finished results are evicted first, and
+a single result above the cap fails its job instead of being kept.
+
+A run that answers {"status": "error", ...} (e.g. "No posts found") is
+recorded as failed with that message, and its body stays available as the
+result, as the synchronous endpoint would have returned it.
+"""
+
+import asyncio
+import json
+import time
+import traceback
+import uuid
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from env_config import env_float
+
+
+class JobLimitError(RuntimeError):
+    """Every job slot is taken by a queued or running job"""
+
+
+def _result_size(result: Any) -> int:
+    # Serialized size is a good enough proxy for the memory a result holds
+    return len(json.dumps(result, default=str))
+
+
+class JobManager:
+    """Tracks submitted jobs, limits how many run at once and expires old results"""
+
+    def __init__(self, max_concurrent: int = 2, retention_seconds: float = 3600, max_jobs: int = 100,
+                 max_result_bytes: int = 256 * 1024 * 1024):
+        self.max_concurrent = max(1, int(max_concurrent))
+        self.retention_seconds = retention_seconds
+        self.max_jobs = max(1, int(max_jobs))
+        self.max_result_bytes = max_result_bytes
+        self.evictions = 0
+        self._result_bytes = 0
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    def submit(self, kind: str, run: Callable[[], Awaitable[Any]]) -> Dict[str, Any]:
+        """Queue a coroutine factory and return the new job's public status"""
+        self.purge_expired()
+        self._make_room()
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrent)
+
+        job_id = uuid.uuid4().hex
+        self._jobs[job_id] = {
+            "job_id": job_id,
+            "kind": kind,
+            "status": "queued",
+            "submitted_at": time.time(),
+            "started_at": None,
+            "finished_at": None,
+            "error": None,
+            "result": None,
+            "result_bytes": 0,
+        }
+        self._tasks[job_id] = asyncio.create_task(self._run(job_id, run))
+        return self.status(job_id)
+
+    async def _run(self, job_id: str, run: Callable[[], Awaitable[Any]]):
+        job = self._jobs[job_id]
+        try:
+            async with self._semaphore:
+                job["status"] = "running"
+                job["started_at"] = time.time()
+                print(f"⚙️  Job {job_id} ({job['kind']}) started")
+                result = await run()
+            # Measuring a large result is slow; keep it off the event loop
+            size = await asyncio.get_running_loop().run_in_executor(None, _result_size, result)
+            if size > self.max_result_bytes:
+                raise RuntimeError(
+                    f"Result of {size / 1048576:.1f} MB exceeds JOB_MAX_RESULT_MB "
+                    f"({self.max_result_bytes / 1048576:g} MB)"
+                )
+            if isinstance(result, dict) and result.get("status") == "error":
+                job["error"] = result.get("message") or "error"
+                job["status"] = "failed"
+            else:
+                job["status"] = "succeeded"
+            if job_id in self._jobs:
+                job["result"], job["result_bytes"] = result, size
+                self._result_bytes += size
+                self._trim_results(keep=job_id)
+        except Exception as e:
+            # HTTPException carries the useful message in .detail
+            job["error"] = getattr(e, "detail", None) or str(e)
+            job["status"] = "failed"
+            traceback.print_exc()
+        finally:
+            job["finished_at"] = time.time()
+            self._tasks.pop(job_id, None)
+            print(f"⚙️  Job {job_id} ({job['kind']}) {job['status']}")
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        self.purge_expired()
+        return self._jobs.get(job_id)
+
+    def status(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Job metadata without the (possibly large) result"""
+        job = self.get(job_id)
+        if job is None:
+            return None
+        public = {k: v for k, v in job.items() if k != "result"}
+        if job["finished_at"]:
+            public["expires_at"] = job["finished_at"] + self.retention_seconds
+        return public
+
+    def purge_expired(self):
+        """Drop finished jobs older than the retention window"""
+        cutoff = time.time() - self.retention_seconds
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job["finished_at"] and job["finished_at"] < cutoff
+        ]
+        for job_id in expired:
+            self._drop(job_id)
+
+    def _drop(self, job_id: str):
+        job = self._jobs.pop(job_id)
+        self._result_bytes -= job["result_bytes"]
+
+    def _trim_results(self, keep: str):
+        """Evict the largest finished results until the retained total fits max_result_bytes"""
+        while self._result_bytes > self.max_result_bytes:
+            largest = max(
+                (job for job in self._jobs.values() if job["result_bytes"] and job["job_id"] != keep),
+                key=lambda job: job["result_bytes"],
+                default=None
+            )
+            if largest is None:
+                return
+            self._drop(largest["job_id"])
+            self.evictions += 1
+
+    def _make_room(self):
+        """Evict the oldest finished jobs until a new one fits under max_jobs"""
+        excess = len(self._jobs) - self.max_jobs + 1
+        if excess <= 0:
+            return
+        finished = sorted(
+            (job for job in self._jobs.values() if job["finished_at"]),
+            key=lambda job: job["finished_at"]
+        )
+        for job in finished[:excess]:
+            self._drop(job["job_id"])
+            self.evictions += 1
+        if len(self._jobs) >= self.max_jobs:
+            raise JobLimitError(f"{len(self._jobs)} jobs are queued or running (JOB_MAX_JOBS={self.max_jobs})")
+
+    def stats(self) -> Dict[str, int]:
+        counts = {"queued": 0, "running": 0, "succeeded": 0, "failed": 0}
+        for job in self._jobs.values():
+            counts[job["status"]] = counts.get(job["status"], 0) + 1
+        counts["result_bytes"] = self._result_bytes
+        counts["evictions"] = self.evictions
+        return counts
+
+
+job_manager = JobManager(
+    max_concurrent=int(env_float("JOB_CONCURRENCY", 2)),
+    retention_seconds=env_float("JOB_RETENTION_SECONDS", 3600),
+    max_jobs=int(env_float("JOB_MAX_JOBS", 100)),
+    max_result_bytes=int(env_float("JOB_MAX_RESULT_MB", 256) * 1024 * 1024)
+)
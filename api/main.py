@@ -1,22 +1,35 @@
 from fastapi import FastAPI, HTTPException, Body
+from fastapi.responses import JSONResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
-from typing import List, Dict, Optional
-import uvicorn
+from typing import Callable, List, Dict, Optional, Iterator, Tuple
 from datetime import datetime, timedelta
+import asyncio
 import random
+import json
+import threading
 
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from reddit_scraper import collect_reddit_posts_with_overlapper, extract_noun_hashtags
-from youtube_scraper import collect_youtube_video_titles
-from instagram_scraper import collect_instagram_posts
-from quora_scraper import scrape_quora
-from threads_scraper import scrape_threads
-import pandas as pd
-from analysis_pipeline import cluster_and_summarize, analyze_before_after
+from source_fanout import FANOUT_SOURCES, iter_source_results
+from source_query_planner import query_planner
+from scrape_pipeline import PipelinedScrape, noun_stabilizer, pipeline_enabled, sample_size
+from reddit_client import get_reddit_pool, get_rate_limiter
+from reddit_listing_cache import listing_cache
+from reddit_strategy_planner import planner
+from subreddit_metadata import metadata_cache
+from post_store import get_post_store
+from hashtag_extraction import shutdown_noun_pool
+from noun_lexicon import get_noun_lexicon
+from refresh_scores import refresh_stored_posts
+from nltk_setup import missing_nltk_resources, NLTK_DATA_DIR
+from api.executors import get_io_pool, run_io, run_cpu, shutdown_pools
+from api.jobs import JobLimitError, job_manager
+from api.result_cache import scrape_cache, scrape_lookup_keys, scrape_request_key, request_key, window_days
+from api.singleflight import inflight
 
 app = FastAPI(
     title="CollectPosts API",
@@ -34,72 +47,19 @@ app.add_middleware(
 
 @app.on_event("startup")
 async def startup_event():
-    """Download NLTK data on startup - ensure it's available before serving requests"""
-    import nltk
-    import os
-    
-    # Set NLTK data directory to a writable location
-    nltk_data_dir = os.getenv('NLTK_DATA', '/opt/render/nltk_data')
-    os.makedirs(nltk_data_dir, exist_ok=True)
-    nltk.data.path.append(nltk_data_dir)
-    
-    try:
-        # Download required NLTK data - punkt_tab is critical for newer NLTK
-        print("📥 Downloading NLTK data on startup...")
-        
-        # Download punkt_tab first (required by newer NLTK)
-        try:
-            nltk.data.find('tokenizers/punkt_tab')
-            print("✅ punkt_tab already available")
-        except LookupError:
-            print("📥 Downloading punkt_tab...")
-            nltk.download('punkt_tab', quiet=True)
-        
-        # Download punkt for compatibility
-        try:
-            nltk.data.find('tokenizers/punkt')
-            print("✅ punkt already available")
-        except LookupError:
-            print("📥 Downloading punkt...")
-            nltk.download('punkt', quiet=True)
-        
-        # Download tagger (try both old and new names)
-        try:
-            nltk.data.find('taggers/averaged_perceptron_tagger')
-            print("✅ averaged_perceptron_tagger already available")
-        except LookupError:
-            print("📥 Downloading averaged_perceptron_tagger...")
-            nltk.download('averaged_perceptron_tagger', quiet=True)
-        
-        # Download new tagger name (for newer NLTK versions)
-        try:
-            nltk.data.find('taggers/averaged_perceptron_tagger_eng')
-            print("✅ averaged_perceptron_tagger_eng already available")
-        except LookupError:
-            print("📥 Downloading averaged_perceptron_tagger_eng...")
-            nltk.download('averaged_perceptron_tagger_eng', quiet=True)
-        
-        # Download stopwords
-        try:
-            nltk.data.find('corpora/stopwords')
-            print("✅ stopwords already available")
-        except LookupError:
-            print("📥 Downloading stopwords...")
-            nltk.download('stopwords', quiet=True)
-        
-        # Download all NLTK data as a fallback (ensures everything is available)
-        print("📥 Ensuring all NLTK data is available...")
-        try:
-            nltk.download('all', quiet=True)
-            print("✅ All NLTK data downloaded")
-        except Exception as e:
-            print(f"⚠️  Could not download all NLTK data: {e}")
-        
-        print("✅ All NLTK data ready")
-    except Exception as e:
-        print(f"⚠️  NLTK download warning: {e}")
-        import traceback
-        traceback.print_exc()
+    """Point NLTK at the bundled data directory - no downloads, so serving starts immediately"""
+    missing = missing_nltk_resources()
+    if missing:
+        print(f"⚠️  Missing NLTK resources {missing}; run 'python nltk_setup.py' at build time")
+    else:
+        print(f"✅ NLTK data ready ({NLTK_DATA_DIR})")
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Release the scraping, analysis and noun-tagging worker pools"""
+    shutdown_pools()
+    shutdown_noun_pool()
+    get_noun_lexicon().save(force=True)
 
 class ScrapeRequest(BaseModel):
     sources: List[str]
@@ -108,6 +68,7 @@ class ScrapeRequest(BaseModel):
     limit_per_source: int = 10
     begin_date: Optional[str] = None  # YYYY-MM-DD format
     end_date: Optional[str] = None    # YYYY-MM-DD format
+    stream: bool = False  # Return NDJSON posts as each source finishes
 
 class AnalyzeRequest(BaseModel):
     query: str
@@ -132,6 +93,11 @@ class BeforeAfterRequest(BaseModel):
     limit_per_source: int = 100
     days: int = 7
 
+class RefreshScoresRequest(BaseModel):
+    max_age_hours: float = 6.0
+    limit: int = 100000
+    subreddit: Optional[str] = None
+
 @app.get("/")
 async def root():
     return {
@@ -141,6 +107,10 @@ async def root():
             "scrape": "/scrape-multi-source (POST)",
             "analyze": "/analyze (POST)",
             "before-after": "/analyze-before-after (POST)",
+            "jobs": "/jobs/{scrape-multi-source|analyze|analyze-before-after|refresh-scores} (POST), /jobs/{job_id} (GET), /jobs/{job_id}/result (GET)",
+            "cache-stats": "/cache/stats (GET)",
+            "reddit-stats": "/reddit/stats (GET)",
+            "source-stats": "/sources/stats (GET)",
             "health": "/health (GET)"
         },
         "supported_sources": ["reddit", "youtube", "instagram", "quora", "threads"],
@@ -152,178 +122,412 @@ async def health_check():
     """Health check endpoint - responds immediately for port scanning"""
     return {"status": "healthy", "service": "collectposts"}
 
-@app.post("/scrape-multi-source")
-async def scrape_multiple_sources(request: ScrapeRequest):
-    try:
-        # Parse date range first to detect large historical ranges
-        if request.begin_date and request.end_date:
-            begin_date = datetime.strptime(request.begin_date, '%Y-%m-%d')
-            end_date = datetime.strptime(request.end_date, '%Y-%m-%d')
-        else:
-            # Use time_period
-            time_mapping = {1: timedelta(days=1), 7: timedelta(weeks=1), 30: timedelta(days=30), 365: timedelta(days=365)}
-            delta = time_mapping.get(request.days, timedelta(weeks=1))
-            end_date = datetime.utcnow()
-            begin_date = end_date - delta
-        
-        # Detect large historical ranges (3+ years or 1000+ days)
-        days_diff = (end_date - begin_date).days
-        now = datetime.utcnow()
-        if end_date > now:
-            days_ago = (now - begin_date).days
-        else:
-            days_ago = (now - end_date).days
-        months_ago = days_ago / 30
-        
-        is_large_historical = days_diff > 1000 or months_ago > 36  # 3+ years or 1000+ days range
-        
-        # Log the request details
-        print(f"📊 API Request: query='{request.query}', sources={request.sources}, requested_limit={request.limit_per_source}")
-        print(f"📅 Date range: {begin_date.strftime('%Y-%m-%d')} to {end_date.strftime('%Y-%m-%d')} ({days_diff} days)")
-        print(f"📅 Is large historical: {is_large_historical} (months_ago={months_ago:.1f})")
-        
-        # Aggressive limits to prevent timeouts on free tier
-        # BUT: Increase limits for large historical ranges (they need more posts)
-        num_sources = len(request.sources)
-        if is_large_historical:
-            # For large historical ranges (3+ years), allow much higher limits
-            # These ranges need more posts to be useful
-            if num_sources >= 4:
-                max_limit = min(request.limit_per_source, 100)  # Increased for historical
-            elif num_sources >= 3:
-                max_limit = min(request.limit_per_source, 200)  # Increased for historical
-            elif num_sources >= 2:
-                max_limit = min(request.limit_per_source, 400)  # Much higher for 3-year periods (was 50)
-            else:
-                max_limit = min(request.limit_per_source, 800)  # Much higher for single source (was 100)
+@app.get("/reddit/stats")
+async def reddit_stats():
+    """Reddit rate-limit state, listing cache, strategy yields, subreddit metadata and local store"""
+    store = get_post_store()
+    return {
+        "clients": get_reddit_pool().stats(),
+        "rate_limiter": get_rate_limiter().stats(),
+        "listing_cache": listing_cache.stats(),
+        "planner": planner.stats(),
+        "subreddits": metadata_cache.stats(),
+        "store": store.stats() if store is not None else None
+    }
+
+@app.get("/sources/stats")
+async def source_stats():
+    """Per-hashtag yields and recent query plans of YouTube, Instagram, Quora and Threads"""
+    return query_planner.stats()
+
+@app.get("/cache/stats")
+async def cache_stats():
+    """Hit/miss counters of the scrape result cache, in-flight request coalescing and the noun lexicon"""
+    return {**scrape_cache.stats(), "singleflight": inflight.stats(), "noun_lexicon": get_noun_lexicon().stats()}
+
+def _scrape_reddit(query: str, begin_date: datetime, end_date: datetime, limit: int,
+                   on_posts: Optional[Callable[[List[Dict]], None]] = None,
+                   extract: Callable[[List[Dict]], List[str]] = extract_noun_hashtags) -> Tuple[List[Dict], List[str]]:
+    """
+    Reddit overlapper scrape plus the noun hashtag bank built from it
+    (by extract, which the pipelined scrape points at its stabilizer's counts)
+    """
+    reddit_posts = collect_reddit_posts_with_overlapper(
+        subreddit_name=query,
+        begin_date=begin_date,
+        end_date=end_date,
+        limit=limit,
+        on_posts=on_posts
+    )
+    
+    # Extract hashtag bank from Reddit posts (only if we have posts)
+    hashtag_bank = []
+    if reddit_posts:
+        try:
+            hashtag_bank = extract(reddit_posts)
+        except Exception as e:
+            print(f"⚠️  Hashtag extraction error: {e}")
+    return reddit_posts, hashtag_bank
+
+
+def _collect_reddit(request, begin_date: datetime, end_date: datetime, limit: int,
+                    on_posts: Optional[Callable[[List[Dict]], None]] = None,
+                    extract: Callable[[List[Dict]], List[str]] = extract_noun_hashtags) -> Tuple[List[Dict], List[str]]:
+    """
+    Reddit step shared by /scrape-multi-source and /analyze. Identical requests
+    that arrive while a scrape is running wait for it instead of scraping again
+    (only the request that runs the scrape sees on_posts and extract calls;
+    both ways of extracting give the same bank).
+    The returned lists are shared between callers and must not be mutated.
+    """
+    key = ("reddit", request_key(request.query, ["reddit"], limit, request.days, request.begin_date, request.end_date))
+    return inflight.do(key, _scrape_reddit, request.query, begin_date, end_date, limit, on_posts, extract)
+
+
+def _plan_scrape(request: ScrapeRequest) -> Dict:
+    """Resolve the date window and the effective per-source limit for a scrape request"""
+    # Parse date range first to detect large historical ranges
+    if request.begin_date and request.end_date:
+        begin_date = datetime.strptime(request.begin_date, '%Y-%m-%d')
+        end_date = datetime.strptime(request.end_date, '%Y-%m-%d')
+    else:
+        # Use time_period
+        # Same span the result cache keys relative windows on
+        delta = timedelta(days=window_days(request.days))
+        end_date = datetime.utcnow()
+        begin_date = end_date - delta
+    
+    # Detect large historical ranges (3+ years or 1000+ days)
+    days_diff = (end_date - begin_date).days
+    now = datetime.utcnow()
+    if end_date > now:
+        days_ago = (now - begin_date).days
+    else:
+        days_ago = (now - end_date).days
+    months_ago = days_ago / 30
+    
+    is_large_historical = days_diff > 1000 or months_ago > 36  # 3+ years or 1000+ days range
+    
+    # Log the request details
+    print(f"📊 API Request: query='{request.query}', sources={request.sources}, requested_limit={request.limit_per_source}")
+    print(f"📅 Date range: {begin_date.strftime('%Y-%m-%d')} to {end_date.strftime('%Y-%m-%d')} ({days_diff} days)")
+    print(f"📅 Is large historical: {is_large_historical} (months_ago={months_ago:.1f})")
+    
+    # Aggressive limits to prevent timeouts on free tier
+    # BUT: Increase limits for large historical ranges (they need more posts)
+    num_sources = len(request.sources)
+    if is_large_historical:
+        # For large historical ranges (3+ years), allow much higher limits
+        # These ranges need more posts to be useful
+        if num_sources >= 4:
+            max_limit = min(request.limit_per_source, 100)  # Increased for historical
+        elif num_sources >= 3:
+            max_limit = min(request.limit_per_source, 200)  # Increased for historical
+        elif num_sources >= 2:
+            max_limit = min(request.limit_per_source, 400)  # Much higher for 3-year periods (was 50)
         else:
-            # Normal limits for recent data
-            if num_sources >= 4:
-                max_limit = min(request.limit_per_source, 20)  # Very small for many sources
-            elif num_sources >= 3:
-                max_limit = min(request.limit_per_source, 30)
-            elif num_sources >= 2:
-                max_limit = min(request.limit_per_source, 50)
-            else:
-                max_limit = min(request.limit_per_source, 100)
-        
-        # Log the effective limit
-        if max_limit < request.limit_per_source:
-            print(f"⚠️  Limit capped: requested={request.limit_per_source}, effective={max_limit} (reason: {'large_historical' if is_large_historical else 'normal'} range, {num_sources} sources)")
+            max_limit = min(request.limit_per_source, 800)  # Much higher for single source (was 100)
+    else:
+        # Normal limits for recent data
+        if num_sources >= 4:
+            max_limit = min(request.limit_per_source, 20)  # Very small for many sources
+        elif num_sources >= 3:
+            max_limit = min(request.limit_per_source, 30)
+        elif num_sources >= 2:
+            max_limit = min(request.limit_per_source, 50)
         else:
-            print(f"✅ Limit used: {max_limit} (no cap applied)")
-        
-        all_posts = []
-        hashtag_bank = set()
-        
-        # Step 1: Scrape Reddit with overlapper functionality
-        if 'reddit' in request.sources:
-            try:
-                print(f"🔍 Scraping Reddit with limit={max_limit}...")
-                reddit_posts = collect_reddit_posts_with_overlapper(
-                    subreddit_name=request.query,
-                    begin_date=begin_date,
-                    end_date=end_date,
-                    limit=max_limit
-                )
-                print(f"✅ Reddit returned {len(reddit_posts)} posts (requested {max_limit})")
-                all_posts.extend(reddit_posts)
-                
-                # Extract hashtag bank from Reddit posts (only if we have posts)
-                if reddit_posts:
-                    hashtag_bank = extract_noun_hashtags(reddit_posts)
-            except Exception as e:
-                print(f"⚠️  Reddit scraping error: {e}")
-                import traceback
-                traceback.print_exc()
-                # Continue with other sources even if Reddit fails
-        
-        # Step 2: Use hashtags to scrape other sources
-        # If no hashtags from Reddit, use query directly
-        search_terms = hashtag_bank if len(hashtag_bank) > 0 else {request.query}
-        
-        for source in request.sources:
+            max_limit = min(request.limit_per_source, 100)
+    
+    # Log the effective limit
+    if max_limit < request.limit_per_source:
+        print(f"⚠️  Limit capped: requested={request.limit_per_source}, effective={max_limit} (reason: {'large_historical' if is_large_historical else 'normal'} range, {num_sources} sources)")
+    else:
+        print(f"✅ Limit used: {max_limit} (no cap applied)")
+    
+    return {
+        "begin_date": begin_date,
+        "end_date": end_date,
+        "max_limit": max_limit,
+        "is_large_historical": is_large_historical,
+        "num_sources": num_sources
+    }
+
+
+def _iter_scraped_posts(request: ScrapeRequest, plan: Dict, summary: Dict,
+                        stop_event: Optional[threading.Event] = None) -> Iterator[Tuple[str, List[Dict]]]:
+    """
+    Yield (source, posts) batches as each scraper finishes.
+    summary["hashtags"] (the bank of all Reddit posts) and
+    summary["source_hashtags"] (the bank the other sources were queried with)
+    are filled in once the Reddit step is done. Setting stop_event stops waiting for the
+    other sources.
+    """
+    begin_date = plan["begin_date"]
+    end_date = plan["end_date"]
+    max_limit = plan["max_limit"]
+    hashtag_bank = []
+    
+    def run_sources(search_terms: List[str]):
+        return iter_source_results(
+            sources=request.sources,
+            query=request.query,
+            hashtags=search_terms,
+            limits={source: max_limit for source in request.sources},  # Use requested limit directly
+            begin_date=begin_date,
+            end_date=end_date,
+            stop_event=stop_event
+        )
+    
+    # Reddit and the other sources overlap: they start once the hashtag bank of
+    # the first Reddit posts has settled (see scrape_pipeline.py)
+    if 'reddit' in request.sources and any(s in FANOUT_SOURCES for s in request.sources) and pipeline_enabled():
+        print(f"🔍 Scraping Reddit with limit={max_limit} (pipelined with {len(request.sources) - 1} other source(s))...")
+        stabilizer = noun_stabilizer(min_posts=sample_size(max_limit))
+        pipeline = PipelinedScrape(
+            # The final bank reuses the stabilizer's noun counts instead of tagging the posts again
+            collect_reddit=lambda on_posts: _collect_reddit(
+                request, begin_date, end_date, max_limit, on_posts,
+                extract=lambda posts: stabilizer.final_bank(posts, extract_noun_hashtags)
+            ),
+            run_sources=run_sources,
+            stabilizer=stabilizer,
+            fallback_terms=[request.query],
+            stop_event=stop_event
+        )
+        for source, posts, error in pipeline:
             if source == 'reddit':
-                continue  # Already done
-                
-            try:
-                if source == 'youtube':
-                    posts = collect_youtube_video_titles(
-                        query=request.query,
-                        hashtags=search_terms,
-                        max_results=max_limit,  # Use requested limit directly
-                        begin_date=begin_date,
-                        end_date=end_date
-                    )
-                    
-                elif source == 'instagram':
-                    posts = collect_instagram_posts(
-                        query=request.query,
-                        hashtags=search_terms,
-                        max_posts=max_limit,  # Use requested limit directly
-                        begin_date=begin_date,
-                        end_date=end_date
-                    )
-                    
-                elif source == 'quora':
-                    posts = scrape_quora(
-                        query=request.query,
-                        hashtags=search_terms,
-                        time_passed="week",
-                        limit=max_limit,  # Use requested limit directly
-                        begin_date=begin_date,
-                        end_date=end_date
-                    )
-                    
-                elif source == 'threads':
-                    posts = scrape_threads(
-                        query=request.query,
-                        hashtags=search_terms,
-                        time_passed="week",
-                        limit=max_limit,  # Use requested limit directly
-                        begin_date=begin_date,
-                        end_date=end_date
-                    )
-                
-                # Random sample if we got more posts than requested
-                if len(posts) > max_limit:
-                    posts = random.sample(posts, max_limit)
-                
-                all_posts.extend(posts)
-                
-            except Exception as e:
-                print(f"Error scraping {source}: {e}")
+                if error:
+                    print(f"⚠️  Reddit scraping error: {error}")
+                else:
+                    print(f"✅ Reddit returned {len(posts)} posts (requested {max_limit})")
+                # The other sources were queried with the early bank
+                summary["hashtags"] = list(pipeline.reddit_bank)
+                summary["source_hashtags"] = list(pipeline.source_bank)
+                yield 'reddit', posts
+                continue
+            if error:
+                print(f"Error scraping {source}: {error}")
                 continue
+            if len(posts) > max_limit:
+                posts = random.sample(posts, max_limit)
+            yield source, posts
+        return
+    
+    # Step 1: Scrape Reddit with overlapper functionality
+    if 'reddit' in request.sources:
+        reddit_posts = []
+        try:
+            print(f"🔍 Scraping Reddit with limit={max_limit}...")
+            reddit_posts, hashtag_bank = _collect_reddit(request, begin_date, end_date, max_limit)
+            print(f"✅ Reddit returned {len(reddit_posts)} posts (requested {max_limit})")
+        except Exception as e:
+            print(f"⚠️  Reddit scraping error: {e}")
+            import traceback
+            traceback.print_exc()
+            # Continue with other sources even if Reddit fails
         
-        # Count posts by source
-        source_breakdown = {}
-        for post in all_posts:
-            source = post.get("source", "unknown")
-            source_breakdown[source] = source_breakdown.get(source, 0) + 1
+        summary["hashtags"] = list(hashtag_bank)
+        yield 'reddit', reddit_posts
+    
+    # Step 2: Use hashtags to scrape other sources (all of them at once)
+    # If no hashtags from Reddit, use query directly
+    search_terms = hashtag_bank if len(hashtag_bank) > 0 else [request.query]
+    summary["source_hashtags"] = list(search_terms)
+    
+    for source, posts, error in run_sources(search_terms):
+        if error:
+            print(f"Error scraping {source}: {error}")
+            continue
         
-        # Return metadata about limits used
-        return {
-            "status": "success",
-            "query": request.query,
-            "sources": request.sources,
-            "days": request.days,
-            "total_posts": len(all_posts),
-            "source_breakdown": source_breakdown,
-            "hashtags": list(hashtag_bank),
-            "all_posts": all_posts,
-            "limit_info": {
-                "requested_limit": request.limit_per_source,
-                "effective_limit": max_limit,
-                "was_capped": max_limit < request.limit_per_source,
-                "is_large_historical": is_large_historical,
-                "num_sources": num_sources
-            }
-        }
+        # Random sample if we got more posts than requested
+        if len(posts) > max_limit:
+            posts = random.sample(posts, max_limit)
         
+        yield source, posts
+
+
+def _scrape_summary(request: ScrapeRequest, plan: Dict, source_breakdown: Dict[str, int], hashtags: List[str],
+                    source_hashtags: Optional[List[str]] = None) -> Dict:
+    """
+    Response metadata shared by the JSON body and the final NDJSON record
+    hashtags is the bank of all Reddit posts; source_hashtags the bank the
+    other sources were queried with (an earlier one when the steps were
+    pipelined, the query when Reddit found no hashtags)
+    """
+    return {
+        "status": "success",
+        "query": request.query,
+        "sources": request.sources,
+        "days": request.days,
+        "total_posts": sum(source_breakdown.values()),
+        "source_breakdown": source_breakdown,
+        "hashtags": hashtags,
+        "source_hashtags": hashtags if source_hashtags is None else source_hashtags,
+        "limit_info": {
+            "requested_limit": request.limit_per_source,
+            "effective_limit": plan["max_limit"],
+            "was_capped": plan["max_limit"] < request.limit_per_source,
+            "is_large_historical": plan["is_large_historical"],
+            "num_sources": plan["num_sources"]
+        }
+    }
+
+
+def _scrape_multiple_sources(request: ScrapeRequest) -> Dict:
+    """Blocking body of /scrape-multi-source; runs in the I/O pool"""
+    cache_key = scrape_request_key(request)
+    cached = scrape_cache.get_first(scrape_lookup_keys(request))
+    if cached is not None:
+        print(f"⚡ Cache hit for query='{request.query}', sources={request.sources}")
+        return {**cached, "sources": request.sources}
+    
+    # Identical requests already in flight wait for that result
+    return inflight.do(("scrape", cache_key), _run_scrape, request, cache_key)
+
+
+def _run_scrape(request: ScrapeRequest, cache_key: str) -> Dict:
+    plan = _plan_scrape(request)
+    summary = {"hashtags": []}
+    all_posts = []
+    for _, posts in _iter_scraped_posts(request, plan, summary):
+        all_posts.extend(posts)
+    
+    # Count posts by source
+    source_breakdown = {}
+    for post in all_posts:
+        source = post.get("source", "unknown")
+        source_breakdown[source] = source_breakdown.get(source, 0) + 1
+    
+    # Return metadata about limits used
+    response = _scrape_summary(request, plan, source_breakdown, summary["hashtags"], summary.get("source_hashtags"))
+    response["all_posts"] = all_posts
+    
+    # Empty results are usually a transient failure, so don't pin them in the cache
+    if all_posts:
+        scrape_cache.set(cache_key, response)
+    return response
+
+
+def _stream_multiple_sources(request: ScrapeRequest, stop_event: Optional[threading.Event] = None) -> Iterator[str]:
+    """
+    NDJSON body of /scrape-multi-source with stream=true: one line per post as each
+    source finishes, then a final {"type": "summary", ...} record. Posts are kept
+    only while they still fit in the result cache, so memory stays bounded; a
+    completed stream is cached like a JSON response. Setting stop_event (the
+    client disconnected) stops waiting for the remaining sources.
+    """
+    try:
+        cached = scrape_cache.get_first(scrape_lookup_keys(request))
+        if cached is not None:
+            print(f"⚡ Cache hit for query='{request.query}', sources={request.sources} (streaming)")
+            for post in cached["all_posts"]:
+                yield json.dumps(post, default=str) + "\n"
+            record = {k: v for k, v in cached.items() if k != "all_posts"}
+            yield json.dumps({"type": "summary", **record, "sources": request.sources}, default=str) + "\n"
+            return
+        
+        plan = _plan_scrape(request)
+        summary = {"hashtags": []}
+        source_breakdown = {}
+        all_posts, streamed_bytes = [], 0
+        for _, posts in _iter_scraped_posts(request, plan, summary, stop_event):
+            for post in posts:
+                source = post.get("source", "unknown")
+                source_breakdown[source] = source_breakdown.get(source, 0) + 1
+                line = json.dumps(post, default=str) + "\n"
+                if all_posts is not None:
+                    streamed_bytes += len(line)
+                    all_posts.append(post)
+                    # Too large for the cache anyway: stop holding on to the posts
+                    if streamed_bytes > scrape_cache.max_bytes:
+                        all_posts = None
+                yield line
+        
+        record = _scrape_summary(request, plan, source_breakdown, summary["hashtags"], summary.get("source_hashtags"))
+        yield json.dumps({"type": "summary", **record}, default=str) + "\n"
+        # Same rule as the JSON path: empty results are not pinned in the cache
+        if all_posts and not (stop_event is not None and stop_event.is_set()):
+            scrape_cache.set(scrape_request_key(request), {**record, "all_posts": all_posts})
+    except Exception as e:
+        # Headers are already sent, so report the failure in-band
+        yield json.dumps({"type": "error", "detail": f"Multi-source scraping failed: {str(e)}"}) + "\n"
+
+
+async def _iterate_in_io_pool(iterator: Iterator[str], stop_event: Optional[threading.Event] = None):
+    """
+    Drive a blocking iterator from the I/O pool so streaming never blocks the event loop.
+    When the client disconnects, stop_event is set and the iterator is closed (in the
+    I/O pool, once a next() call still running there has returned).
+    """
+    done = object()
+    pending = None
+    try:
+        while True:
+            pending = asyncio.get_running_loop().run_in_executor(get_io_pool(), next, iterator, done)
+            # Shielded: a disconnect cancels this task, not the next() call already running
+            item = await asyncio.shield(pending)
+            pending = None
+            if item is done:
+                break
+            yield item
+    finally:
+        if stop_event is not None:
+            stop_event.set()
+        if pending is not None and not pending.done():
+            pending.add_done_callback(lambda _: get_io_pool().submit(iterator.close))
+        else:
+            get_io_pool().submit(iterator.close)
+
+
+@app.post("/scrape-multi-source")
+async def scrape_multiple_sources(request: ScrapeRequest):
+    if request.stream:
+        stop_event = threading.Event()
+        return StreamingResponse(
+            _iterate_in_io_pool(_stream_multiple_sources(request, stop_event), stop_event),
+            media_type="application/x-ndjson"
+        )
+    try:
+        return await run_io(_scrape_multiple_sources, request)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Multi-source scraping failed: {str(e)}")
 
 
+def _collect_analysis_posts(request: AnalyzeRequest, begin_date: datetime, end_date: datetime, max_limit: int):
+    """Blocking scrape step of /analyze; runs in the I/O pool"""
+    all_posts = []
+    hashtag_bank = set()
+    
+    # Scrape Reddit with overlapper
+    if 'reddit' in request.sources:
+        reddit_posts, hashtag_bank = _collect_reddit(request, begin_date, end_date, max_limit)
+        all_posts.extend(reddit_posts)
+    
+    # Scrape other sources in parallel
+    if len(hashtag_bank) > 0:
+        limits = {source: max_limit for source in request.sources}
+        limits['youtube'] = min(50, max_limit)
+        
+        for source, posts, error in iter_source_results(
+            sources=request.sources,
+            query=request.query,
+            hashtags=hashtag_bank,
+            limits=limits,
+            begin_date=begin_date,
+            end_date=end_date
+        ):
+            if error:
+                print(f"Error scraping {source}: {error}")
+                continue
+            
+            if source != 'youtube' and len(posts) > max_limit:
+                posts = random.sample(posts, max_limit)
+            
+            all_posts.extend(posts)
+    
+    return all_posts, hashtag_bank
+
+
 @app.post("/analyze")
 async def analyze_posts(request: AnalyzeRequest):
     """Analyze and cluster posts with summarization"""
@@ -336,77 +540,13 @@ async def analyze_posts(request: AnalyzeRequest):
             begin_date = datetime.strptime(request.begin_date, '%Y-%m-%d')
             end_date = datetime.strptime(request.end_date, '%Y-%m-%d')
         else:
-            time_mapping = {1: timedelta(days=1), 7: timedelta(weeks=1), 30: timedelta(days=30), 365: timedelta(days=365)}
-            delta = time_mapping.get(request.days, timedelta(weeks=1))
+            delta = timedelta(days=window_days(request.days))
             end_date = datetime.utcnow()
             begin_date = end_date - delta
         
-        all_posts = []
-        hashtag_bank = set()
-        
-        # Scrape Reddit with overlapper
-        if 'reddit' in request.sources:
-            reddit_posts = collect_reddit_posts_with_overlapper(
-                subreddit_name=request.query,
-                begin_date=begin_date,
-                end_date=end_date,
-                limit=max_limit
-            )
-            all_posts.extend(reddit_posts)
-            hashtag_bank = extract_noun_hashtags(reddit_posts)
-        
-        # Scrape other sources
-        if len(hashtag_bank) > 0:
-            for source in request.sources:
-                if source == 'reddit':
-                    continue
-                    
-                try:
-                    if source == 'youtube':
-                        posts = collect_youtube_video_titles(
-                            query=request.query,
-                            hashtags=hashtag_bank,
-                            max_results=min(50, max_limit),
-                            begin_date=begin_date,
-                            end_date=end_date
-                        )
-                    elif source == 'instagram':
-                        posts = collect_instagram_posts(
-                            query=request.query,
-                            hashtags=hashtag_bank,
-                            max_posts=max_limit,
-                            begin_date=begin_date,
-                            end_date=end_date
-                        )
-                    elif source == 'quora':
-                        posts = scrape_quora(
-                            query=request.query,
-                            hashtags=hashtag_bank,
-                            time_passed="week",
-                            limit=max_limit,
-                            begin_date=begin_date,
-                            end_date=end_date
-                        )
-                    elif source == 'threads':
-                        posts = scrape_threads(
-                            query=request.query,
-                            hashtags=hashtag_bank,
-                            time_passed="week",
-                            limit=max_limit,
-                            begin_date=begin_date,
-                            end_date=end_date
-                        )
-                    else:
-                        continue
-                    
-                    if source != 'youtube' and len(posts) > max_limit:
-                        posts = random.sample(posts, max_limit)
-                    
-                    all_posts.extend(posts)
-                    
-                except Exception as e:
-                    print(f"Error scraping {source}: {e}")
-                    continue
+        # Identical analyses in flight share one scrape
+        key = ("analyze", request_key(request.query, request.sources, max_limit, request.days, request.begin_date, request.end_date))
+        all_posts, hashtag_bank = await run_io(inflight.do, key, _collect_analysis_posts, request, begin_date, end_date, max_limit)
         
         # Convert to DataFrame
         if not all_posts:
@@ -415,10 +555,14 @@ async def analyze_posts(request: AnalyzeRequest):
                 "message": "No posts found"
             }
         
+        import pandas as pd
+        from analysis_pipeline import cluster_and_summarize
+        
         df = pd.DataFrame(all_posts)
         
-        # Run analysis
-        summary_text, clusters = cluster_and_summarize(
+        # Run analysis in the CPU pool
+        summary_text, clusters = await run_cpu(
+            cluster_and_summarize,
             posts_df=df,
             base_subreddit=request.query,
             min_cluster_size=request.min_cluster_size,
@@ -440,42 +584,49 @@ async def analyze_posts(request: AnalyzeRequest):
         raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
 
 
+def _collect_before_after_posts(request: BeforeAfterRequest):
+    """Blocking scrape step of /analyze-before-after; runs in the I/O pool"""
+    all_posts = []
+    hashtag_bank = set()
+    
+    # Scrape Reddit
+    if 'reddit' in request.sources:
+        # Before period
+        before_begin = datetime.strptime(request.before_start, '%Y-%m-%d')
+        before_end = datetime.strptime(request.before_end, '%Y-%m-%d')
+        reddit_posts_before = collect_reddit_posts_with_overlapper(
+            subreddit_name=request.query,
+            begin_date=before_begin,
+            end_date=before_end,
+            limit=request.limit_per_source
+        )
+        all_posts.extend(reddit_posts_before)
+        
+        # After period
+        after_begin = datetime.strptime(request.after_start, '%Y-%m-%d')
+        after_end = datetime.strptime(request.after_end, '%Y-%m-%d')
+        reddit_posts_after = collect_reddit_posts_with_overlapper(
+            subreddit_name=request.query,
+            begin_date=after_begin,
+            end_date=after_end,
+            limit=request.limit_per_source
+        )
+        all_posts.extend(reddit_posts_after)
+        
+        hashtag_bank = extract_noun_hashtags(all_posts)
+    
+    # Scrape other sources if needed
+    # (Similar logic as above)
+    
+    return all_posts, hashtag_bank
+
+
 @app.post("/analyze-before-after")
 async def analyze_before_after_endpoint(request: BeforeAfterRequest):
     """Analyze posts before and after a launch date"""
     try:
         # Scrape posts for both periods
-        all_posts = []
-        hashtag_bank = set()
-        
-        # Scrape Reddit
-        if 'reddit' in request.sources:
-            # Before period
-            before_begin = datetime.strptime(request.before_start, '%Y-%m-%d')
-            before_end = datetime.strptime(request.before_end, '%Y-%m-%d')
-            reddit_posts_before = collect_reddit_posts_with_overlapper(
-                subreddit_name=request.query,
-                begin_date=before_begin,
-                end_date=before_end,
-                limit=request.limit_per_source
-            )
-            all_posts.extend(reddit_posts_before)
-            
-            # After period
-            after_begin = datetime.strptime(request.after_start, '%Y-%m-%d')
-            after_end = datetime.strptime(request.after_end, '%Y-%m-%d')
-            reddit_posts_after = collect_reddit_posts_with_overlapper(
-                subreddit_name=request.query,
-                begin_date=after_begin,
-                end_date=after_end,
-                limit=request.limit_per_source
-            )
-            all_posts.extend(reddit_posts_after)
-            
-            hashtag_bank = extract_noun_hashtags(all_posts)
-        
-        # Scrape other sources if needed
-        # (Similar logic as above)
+        all_posts, hashtag_bank = await run_io(_collect_before_after_posts, request)
         
         if not all_posts:
             return {
@@ -483,10 +634,14 @@ async def analyze_before_after_endpoint(request: BeforeAfterRequest):
                 "message": "No posts found"
             }
         
+        import pandas as pd
+        from analysis_pipeline import analyze_before_after
+        
         df = pd.DataFrame(all_posts)
         
-        # Run before/after analysis
-        results = analyze_before_after(
+        # Run before/after analysis in the CPU pool
+        results = await run_cpu(
+            analyze_before_after,
             data=df,
             word_bank=request.word_bank,
             base_subreddit=request.query,
@@ -509,5 +664,66 @@ async def analyze_before_after_endpoint(request: BeforeAfterRequest):
         raise HTTPException(status_code=500, detail=f"Before/after analysis failed: {str(e)}")
 
 
+def _submit_job(kind: str, run) -> Dict:
+    """Queue a job; 429 while every job slot is queued or running"""
+    try:
+        return job_manager.submit(kind, run)
+    except JobLimitError as e:
+        raise HTTPException(status_code=429, detail=str(e))
+
+
+@app.post("/jobs/scrape-multi-source", status_code=202)
+async def submit_scrape_job(request: ScrapeRequest):
+    """Queue a /scrape-multi-source request and return its job id immediately"""
+    # Jobs always store the JSON body, even if the request asked for streaming
+    return _submit_job("scrape-multi-source", lambda: run_io(_scrape_multiple_sources, request))
+
+
+@app.post("/jobs/analyze", status_code=202)
+async def submit_analyze_job(request: AnalyzeRequest):
+    """Queue an /analyze request and return its job id immediately"""
+    return _submit_job("analyze", lambda: analyze_posts(request))
+
+
+@app.post("/jobs/analyze-before-after", status_code=202)
+async def submit_before_after_job(request: BeforeAfterRequest):
+    """Queue an /analyze-before-after request and return its job id immediately"""
+    return _submit_job("analyze-before-after", lambda: analyze_before_after_endpoint(request))
+
+
+@app.post("/jobs/refresh-scores", status_code=202)
+async def submit_refresh_scores_job(request: RefreshScoresRequest):
+    """Queue a batched /api/info refresh of stored post scores, comment counts and removals"""
+    if get_post_store() is None:
+        raise HTTPException(status_code=404, detail="No local post store to refresh")
+    return _submit_job("refresh-scores", lambda: run_io(
+        refresh_stored_posts, request.max_age_hours, request.limit, request.subreddit
+    ))
+
+
+@app.get("/jobs/{job_id}")
+async def get_job_status(job_id: str):
+    """Status of a submitted job (queued, running, succeeded or failed)"""
+    status = job_manager.status(job_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found or expired")
+    return status
+
+
+@app.get("/jobs/{job_id}/result")
+async def get_job_result(job_id: str):
+    """Result of a finished job; 202 while the job is still queued or running, 404 once expired or evicted"""
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found, expired or evicted")
+    if job["status"] in ("queued", "running"):
+        return JSONResponse(status_code=202, content=job_manager.status(job_id))
+    if job["status"] == "failed" and job["result"] is None:
+        raise HTTPException(status_code=500, detail=job["error"])
+    # Failed runs that answered {"status": "error"} return that body, like the synchronous endpoint
+    return job["result"]
+
+
 if __name__ == "__main__":
+    import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
@@ -0,0 +1,148 @@
+"""
+TTL + LRU cache for /scrape-multi-source results
+Requests are keyed on a normalized form (query, sorted sources, limit and date
+window). Relative "last N days" windows are keyed on the span the scrape
+actually uses and bucketed by time, so that dashboards asking for the same
+window a few minutes apart share one entry. Lookups also try the previous
+bucket, so a request just after a bucket boundary still finds the entry made
+just before it.
+"""
+
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from env_config import env_float
+
+
+class ResultCache:
+    """Thread-safe LRU cache with per-entry TTL and an approximate memory cap"""
+
+    def __init__(self, ttl_seconds: float = 900, max_bytes: int = 64 * 1024 * 1024):
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (expires_at, size, value)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        return self.get_first([key])
+
+    def get_first(self, keys: List[str]) -> Optional[Any]:
+        """Value of the first key with a live entry; one hit or miss however many keys are tried"""
+        with self._lock:
+            for key in keys:
+                entry = self._entries.get(key)
+                if entry is None:
+                    continue
+                expires_at, size, value = entry
+                if expires_at < time.time():
+                    self._drop(key)
+                    self.expirations += 1
+                    continue
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+            self.misses += 1
+            return None
+
+    def set(self, key: str, value: Any):
+        # Serialized size is a good enough proxy for the memory a result holds
+        size = len(json.dumps(value, default=str))
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (time.time() + self.ttl_seconds, size, value)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._drop(oldest)
+                self.evictions += 1
+
+    def _drop(self, key: str):
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+
+# Relative windows ("last 7 days") started within the same bucket share a key
+WINDOW_BUCKET_SECONDS = env_float("RESULT_CACHE_BUCKET_SECONDS", 600)
+# Spans of the relative windows a scrape supports; any other value scrapes the last week
+WINDOW_DAYS = (1, 7, 30, 365)
+DEFAULT_WINDOW_DAYS = 7
+
+
+def window_days(days: int) -> int:
+    """Span in days a relative window of `days` is scraped over"""
+    return days if days in WINDOW_DAYS else DEFAULT_WINDOW_DAYS
+
+
+def window_key(days: int, begin_date: Optional[str], end_date: Optional[str], buckets_ago: int = 0) -> str:
+    """Normalized date window: explicit dates as-is, relative windows by span and time bucket"""
+    if begin_date and end_date:
+        return f"{begin_date}..{end_date}"
+    bucket = int(time.time() // WINDOW_BUCKET_SECONDS) - buckets_ago
+    return f"last{window_days(days)}d@{bucket}"
+
+
+def request_key(query: str, sources, limit: int, days: int, begin_date: Optional[str], end_date: Optional[str],
+                buckets_ago: int = 0) -> str:
+    """Normalized key for a scrape of (query, sources, limit, window)"""
+    return json.dumps({
+        "query": query.strip().lower(),
+        "sources": sorted({s.strip().lower() for s in sources}),
+        "limit": limit,
+        "window": window_key(days, begin_date, end_date, buckets_ago),
+    }, sort_keys=True)
+
+
+def scrape_request_key(request) -> str:
+    """Cache key for a ScrapeRequest; the response mode (stream) does not matter"""
+    return request_key(
+        request.query, request.sources, request.limit_per_source,
+        request.days, request.begin_date, request.end_date
+    )
+
+
+def scrape_lookup_keys(request) -> List[str]:
+    """Keys a cached result for request may be stored under, the current one first"""
+    keys = [scrape_request_key(request)]
+    if not (request.begin_date and request.end_date):
+        keys.append(request_key(
+            request.query, request.sources, request.limit_per_source,
+            request.days, request.begin_date, request.end_date, buckets_ago=1
+        ))
+    return keys
+
+
+scrape_cache = ResultCache(
+    ttl_seconds=env_float("RESULT_CACHE_TTL_SECONDS", 900),
+    max_bytes=int(env_float("RESULT_CACHE_MAX_MB", 64) * 1024 * 1024)
+)
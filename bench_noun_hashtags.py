@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+CollectPosts - Noun Hashtag Extraction Benchmark
+Compares the old single-string extractor (one concatenated corpus, one
+tokenizer and tagger pass) with the batched extractor at increasing worker
+counts and with a cold and a warm noun lexicon, in posts/sec, and checks
+that every run yields the same top nouns.
+
+Needs the bundled NLTK data (python nltk_setup.py).
+
+Usage:
+    python bench_noun_hashtags.py --posts 5000 --workers 1,2,4
+"""
+
+import argparse
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+from hashtag_extraction import NOUN_TAGS, candidate_words, count_nouns, count_nouns_chunk, post_text
+from noun_lexicon import NounLexicon, use_noun_lexicon
+from nltk_setup import missing_nltk_resources
+
+VOCABULARY = (
+    "senate vote budget bill court ruling governor election campaign policy tariff market stock "
+    "economy inflation price housing rent climate energy battery vehicle charger phone laptop "
+    "update release game console studio player team season coach trade injury league fan "
+    "the a an and is was were has have will would could really just very about with from into "
+    "quickly slowly new old big small good bad strange local national global early late"
+).split()
+
+
+def synthetic_posts(count: int, seed: int = 7) -> list:
+    """Reddit-like posts: a short title and a few sentences of body text"""
+    rng = random.Random(seed)
+
+    def sentence(words: int) -> str:
+        return " ".join(rng.choice(VOCABULARY) for _ in range(words)).capitalize() + "."
+
+    return [
+        {"title": sentence(rng.randint(6, 14)), "content": " ".join(sentence(rng.randint(8, 20)) for _ in range(rng.randint(1, 5)))}
+        for _ in range(count)
+    ]
+
+
+def legacy_count_nouns(posts: list) -> Counter:
+    """The previous extract_noun_hashtags body: quadratic concatenation and one tagger pass"""
+    from nltk.tag import pos_tag
+    all_text = ""
+    for post in posts:
+        all_text += f" {post.get('title', '')} {post.get('content', '')}"
+    return Counter(word for word, pos in pos_tag(candidate_words(all_text)) if pos in NOUN_TAGS)
+
+
+def timed(func) -> tuple:
+    started = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark batched, parallel noun hashtag extraction')
+    parser.add_argument('--posts', type=int, default=5000)
+    parser.add_argument('--workers', default=",".join(str(n) for n in sorted({1, 2, min(4, os.cpu_count() or 1)})),
+                        help='Comma-separated worker counts to measure')
+    parser.add_argument('--chunk-posts', type=int, default=250)
+    parser.add_argument('--top', type=int, default=50, help='Top nouns compared across runs')
+    args = parser.parse_args()
+
+    missing = missing_nltk_resources()
+    if missing:
+        print(f"❌ Missing NLTK resources {missing}; run 'python nltk_setup.py'")
+        return 1
+
+    # Worker scaling is measured with the noun lexicon off (workers inherit the
+    # environment); cold and warm lexicon runs follow in-process
+    os.environ["NOUN_LEXICON_MAX_WORDS"] = "0"
+    use_noun_lexicon(NounLexicon(max_words=0))
+    posts = synthetic_posts(args.posts)
+    worker_counts = [int(n) for n in args.workers.split(",") if n.strip()]
+
+    print("=" * 60)
+    print(f"CollectPosts - Noun Hashtag Benchmark ({args.posts} posts, {os.cpu_count()} CPU(s))")
+    print("=" * 60)
+
+    # Warm up the tokenizer, tagger model and stopwords in this process
+    count_nouns_chunk([post_text(post) for post in posts[:20]])
+
+    legacy, legacy_seconds = timed(lambda: legacy_count_nouns(posts))
+    expected = [noun for noun, _ in legacy.most_common(args.top)]
+    print(f"legacy      {args.posts / legacy_seconds:10.0f} posts/s  ({legacy_seconds:.2f}s)")
+
+    baseline = None
+    mismatches = 0
+    for workers in worker_counts:
+        executor = None
+        if workers > 1:
+            executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+            # Start the workers and load NLTK in each, as a long-running server pool would have
+            list(executor.map(count_nouns_chunk, [[post_text(post)] for post in posts[:workers * 4]]))
+        try:
+            counts, seconds = timed(lambda: count_nouns(posts, chunk_posts=args.chunk_posts,
+                                                        parallel=workers > 1, executor=executor))
+        finally:
+            if executor is not None:
+                executor.shutdown()
+        baseline = baseline or seconds
+        top = [noun for noun, _ in counts.most_common(args.top)]
+        same = len(set(top) & set(expected))
+        mismatches += same < len(expected)
+        print(f"workers={workers:<4}{args.posts / seconds:10.0f} posts/s  ({seconds:.2f}s)  "
+              f"{baseline / seconds:4.1f}x vs 1 worker  top-{args.top} overlap {same}/{len(expected)}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        lexicon = NounLexicon(os.path.join(tmp, "noun_lexicon.json"))
+        use_noun_lexicon(lexicon)
+        for label in ("cold lexicon", "warm lexicon"):
+            counts, seconds = timed(lambda: count_nouns(posts, chunk_posts=args.chunk_posts, parallel=False))
+            top = [noun for noun, _ in counts.most_common(args.top)]
+            same = len(set(top) & set(expected))
+            mismatches += same < len(expected)
+            print(f"{label:12}{args.posts / seconds:10.0f} posts/s  ({seconds:.2f}s)  "
+                  f"{baseline / seconds:4.1f}x vs 1 worker  top-{args.top} overlap {same}/{len(expected)}  "
+                  f"lexicon hits {lexicon.stats()['lookup_hit_rate']:.0%}")
+
+    print("=" * 60)
+    if mismatches:
+        print("⚠️ Some runs ranked different top nouns (chunking and the lexicon change tagger context)")
+    else:
+        print("✅ Every run produced the same top nouns as the legacy extractor")
+    print("=" * 60)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+CollectPosts - Reddit Listing Benchmark
+Compares the praw Submission path with the raw-JSON projection path
+(reddit_raw_listing) in items/sec and peak traced memory, holding every item
+in memory the way the scraper and listing cache do.
+
+Usage:
+    python bench_reddit_listing.py --offline --items 10000
+    python bench_reddit_listing.py --subreddit politics --items 1000
+"""
+
+import argparse
+import gc
+import sys
+import time
+import tracemalloc
+
+from reddit_raw_listing import author_name, fetch_raw_listing, project_listing
+
+FIELDS = ("id", "title", "selftext", "permalink", "score", "created_utc")
+
+
+def synthetic_listing(count: int, start: int = 0) -> dict:
+    """Listing JSON shaped like Reddit's, including the ~100 fields of a real t3 child"""
+    children = []
+    for i in range(start, start + count):
+        data = {
+            "id": format(i + 36 ** 6, "x"), "name": f"t3_{i + 36 ** 6:x}", "title": f"Post title number {i} about something",
+            "selftext": "Some body text for the post. " * 8, "selftext_html": "<div>Some body text</div>" * 8,
+            "author": f"user{i % 5000}", "author_fullname": f"t2_{i % 5000:x}", "permalink": f"/r/bench/comments/{i:x}/post_{i}/",
+            "url": f"https://www.reddit.com/r/bench/comments/{i:x}/post_{i}/", "score": i % 1000, "ups": i % 1000, "downs": 0,
+            "created_utc": 1700000000.0 + i, "created": 1700000000.0 + i, "subreddit": "bench", "subreddit_id": "t5_2qh1i",
+            "subreddit_name_prefixed": "r/bench", "subreddit_type": "public", "subreddit_subscribers": 123456,
+            "num_comments": i % 300, "num_crossposts": 0, "upvote_ratio": 0.93, "domain": "self.bench", "is_self": True,
+            "over_18": False, "spoiler": False, "locked": False, "stickied": False, "archived": False, "pinned": False,
+            "thumbnail": "self", "thumbnail_height": None, "thumbnail_width": None, "edited": False, "distinguished": None,
+            "link_flair_text": None, "link_flair_css_class": None, "link_flair_richtext": [], "link_flair_type": "text",
+            "link_flair_text_color": "dark", "link_flair_background_color": "", "author_flair_text": None,
+            "author_flair_css_class": None, "author_flair_richtext": [], "author_flair_type": "text",
+            "author_flair_template_id": None, "author_flair_text_color": None, "author_flair_background_color": None,
+            "author_premium": False, "author_patreon_flair": False, "author_is_blocked": False,
+            "gilded": 0, "gildings": {}, "all_awardings": [], "awarders": [], "total_awards_received": 0,
+            "top_awarded_type": None, "treatment_tags": [], "user_reports": [], "mod_reports": [], "num_reports": None,
+            "report_reasons": None, "media": None, "media_embed": {}, "secure_media": None, "secure_media_embed": {},
+            "media_only": False, "is_video": False, "is_reddit_media_domain": False, "is_meta": False,
+            "is_original_content": False, "is_created_from_ads_ui": False, "is_crosspostable": True,
+            "is_robot_indexable": True, "category": None, "content_categories": None, "discussion_type": None,
+            "suggested_sort": None, "view_count": None, "visited": False, "saved": False, "clicked": False,
+            "hidden": False, "hide_score": False, "likes": None, "quarantine": False, "no_follow": False,
+            "send_replies": True, "contest_mode": False, "can_gild": False, "can_mod_post": False,
+            "allow_live_comments": False, "approved_at_utc": None, "approved_by": None, "banned_at_utc": None,
+            "banned_by": None, "removed_by": None, "removed_by_category": None, "removal_reason": None,
+            "mod_note": None, "mod_reason_by": None, "mod_reason_title": None, "pwls": 6, "wls": 6,
+        }
+        children.append({"kind": "t3", "data": data})
+    return {"kind": "Listing", "data": {"after": None, "before": None, "dist": count, "children": children}}
+
+
+def read_fields(items) -> int:
+    """Touch every field the scraper reads, as it would when building post dicts"""
+    total = 0
+    for item in items:
+        for field in FIELDS:
+            getattr(item, field, None)
+        author_name(item)
+        total += 1
+    return total
+
+
+def measure(label: str, load) -> dict:
+    """Run load() -> items, returning items/sec and peak traced memory while holding them"""
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    items = load()
+    count = read_fields(items)
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del items
+    return {
+        "label": label,
+        "items": count,
+        "items_per_sec": count / elapsed if elapsed else 0.0,
+        "peak_mb": peak / (1024 * 1024),
+    }
+
+
+def offline_loaders(item_count: int, page_size: int = 100):
+    """Both paths over identical pre-parsed JSON pages (object construction cost only)"""
+    import praw
+    reddit = praw.Reddit(client_id="bench", client_secret="bench", user_agent="bench")
+    pages = [synthetic_listing(page_size, start) for start in range(0, item_count, page_size)]
+
+    def praw_path():
+        items = []
+        for page in pages:
+            items.extend(reddit._objector.objectify(data=page))
+        return items
+
+    def raw_path():
+        items = []
+        for page in pages:
+            records, _ = project_listing(page)
+            items.extend(records)
+        return items
+
+    return praw_path, raw_path
+
+
+def live_loaders(subreddit: str, item_count: int):
+    """praw subreddit.top() vs raw pages of the same listing (includes network time)"""
+    from reddit_client import get_reddit_pool
+    pool = get_reddit_pool()
+    reddit = pool.acquire()
+
+    def praw_path():
+        return list(reddit.subreddit(subreddit).top(limit=item_count, time_filter="all"))
+
+    def raw_path():
+        items, after = [], None
+        while len(items) < item_count:
+            params = {"limit": 100, "t": "all"}
+            if after:
+                params["after"] = after
+            records, after = fetch_raw_listing(reddit, f"r/{subreddit}/top", params)
+            items.extend(records)
+            if not records or not after:
+                break
+        return items[:item_count]
+
+    return praw_path, raw_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare praw and raw-JSON Reddit listing paths')
+    parser.add_argument('--items', type=int, default=10000)
+    parser.add_argument('--offline', action='store_true',
+                        help='Use synthetic listing JSON (no network, measures object construction only)')
+    parser.add_argument('--subreddit', default='politics')
+    parser.add_argument('--runs', type=int, default=3)
+    args = parser.parse_args()
+
+    if args.offline:
+        praw_path, raw_path = offline_loaders(args.items)
+    else:
+        praw_path, raw_path = live_loaders(args.subreddit, args.items)
+
+    print("=" * 60)
+    print(f"CollectPosts - Reddit Listing Benchmark ({'offline' if args.offline else 'r/' + args.subreddit})")
+    print("=" * 60)
+
+    best = {}
+    for run in range(args.runs):
+        for label, load in [("praw", praw_path), ("raw", raw_path)]:
+            result = measure(label, load)
+            print(f"Run {run + 1} {label:5} {result['items']:6} items  "
+                  f"{result['items_per_sec']:10.0f} items/s  peak {result['peak_mb']:7.1f} MB")
+            if label not in best or result["items_per_sec"] > best[label]["items_per_sec"]:
+                best[label] = result
+
+    print("=" * 60)
+    speedup = best["raw"]["items_per_sec"] / best["praw"]["items_per_sec"] if best["praw"]["items_per_sec"] else 0.0
+    memory = best["praw"]["peak_mb"] / best["raw"]["peak_mb"] if best["raw"]["peak_mb"] else 0.0
+    print(f"raw vs praw: {speedup:.1f}x items/sec, {memory:.1f}x less peak memory")
+    print("=" * 60)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+CollectPosts - Startup Time Benchmark
+Boots the API with uvicorn and measures the time until /health answers.
+
+Usage:
+    python bench_startup.py --runs 3 --max-seconds 10
+"""
+
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+import requests
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def measure_startup(timeout: float = 120.0) -> float:
+    """Seconds from process launch until GET /health returns 200"""
+    port = free_port()
+    started = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "api.main:app", "--host", "127.0.0.1", "--port", str(port)],
+        cwd=ROOT,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL
+    )
+    try:
+        while time.perf_counter() - started < timeout:
+            if proc.poll() is not None:
+                raise RuntimeError(f"uvicorn exited with code {proc.returncode}")
+            try:
+                if requests.get(f"http://127.0.0.1:{port}/health", timeout=1).status_code == 200:
+                    return time.perf_counter() - started
+            except requests.exceptions.RequestException:
+                pass
+            time.sleep(0.05)
+        raise TimeoutError(f"/health did not answer within {timeout:.0f}s")
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure API cold start time')
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--max-seconds', type=float, default=None,
+                        help='Fail if the median startup time exceeds this')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("CollectPosts - Startup Benchmark")
+    print("=" * 60)
+
+    timings = []
+    for run in range(args.runs):
+        elapsed = measure_startup()
+        timings.append(elapsed)
+        print(f"Run {run + 1}: {elapsed:.2f}s until /health")
+
+    median = statistics.median(timings)
+    print("=" * 60)
+    print(f"Median: {median:.2f}s  Min: {min(timings):.2f}s  Max: {max(timings):.2f}s")
+    print("=" * 60)
+
+    if args.max_seconds is not None and median > args.max_seconds:
+        print(f"FAIL: median startup {median:.2f}s exceeds {args.max_seconds:.2f}s")
+        return 1
+    print("PASS")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,21 @@
+"""
+Numeric settings from environment variables
+A malformed value falls back to the default instead of failing at import.
+"""
+
+import os
+
+
+def env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, default))
+    except ValueError:
+        return default
+
+
+def env_int(name: str, default: int, minimum: int = 1) -> int:
+    """Integer setting, at least `minimum` (pool sizes and chunk lengths cannot be 0)"""
+    try:
+        return max(minimum, int(os.getenv(name, default)))
+    except ValueError:
+        return default
@@ -0,0 +1,127 @@
+"""
+Incremental TF-IDF hashtag accumulator
+Keeps document and term frequencies of Reddit posts as they arrive, so the
+enhanced hashtag bank is available at any moment without refitting a
+TfidfVectorizer over the whole corpus. Accumulators built by parallel
+subreddit workers can be merged.
+
+Scoring follows the vectorizer it replaces: words of 4+ letters that are not
+stopwords, terms found in more than MAX_DF of the posts dropped, the
+MAX_FEATURES most frequent remaining terms kept, and those ranked by summed
+smoothed TF-IDF of L2-normalized post vectors. Each post is normalized once,
+when it is added, with the IDFs known at that moment, and its share is added
+to a running per-term sum; reading the bank only multiplies those sums by the
+current IDFs. That makes scores an approximation of a refit (early posts are
+normalized with IDFs of a small sample, merged workers' posts with the IDFs
+of their own subreddit) which converges as posts arrive, and the ranked bank
+is cached until the next post is added. Ties are broken
+alphabetically.
+"""
+
+import heapq
+import math
+import re
+import threading
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+TOKEN_PATTERN = re.compile(r'\b[a-z]{4,}\b')
+MAX_DF = 0.6
+MAX_FEATURES = 100
+
+CUSTOM_STOPWORDS = {
+    'trump', 'biden', 'like', 'just', 'know', 'think', 'thing', 'things', 'people', 'said', 'also',
+    'would', 'could', 'should', 'still', 'even', 'one', 'get', 'going', 'see', 'say', 'make', 'made',
+    'want', 'need', 'much', 'many', 'really', 'got', 'look', 'take', 'though', 'well', 'without',
+    'every', 'around', 'another', 'others', 'done', 'being', 'next', 'used', 'new', 'time', 'way',
+    'good', 'great', 'best', 'better', 'bad', 'worst', 'right', 'wrong', 'true', 'false', 'real',
+    'fake', 'news', 'post', 'comment', 'reddit', 'user', 'subreddit', 'thread', 'discussion'
+}
+
+_stop_words = None
+
+
+def get_stop_words() -> frozenset:
+    """scikit-learn's English stopwords plus the Reddit-specific list (sklearn is imported on first use)"""
+    global _stop_words
+    if _stop_words is None:
+        from sklearn.feature_extraction.text import ENGLISH_STOP_WORDS
+        _stop_words = frozenset(ENGLISH_STOP_WORDS | CUSTOM_STOPWORDS)
+    return _stop_words
+
+
+def post_terms(post: Dict) -> Counter:
+    """Term counts of one post"""
+    from reddit_scraper import preprocess_text
+    text = preprocess_text(post.get("title", "")) + " " + preprocess_text(post.get("content", ""))
+    stop_words = get_stop_words()
+    return Counter(word for word in TOKEN_PATTERN.findall(text) if word not in stop_words)
+
+
+class HashtagAccumulator:
+    """Thread-safe running document frequency, term frequency and per-term normalized TF sums"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.documents = 0
+        self.df: Counter = Counter()
+        self.tf: Counter = Counter()
+        # Sum over posts of count / (post's TF-IDF norm when it was added); times the IDF gives the score
+        self.weights: Counter = Counter()
+        self._ranked: Optional[Tuple[int, List[Tuple[str, float]]]] = None
+
+    def add_post(self, post: Dict):
+        self._add_terms(post_terms(post))
+
+    def add_posts(self, posts: Iterable[Dict]):
+        # Tokenize outside the lock; only the counter updates are serialized
+        for terms in [post_terms(post) for post in posts]:
+            self._add_terms(terms)
+
+    def _idf(self, term: str) -> float:
+        return math.log((1 + self.documents) / (1 + self.df[term])) + 1
+
+    def _add_terms(self, terms: Counter):
+        with self._lock:
+            self.documents += 1
+            self.df.update(terms.keys())
+            self.tf.update(terms)
+            norm = math.sqrt(sum((count * self._idf(term)) ** 2 for term, count in terms.items()))
+            for term, count in terms.items():
+                self.weights[term] += count / norm
+            self._ranked = None
+
+    def merge(self, other: "HashtagAccumulator"):
+        """Fold in another accumulator (e.g. from a parallel subreddit worker)"""
+        with other._lock:
+            documents, df, tf, weights = other.documents, Counter(other.df), Counter(other.tf), Counter(other.weights)
+        with self._lock:
+            self.documents += documents
+            self.df.update(df)
+            self.tf.update(tf)
+            self.weights.update(weights)
+            self._ranked = None
+
+    def top_terms(self, k: int) -> List[Tuple[str, float]]:
+        """(term, score) of the k best terms right now, highest score first"""
+        with self._lock:
+            if self._ranked is None or self._ranked[0] != MAX_FEATURES:
+                max_df = MAX_DF * self.documents
+                eligible = [(term, count) for term, count in self.tf.items() if self.df[term] <= max_df]
+                features = heapq.nsmallest(MAX_FEATURES, eligible, key=lambda item: (-item[1], item[0]))
+                scored = [(term, self.weights[term] * self._idf(term)) for term, _ in features]
+                self._ranked = (MAX_FEATURES, sorted(scored, key=lambda item: (-item[1], item[0])))
+            return self._ranked[1][:k]
+
+    def hashtags(self, k: int) -> List[str]:
+        return [f"#{term}" for term, _ in self.top_terms(k)]
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {"documents": self.documents, "terms": len(self.df)}
+
+
+def accumulate(posts: Iterable[Dict], accumulator: Optional[HashtagAccumulator] = None) -> HashtagAccumulator:
+    accumulator = accumulator or HashtagAccumulator()
+    accumulator.add_posts(posts)
+    return accumulator
@@ -0,0 +1,163 @@
+"""
+Batched noun extraction for hashtag banks
+Every post is tokenized and POS-tagged on its own instead of as part of one
+concatenated corpus string. Posts are grouped into chunks only as units of
+work: large corpora spread the chunks across a process pool (the averaged
+perceptron tagger is pure Python, so threads would not help) and the
+per-chunk noun counters are merged in chunk order, which keeps the ranking
+of equally frequent nouns identical to a sequential run. Words the tagger
+has already classified are looked up in the noun lexicon (noun_lexicon.py)
+instead of being tagged again; only posts whose words are mostly unknown
+are tagged as a whole.
+
+    NOUN_POOL_WORKERS       worker processes (default min(4, cpu count))
+    NOUN_CHUNK_POSTS        posts per chunk (default 250)
+    NOUN_PARALLEL_MIN_POSTS corpora smaller than this are tagged in-process (default 1000)
+"""
+
+import multiprocessing
+import os
+import threading
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from env_config import env_int
+from noun_lexicon import get_noun_lexicon
+
+NOUN_TAGS = {"NN", "NNS", "NNP", "NNPS"}
+
+NOUN_POOL_WORKERS = env_int("NOUN_POOL_WORKERS", min(4, os.cpu_count() or 1))
+CHUNK_POSTS = env_int("NOUN_CHUNK_POSTS", 250)
+PARALLEL_MIN_POSTS = env_int("NOUN_PARALLEL_MIN_POSTS", 1000)
+# Posts with more unknown words than this share are tagged as a whole
+MAX_UNKNOWN_SHARE = 0.5
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+_stop_words = None
+
+
+def post_text(post: Dict) -> str:
+    return f"{post.get('title', '')} {post.get('content', '')}"
+
+
+def _get_stop_words() -> set:
+    global _stop_words
+    if _stop_words is None:
+        from nltk_setup import configure_nltk_data
+        configure_nltk_data()
+        from nltk.corpus import stopwords
+        _stop_words = set(stopwords.words('english'))
+    return _stop_words
+
+
+def candidate_words(text: str) -> List[str]:
+    """Lowercased alphabetic tokens longer than two letters that are not stopwords"""
+    from nltk.tokenize import word_tokenize
+    stop_words = _get_stop_words()
+    return [word for word in word_tokenize(text.lower()) if word.isalpha() and word not in stop_words and len(word) > 2]
+
+
+def _merge_observations(learned: Dict[str, List[int]], observations: Dict[str, List[int]]) -> None:
+    for word, (nouns, others) in observations.items():
+        observed = learned.setdefault(word, [0, 0])
+        observed[0] += nouns
+        observed[1] += others
+
+
+def count_nouns_chunk(texts: List[str]) -> Tuple[Counter, Dict[str, List[int]]]:
+    """
+    Noun counts of one chunk of post texts, plus the tagger observations made
+    ({word: [noun, other]}); runs in a worker process for large corpora.
+    Known words are counted by lookup, each occurrence weighted by the word's
+    noun share. Posts whose words are mostly unknown are POS-tagged as a whole;
+    the unknown words of the other posts are tagged on their own, once per chunk.
+    """
+    from nltk.tag import pos_tag, pos_tag_sents
+    lexicon = get_noun_lexicon()
+    lexicon.reload_if_changed()
+
+    counts = Counter()
+    learned: Dict[str, List[int]] = {}
+    leftover = Counter()
+    for text in texts:
+        words = candidate_words(text)
+        shares = lexicon.noun_shares(words)
+        unknown = [word for word, share in zip(words, shares) if share is None]
+        if words and len(unknown) > MAX_UNKNOWN_SHARE * len(words):
+            observations: Dict[str, List[int]] = {}
+            for word, pos in pos_tag(words):
+                observed = observations.setdefault(word, [0, 0])
+                if pos in NOUN_TAGS:
+                    counts[word] += 1
+                    observed[0] += 1
+                else:
+                    observed[1] += 1
+            # Later posts of the same chunk can already use these
+            lexicon.merge(observations)
+            _merge_observations(learned, observations)
+            continue
+        for word, share in zip(words, shares):
+            if share:
+                counts[word] += share
+        leftover.update(unknown)
+
+    if leftover:
+        # Context-free tags for the few unknown words of mostly known posts
+        observations = {}
+        for [(word, pos)] in pos_tag_sents([[word] for word in leftover]):
+            is_noun = pos in NOUN_TAGS
+            if is_noun:
+                counts[word] += leftover[word]
+            observations[word] = [int(is_noun), int(not is_noun)]
+        lexicon.merge(observations)
+        _merge_observations(learned, observations)
+    return counts, learned
+
+
+def get_noun_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn keeps the children clean of the server's threads and sockets
+            _pool = ProcessPoolExecutor(
+                max_workers=NOUN_POOL_WORKERS,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return _pool
+
+
+def shutdown_noun_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+def count_nouns(posts: List[Dict], chunk_posts: int = CHUNK_POSTS, parallel: Optional[bool] = None,
+                executor: Optional[ProcessPoolExecutor] = None) -> Counter:
+    """
+    Noun frequencies over all posts
+    parallel=None tags corpora of PARALLEL_MIN_POSTS or more on the process
+    pool (executor, or the shared pool) and smaller ones in-process.
+    """
+    texts = [post_text(post) for post in posts]
+    chunks = [texts[i:i + chunk_posts] for i in range(0, len(texts), max(1, chunk_posts))]
+    if parallel is None:
+        parallel = len(texts) >= PARALLEL_MIN_POSTS and NOUN_POOL_WORKERS > 1
+
+    lexicon = get_noun_lexicon()
+    counts = Counter()
+    if not parallel or len(chunks) < 2:
+        for chunk in chunks:
+            chunk_counts, _ = count_nouns_chunk(chunk)
+            counts.update(chunk_counts)
+    else:
+        # map() yields in chunk order, so ties keep their first-seen order
+        for chunk_counts, learned in (executor or get_noun_pool()).map(count_nouns_chunk, chunks):
+            counts.update(chunk_counts)
+            lexicon.merge(learned)
+    lexicon.save()
+    return counts
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+CollectPosts - Reddit Dump Ingestion
+Streams monthly Reddit submission dumps (zstd-compressed NDJSON, e.g.
+RS_2023-01.zst) into the local post store, so deep historical windows are
+answered locally instead of through Reddit listings capped at ~1000 items.
+
+Each file is decompressed as a stream and written in fixed-size batches, so
+memory stays bounded whatever the file size; files are processed in
+parallel worker processes. A file's time span is recorded as coverage only
+after it was read completely.
+
+Usage:
+    python ingest_reddit_dumps.py dumps/RS_2023-*.zst --workers 4
+    python ingest_reddit_dumps.py dumps/RS_2023-01.zst --subreddits politics,technology
+"""
+
+import argparse
+import glob
+import io
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, Optional, Set
+
+from post_store import ALL_SUBREDDITS, PostStore, STORE_PATH, post_row
+
+BATCH_SIZE = 5000
+# Pushshift-style dumps are compressed with a long window
+MAX_WINDOW_SIZE = 2 ** 31
+
+
+def iter_dump_lines(path: str):
+    """Decompress a .zst NDJSON file line by line without loading it"""
+    import zstandard
+    with open(path, "rb") as fh:
+        reader = zstandard.ZstdDecompressor(max_window_size=MAX_WINDOW_SIZE).stream_reader(fh)
+        for line in io.TextIOWrapper(reader, encoding="utf-8", errors="replace"):
+            if line.strip():
+                yield line
+
+
+def ingest_file(path: str, store_path: str, subreddits: Optional[Set[str]] = None,
+                batch_size: int = BATCH_SIZE) -> Dict:
+    """Ingest one dump file; runs in a worker process with its own store connection"""
+    store = PostStore(store_path)
+    started = time.time()
+    read = kept = bad = 0
+    first = last = None
+    batch = []
+
+    for line in iter_dump_lines(path):
+        read += 1
+        try:
+            data = json.loads(line)
+            created = int(float(data["created_utc"]))
+        except (ValueError, KeyError, TypeError):
+            bad += 1
+            continue
+        first = created if first is None else min(first, created)
+        last = created if last is None else max(last, created)
+        if subreddits is not None and str(data.get("subreddit", "")).lower() not in subreddits:
+            continue
+
+        # Dump rows are older than anything the live stream or refresh job wrote
+        retrieved = data.get("retrieved_on") or data.get("retrieved_utc") or created
+        batch.append(post_row(data, "dump", updated_utc=int(float(retrieved))))
+        kept += 1
+        if len(batch) >= batch_size:
+            store.upsert_posts(batch)
+            batch = []
+
+    if batch:
+        store.upsert_posts(batch)
+
+    if first is not None:
+        for subreddit in (sorted(subreddits) if subreddits is not None else [ALL_SUBREDDITS]):
+            store.add_coverage(subreddit, first, last, f"dump:{os.path.basename(path)}")
+
+    return {
+        "file": path,
+        "lines": read,
+        "kept": kept,
+        "bad": bad,
+        "seconds": round(time.time() - started, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Ingest zstd NDJSON Reddit submission dumps into the local store')
+    parser.add_argument('files', nargs='+', help='Dump files or glob patterns (RS_YYYY-MM.zst)')
+    parser.add_argument('--subreddits', default=None,
+                        help='Comma-separated subreddits to keep (default: all)')
+    parser.add_argument('--workers', type=int, default=min(4, os.cpu_count() or 1),
+                        help='Files processed in parallel')
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+    parser.add_argument('--store', default=STORE_PATH, help='SQLite store path')
+    args = parser.parse_args()
+
+    files = sorted({f for pattern in args.files for f in (glob.glob(pattern) or [pattern])})
+    missing = [f for f in files if not os.path.exists(f)]
+    if missing:
+        print(f"❌ Files not found: {missing}")
+        return 1
+    subreddits = {s.strip().lower() for s in args.subreddits.split(",") if s.strip()} if args.subreddits else None
+
+    print("=" * 60)
+    print("CollectPosts - Reddit Dump Ingestion")
+    print("=" * 60)
+    print(f"📦 {len(files)} file(s) -> {args.store} with {args.workers} worker(s)")
+    if subreddits:
+        print(f"🔍 Keeping {len(subreddits)} subreddit(s): {sorted(subreddits)[:10]}")
+
+    PostStore(args.store)  # create the schema once before workers race for it
+    started = time.time()
+    failures = 0
+    with ProcessPoolExecutor(max_workers=max(1, args.workers)) as executor:
+        futures = {
+            executor.submit(ingest_file, path, args.store, subreddits, args.batch_size): path
+            for path in files
+        }
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+                print(f"✅ {os.path.basename(result['file'])}: kept {result['kept']:,} of {result['lines']:,} "
+                      f"lines ({result['bad']} bad) in {result['seconds']}s")
+            except Exception as e:
+                failures += 1
+                print(f"❌ {futures[future]}: {e}")
+
+    stats = PostStore(args.store).stats()
+    print("=" * 60)
+    print(f"Store: {stats['posts']:,} posts, {stats['coverage_ranges']} coverage range(s), "
+          f"{time.time() - started:.1f}s total")
+    print("=" * 60)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,5 @@
 import os
 import random
-import instaloader
 from datetime import datetime, timedelta
 from typing import List, Dict
 
@@ -34,6 +33,8 @@ def collect_instagram_posts(
     Instagram scraper with .top() equivalent methods
     Uses 'top' hashtag posts and popular content
     """
+    import instaloader  # heavy; only needed once Instagram is actually scraped
+    
     posts = []
     seen_urls = set()
     
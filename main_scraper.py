@@ -4,7 +4,8 @@ CollectPosts - Social Media Scraper
 Main runner script following the exact flow:
 1. Scrape Reddit with overlapper
 2. Generate hashtag bank (noun-only)
-3. Use hashtags to scrape other sources
+3. Use hashtags to scrape other sources (started as soon as the bank of the
+   first Reddit posts settles, while Reddit collection continues)
 4. Filter by date range
 5. Randomly select posts (except YouTube hard limit)
 """
@@ -20,10 +21,8 @@ import pandas as pd
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from reddit_scraper import collect_reddit_posts_with_overlapper, extract_noun_hashtags, scrape_all_sources_via_reddit
-from youtube_scraper import collect_youtube_video_titles
-from instagram_scraper import collect_instagram_posts
-from quora_scraper import scrape_quora
-from threads_scraper import scrape_threads
+from source_fanout import iter_source_results
+from scrape_pipeline import PipelinedScrape, noun_stabilizer, pipeline_enabled, sample_size, tfidf_stabilizer
 
 def get_date_range(begin_date_str: str = None, end_date_str: str = None, time_period: str = "week") -> tuple:
     """Get begin and end dates"""
@@ -96,88 +95,96 @@ def main():
     
     all_posts = []
     hashtag_bank = []
+    other_sources = [source for source in args.sources if source != 'reddit']
+    limits = {source: args.limit for source in other_sources}
+    limits['youtube'] = args.youtube_limit
     
-    if args.enhanced:
-        print("🔍 Step 1: Scraping Reddit with enhanced overlapper...")
-        all_posts, hashtag_bank = scrape_all_sources_via_reddit(
-            seed_subreddit=args.subreddit,
-            time_period=args.time_period_enhanced,
-            post_limit=args.post_limit,
-            begin_date=begin_date,
-            end_date=end_date
-        )
-        print(f"✅ Reddit: {len(all_posts)} posts collected")
-        print(f"✅ Hashtag bank: {len(hashtag_bank)} hashtags generated\n")
-    else:
-        if 'reddit' in args.sources:
-            print("🔍 Step 1: Scraping Reddit with overlapper...")
-            reddit_posts = collect_reddit_posts_with_overlapper(
-                subreddit_name=args.subreddit,
+    def collect_reddit(on_posts=None, extract=extract_noun_hashtags):
+        """Step 1 + 2: Reddit posts and the hashtag bank built from them (noun banks by extract)"""
+        if args.enhanced:
+            print("🔍 Step 1: Scraping Reddit with enhanced overlapper...")
+            posts, bank = scrape_all_sources_via_reddit(
+                seed_subreddit=args.subreddit,
+                time_period=args.time_period_enhanced,
+                post_limit=args.post_limit,
                 begin_date=begin_date,
                 end_date=end_date,
-                limit=args.limit
+                on_posts=on_posts,
+                on_subreddits=subreddits.extend
             )
-            reddit_posts = filter_posts_by_date(reddit_posts, begin_date, end_date)
-            reddit_posts = random_sample_posts(reddit_posts, args.limit, 'reddit')
-            all_posts.extend(reddit_posts)
-            print(f"✅ Reddit: {len(reddit_posts)} posts collected")
-            
-            print("\n🏷️ Step 2: Generating noun-only hashtag bank...")
-            hashtag_bank = extract_noun_hashtags(reddit_posts)
-            print(f"✅ Hashtag bank: {len(hashtag_bank)} noun hashtags generated\n")
+            print(f"✅ Reddit: {len(posts)} posts collected")
+            print(f"✅ Hashtag bank: {len(bank)} hashtags generated\n")
+            return posts, bank
+        
+        print("🔍 Step 1: Scraping Reddit with overlapper...")
+        posts = collect_reddit_posts_with_overlapper(
+            subreddit_name=args.subreddit,
+            begin_date=begin_date,
+            end_date=end_date,
+            limit=args.limit,
+            on_posts=on_posts
+        )
+        posts = filter_posts_by_date(posts, begin_date, end_date)
+        posts = random_sample_posts(posts, args.limit, 'reddit')
+        print(f"✅ Reddit: {len(posts)} posts collected")
+        
+        print("\n🏷️ Step 2: Generating noun-only hashtag bank...")
+        bank = extract(posts)
+        print(f"✅ Hashtag bank: {len(bank)} noun hashtags generated\n")
+        return posts, bank
     
-    if len(hashtag_bank) > 0 and len(args.sources) > 1:
+    def run_sources(bank):
+        """Step 3: the other sources, all at once, driven by the hashtag bank"""
+        if not bank:
+            return iter(())
         print("🔍 Step 3: Scraping other sources using hashtag bank...")
-        for source in args.sources:
+        return iter_source_results(
+            sources=other_sources,
+            query=args.subreddit,
+            hashtags=bank,
+            limits=limits,
+            begin_date=begin_date,
+            end_date=end_date,
+            time_passed=args.time_period
+        )
+    
+    def add_source_posts(source, posts, error):
+        if error:
+            print(f"❌ Error scraping {source}: {error}")
+            return
+        posts = filter_posts_by_date(posts, begin_date, end_date)
+        posts = random_sample_posts(posts, args.limit, source)
+        all_posts.extend(posts)
+        print(f"✅ {source.upper()}: {len(posts)} posts collected")
+    
+    subreddits = [args.subreddit]
+    run_reddit = args.enhanced or 'reddit' in args.sources
+    if run_reddit and other_sources and pipeline_enabled():
+        # Other sources start once the hashtag bank of the first Reddit posts settles
+        if args.enhanced:
+            stabilizer = tfidf_stabilizer(subreddits, min_posts=sample_size(args.post_limit))
+        else:
+            stabilizer = noun_stabilizer(min_posts=sample_size(args.limit))
+        # The final noun bank reuses the stabilizer's counts instead of tagging the posts again
+        pipeline = PipelinedScrape(
+            lambda on_posts: collect_reddit(on_posts, lambda posts: stabilizer.final_bank(posts, extract_noun_hashtags)),
+            run_sources, stabilizer
+        )
+        for source, posts, error in pipeline:
             if source == 'reddit':
-                continue
-            
-            print(f"\n📱 Scraping {source.upper()}...")
-            try:
-                if source == 'youtube':
-                    posts = collect_youtube_video_titles(
-                        query=args.subreddit,
-                        hashtags=hashtag_bank,
-                        max_results=args.youtube_limit,
-                        begin_date=begin_date,
-                        end_date=end_date
-                    )
-                elif source == 'instagram':
-                    posts = collect_instagram_posts(
-                        query=args.subreddit,
-                        hashtags=hashtag_bank,
-                        max_posts=args.limit,
-                        begin_date=begin_date,
-                        end_date=end_date
-                    )
-                elif source == 'quora':
-                    posts = scrape_quora(
-                        query=args.subreddit,
-                        hashtags=hashtag_bank,
-                        time_passed=args.time_period,
-                        limit=args.limit,
-                        begin_date=begin_date,
-                        end_date=end_date
-                    )
-                elif source == 'threads':
-                    posts = scrape_threads(
-                        query=args.subreddit,
-                        hashtags=hashtag_bank,
-                        time_passed=args.time_period,
-                        limit=args.limit,
-                        begin_date=begin_date,
-                        end_date=end_date
-                    )
-                else:
-                    continue
-                
-                posts = filter_posts_by_date(posts, begin_date, end_date)
-                posts = random_sample_posts(posts, args.limit, source)
+                if error:
+                    print(f"❌ Error scraping Reddit: {error}")
                 all_posts.extend(posts)
-                print(f"✅ {source.upper()}: {len(posts)} posts collected")
-            except Exception as e:
-                print(f"❌ Error scraping {source}: {e}")
-                continue
+                hashtag_bank = pipeline.reddit_bank
+            else:
+                add_source_posts(source, posts, error)
+    else:
+        if run_reddit:
+            all_posts, hashtag_bank = collect_reddit()
+            all_posts = list(all_posts)
+        if len(hashtag_bank) > 0 and other_sources:
+            for source, posts, error in run_sources(hashtag_bank):
+                add_source_posts(source, posts, error)
     
     print(f"\n📊 Final Results:")
     print(f"Total posts: {len(all_posts)}")
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Bundled NLTK data for hashtag extraction
+Only the three resources extract_noun_hashtags needs (punkt_tab, the averaged
+perceptron tagger and stopwords) are vendored into a local data directory at
+build time, so the server never has to download anything when it boots.
+
+Build step:
+    python nltk_setup.py
+"""
+
+import os
+import sys
+from typing import List
+
+NLTK_DATA_DIR = os.getenv(
+    "NLTK_DATA",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "nltk_data")
+)
+
+# Download name -> resource path checked with nltk.data.find. These are the
+# names NLTK 3.9+ looks up (requirements.txt pins nltk>=3.9); older releases
+# used punkt and averaged_perceptron_tagger instead
+NLTK_RESOURCES = {
+    "punkt_tab": "tokenizers/punkt_tab",
+    "averaged_perceptron_tagger_eng": "taggers/averaged_perceptron_tagger_eng",
+    "stopwords": "corpora/stopwords",
+}
+
+
+def configure_nltk_data():
+    """Put the bundled data directory first on NLTK's search path (no network)"""
+    import nltk
+    if NLTK_DATA_DIR not in nltk.data.path:
+        nltk.data.path.insert(0, NLTK_DATA_DIR)
+
+
+def missing_nltk_resources() -> List[str]:
+    """Names of required resources that cannot be found locally"""
+    # Checking the bundle on disk first avoids importing nltk (slow) at startup
+    missing = [
+        name for name, resource in NLTK_RESOURCES.items()
+        if not os.path.isdir(os.path.join(NLTK_DATA_DIR, resource))
+    ]
+    if not missing:
+        return []
+
+    # Not bundled - it may still be installed in one of NLTK's default locations
+    import nltk
+    configure_nltk_data()
+    still_missing = []
+    for name in missing:
+        try:
+            nltk.data.find(NLTK_RESOURCES[name])
+        except LookupError:
+            still_missing.append(name)
+    return still_missing
+
+
+def download_nltk_data(target_dir: str = NLTK_DATA_DIR) -> bool:
+    """Download the required resources into target_dir, keeping only the unpacked data"""
+    import nltk
+    os.makedirs(target_dir, exist_ok=True)
+
+    ok = True
+    for name, resource in NLTK_RESOURCES.items():
+        print(f"📥 Downloading {name} into {target_dir}...")
+        if not nltk.download(name, download_dir=target_dir, quiet=True):
+            print(f"❌ Could not download {name}")
+            ok = False
+            continue
+
+        # nltk.download keeps the archive next to the unpacked folder; drop it
+        archive = os.path.join(target_dir, resource + ".zip")
+        if os.path.exists(archive):
+            os.remove(archive)
+
+    return ok
+
+
+if __name__ == "__main__":
+    download_nltk_data()
+    missing = missing_nltk_resources()
+    if missing:
+        print(f"❌ Missing NLTK resources: {missing}")
+        sys.exit(1)
+    print(f"✅ NLTK data bundled in {NLTK_DATA_DIR}")
@@ -0,0 +1,173 @@
+"""
+Persistent word -> noun lexicon for hashtag extraction
+The same vocabulary (subreddit jargon, product names) comes back request
+after request, so the POS tagger's decisions are remembered per word: how
+often it was tagged as a noun and how often as something else. Once a word
+has been seen MIN_OBSERVATIONS times its noun share is used directly. Only
+posts whose words are mostly unknown go through the averaged perceptron;
+the few unknown words of other posts are tagged on their own.
+
+The lexicon is bounded (least recently used words are dropped first) and
+saved to disk, so warm vocabularies survive restarts and are shared with
+the noun worker processes, which reload it when the file changes.
+
+    NOUN_LEXICON_PATH       default .cache/noun_lexicon.json
+    NOUN_LEXICON_MAX_WORDS  default 200000 (0 disables the lexicon)
+"""
+
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+DEFAULT_LEXICON_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "noun_lexicon.json")
+
+# Observations before a word's tagger decisions are trusted without context
+MIN_OBSERVATIONS = 2
+# Per-word counts are halved past this, so the lexicon follows changing usage
+MAX_OBSERVATIONS = 1000
+SAVE_INTERVAL_SECONDS = 60.0
+
+
+class NounLexicon:
+    """Thread-safe LRU map of word -> [noun observations, other observations]"""
+
+    def __init__(self, path: str = DEFAULT_LEXICON_PATH, max_words: int = 200000):
+        self.path = path
+        self.max_words = max_words
+        self._lock = threading.Lock()
+        self._words: "OrderedDict[str, List[int]]" = OrderedDict()
+        self._mtime = None
+        self._dirty = False
+        self._saved_at = 0.0
+        # Word lookups and the ones answered from the lexicon
+        self.lookups = 0
+        self.hits = 0
+        if max_words > 0:
+            self._load()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_words > 0
+
+    def _load(self):
+        try:
+            mtime = os.path.getmtime(self.path)
+            with open(self.path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        words = OrderedDict((word, list(counts)) for word, counts in data.items())
+        with self._lock:
+            # Keep what was learned locally since the last load; for words both
+            # sides know, the record with more observations wins
+            for word, counts in self._words.items():
+                if word not in words or sum(counts) > sum(words[word]):
+                    words[word] = counts
+            while len(words) > self.max_words:
+                words.popitem(last=False)
+            self._words = words
+            self._mtime = mtime
+
+    def reload_if_changed(self):
+        """Pick up a lexicon saved by another process (cheap stat when unchanged)"""
+        if not self.enabled:
+            return
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            return
+        if mtime != self._mtime:
+            self._load()
+
+    def noun_shares(self, words: List[str]) -> List[Optional[float]]:
+        """Noun share of every word, None for words that still need the tagger"""
+        if not self.enabled:
+            return [None] * len(words)
+        with self._lock:
+            shares: List[Optional[float]] = []
+            for word in words:
+                counts = self._words.get(word)
+                if counts is None or counts[0] + counts[1] < MIN_OBSERVATIONS:
+                    shares.append(None)
+                    continue
+                self._words.move_to_end(word)
+                shares.append(counts[0] / (counts[0] + counts[1]))
+            self.lookups += len(words)
+            self.hits += sum(share is not None for share in shares)
+            return shares
+
+    def merge(self, observations: Dict[str, List[int]]):
+        """Add tagger observations ({word: [noun, other]})"""
+        if not self.enabled or not observations:
+            return
+        with self._lock:
+            for word, (nouns, others) in observations.items():
+                counts = self._words.get(word)
+                if counts is None:
+                    counts = self._words[word] = [0, 0]
+                else:
+                    self._words.move_to_end(word)
+                counts[0] += nouns
+                counts[1] += others
+                if counts[0] + counts[1] > MAX_OBSERVATIONS:
+                    counts[0] //= 2
+                    counts[1] //= 2
+            while len(self._words) > self.max_words:
+                self._words.popitem(last=False)
+            self._dirty = True
+
+    def save(self, force: bool = False):
+        """Write the lexicon if it changed (at most every SAVE_INTERVAL_SECONDS unless forced)"""
+        if not self.enabled:
+            return
+        with self._lock:
+            if not self._dirty or (not force and time.time() - self._saved_at < SAVE_INTERVAL_SECONDS):
+                return
+            data = json.dumps(self._words)
+            self._dirty = False
+            self._saved_at = time.time()
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "w") as f:
+                f.write(data)
+            os.replace(tmp_path, self.path)
+            self._mtime = os.path.getmtime(self.path)
+        except OSError as e:
+            print(f"⚠️ Could not save noun lexicon: {e}")
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "path": self.path,
+                "words": len(self._words),
+                "max_words": self.max_words,
+                "lookup_hit_rate": round(self.hits / self.lookups, 3) if self.lookups else 0.0,
+            }
+
+
+_lexicon: Optional[NounLexicon] = None
+_lexicon_lock = threading.Lock()
+
+
+def get_noun_lexicon() -> NounLexicon:
+    """Process-wide lexicon, configured from the environment on first use"""
+    global _lexicon
+    with _lexicon_lock:
+        if _lexicon is None:
+            try:
+                max_words = max(0, int(os.getenv("NOUN_LEXICON_MAX_WORDS", "200000")))
+            except ValueError:
+                max_words = 200000
+            _lexicon = NounLexicon(os.getenv("NOUN_LEXICON_PATH", DEFAULT_LEXICON_PATH), max_words)
+        return _lexicon
+
+
+def use_noun_lexicon(lexicon: NounLexicon):
+    """Replace the process-wide lexicon (tests and benchmarks)"""
+    global _lexicon
+    with _lexicon_lock:
+        _lexicon = lexicon
@@ -0,0 +1,56 @@
+"""
+Persisted yield statistics shared by the planners
+reddit_strategy_planner.py (Reddit scrape steps) and source_query_planner.py
+(hashtags per source) both rank options by the posts they returned per unit
+of cost on earlier runs. Both keep those counts in a JSON file that survives
+restarts, and both smooth them towards an optimistic prior: untried options
+are assumed to be productive, so they get run and measured, and history
+takes over as runs accumulate.
+"""
+
+import json
+import os
+import threading
+from collections import deque
+from typing import Dict
+
+# Untried options are credited with PRIOR_WEIGHT runs (or calls) at PRIOR_YIELD posts each
+PRIOR_YIELD = 5.0
+PRIOR_WEIGHT = 2.0
+
+
+def smoothed_yield(posts: float, count: float, prior: float = PRIOR_YIELD, weight: float = PRIOR_WEIGHT) -> float:
+    """posts per count, pulled towards prior as if `weight` observations of it had been made"""
+    return (posts + prior * weight) / (count + weight)
+
+
+class PlannerStats:
+    """Thread-safe statistics table persisted as JSON; subclasses hold the planning logic"""
+
+    label = "planner stats"
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict] = self._load()
+        self.recent_reports = deque(maxlen=20)
+
+    def _load(self) -> Dict[str, Dict]:
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def save(self):
+        """Write the statistics atomically (a crashed write never corrupts the file)"""
+        with self._lock:
+            data = json.dumps(self._stats, sort_keys=True)
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "w") as f:
+                f.write(data)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"⚠️ Could not save {self.label}: {e}")
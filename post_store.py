@@ -0,0 +1,281 @@
+"""
+Local indexed store of Reddit submissions
+A SQLite database filled by the offline dump ingester (ingest_reddit_dumps.py)
+and the live stream worker. Posts are deduplicated by ID and indexed by
+(subreddit, created_utc), so a date window for one subreddit is a single
+index range scan. A coverage table records the time ranges the store holds
+completely, per subreddit or for all of them ('*'), which tells the scraper
+when a window can be answered locally without touching the live API.
+
+Posts from the live stream are stored with the score they had when created
+(about 1) until refresh_scores re-reads their stats. Such unsettled posts
+cannot be ranked by score, so a window takes them by recency, in proportion
+to their share of the window's posts; settled posts are ranked by score.
+
+    REDDIT_STORE_PATH               default data/reddit_posts.sqlite3
+    STREAM_SCORE_SETTLE_SECONDS     a stream post's stats count once refreshed this long
+                                    after it was created (default 3600)
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+DEFAULT_STORE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "reddit_posts.sqlite3")
+STORE_PATH = os.getenv("REDDIT_STORE_PATH", DEFAULT_STORE_PATH)
+
+ALL_SUBREDDITS = "*"
+SCORE_SETTLE_SECONDS = int(os.getenv("STREAM_SCORE_SETTLE_SECONDS", "3600"))
+
+# Stream posts whose stats were never refreshed after settling
+UNSETTLED = "source = 'stream' AND updated_utc < created_utc + ?"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS posts (
+    id TEXT PRIMARY KEY,
+    subreddit TEXT NOT NULL COLLATE NOCASE,
+    created_utc INTEGER NOT NULL,
+    title TEXT,
+    selftext TEXT,
+    author TEXT,
+    permalink TEXT,
+    score INTEGER,
+    num_comments INTEGER,
+    removed INTEGER NOT NULL DEFAULT 0,
+    source TEXT,
+    updated_utc INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_posts_subreddit_created ON posts (subreddit, created_utc);
+CREATE TABLE IF NOT EXISTS coverage (
+    subreddit TEXT NOT NULL COLLATE NOCASE,
+    begin_utc INTEGER NOT NULL,
+    end_utc INTEGER NOT NULL,
+    source TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_coverage_subreddit ON coverage (subreddit);
+"""
+
+UPSERT = """
+INSERT INTO posts (id, subreddit, created_utc, title, selftext, author, permalink,
+                   score, num_comments, removed, source, updated_utc)
+VALUES (:id, :subreddit, :created_utc, :title, :selftext, :author, :permalink,
+        :score, :num_comments, :removed, :source, :updated_utc)
+ON CONFLICT(id) DO UPDATE SET
+    score = excluded.score,
+    num_comments = excluded.num_comments,
+    removed = excluded.removed,
+    updated_utc = excluded.updated_utc
+WHERE excluded.updated_utc >= posts.updated_utc
+"""
+
+
+def post_row(data: Dict, source: str, updated_utc: Optional[int] = None) -> Dict:
+    """Reddit submission JSON (dump line, listing child or stream item) -> store row"""
+    author = data.get("author")
+    permalink = data.get("permalink") or f"/r/{data.get('subreddit', '')}/comments/{data.get('id', '')}/"
+    return {
+        "id": data["id"],
+        "subreddit": data.get("subreddit") or "",
+        "created_utc": int(float(data.get("created_utc") or 0)),
+        "title": data.get("title") or "",
+        "selftext": data.get("selftext") or "",
+        "author": None if author in (None, "[deleted]") else author,
+        "permalink": permalink,
+        "score": int(data.get("score") or 0),
+        "num_comments": int(data.get("num_comments") or 0),
+        "removed": int(bool(data.get("removed_by_category")) or data.get("selftext") == "[removed]"),
+        "source": source,
+        "updated_utc": int(updated_utc if updated_utc is not None else time.time()),
+    }
+
+
+def row_to_post(row: sqlite3.Row) -> Dict:
+    """Store row -> the post dict collect_reddit_posts_with_overlapper returns"""
+    return {
+        "source": "reddit",
+        "title": (row["title"] or "").replace("\n", " ").strip(),
+        "content": (row["selftext"] or "").replace("\n", " ").strip(),
+        "author": row["author"] or "[deleted]",
+        "url": f"https://reddit.com{row['permalink']}",
+        "score": row["score"],
+        "timestamp": datetime.fromtimestamp(row["created_utc"], tz=timezone.utc).isoformat().replace("+00:00", "Z"),
+        "id": row["id"],
+    }
+
+
+class PostStore:
+    """SQLite-backed post store; one connection per thread, WAL for concurrent readers"""
+
+    def __init__(self, path: str = STORE_PATH):
+        self.path = path
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._connection().executescript(SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=60)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def upsert_posts(self, rows: Iterable[Dict]) -> int:
+        """Insert posts, updating score/comments/removal of ones already stored"""
+        conn = self._connection()
+        with conn:
+            before = conn.total_changes
+            conn.executemany(UPSERT, rows)
+            return conn.total_changes - before
+
+    def stale_ids(self, older_than_utc: float, limit: int, subreddit: Optional[str] = None) -> List[str]:
+        """IDs of posts whose stats were last updated before older_than_utc, stalest first"""
+        query = "SELECT id FROM posts WHERE updated_utc < ? AND removed = 0"
+        params: list = [int(older_than_utc)]
+        if subreddit:
+            query += " AND subreddit = ?"
+            params.append(subreddit)
+        query += " ORDER BY updated_utc LIMIT ?"
+        params.append(int(limit))
+        return [row[0] for row in self._connection().execute(query, params)]
+
+    def update_stats(self, rows: Iterable[Dict]) -> int:
+        """Apply refreshed score/num_comments/removed values ({id, score, num_comments, removed, updated_utc})"""
+        conn = self._connection()
+        with conn:
+            before = conn.total_changes
+            conn.executemany(
+                "UPDATE posts SET score = :score, num_comments = :num_comments, removed = :removed, "
+                "updated_utc = :updated_utc WHERE id = :id",
+                rows
+            )
+            return conn.total_changes - before
+
+    def add_coverage(self, subreddit: str, begin_utc: int, end_utc: int, source: str):
+        conn = self._connection()
+        with conn:
+            conn.execute(
+                "INSERT INTO coverage (subreddit, begin_utc, end_utc, source) VALUES (?, ?, ?, ?)",
+                (subreddit, int(begin_utc), int(end_utc), source)
+            )
+
+    def set_coverage(self, subreddits: List[str], begin_utc: int, end_utc: int, source: str):
+        """Create or extend the coverage of one ingestion run (e.g. a live stream) for several subreddits"""
+        conn = self._connection()
+        with conn:
+            conn.executemany(
+                "DELETE FROM coverage WHERE subreddit = ? AND source = ?",
+                [(subreddit, source) for subreddit in subreddits]
+            )
+            conn.executemany(
+                "INSERT INTO coverage (subreddit, begin_utc, end_utc, source) VALUES (?, ?, ?, ?)",
+                [(subreddit, int(begin_utc), int(end_utc), source) for subreddit in subreddits]
+            )
+
+    def gaps(self, subreddit: str, begin_utc: float, end_utc: float,
+             slack_seconds: int = 600) -> List[Tuple[float, float]]:
+        """Parts of [begin_utc, end_utc] no stored coverage interval spans, oldest first"""
+        rows = self._connection().execute(
+            "SELECT begin_utc, end_utc FROM coverage WHERE subreddit IN (?, ?) ORDER BY begin_utc",
+            (subreddit, ALL_SUBREDDITS)
+        ).fetchall()
+        gaps = []
+        reached = begin_utc
+        for row in rows:
+            if row["begin_utc"] > end_utc:
+                break
+            if row["begin_utc"] > reached + slack_seconds:
+                gaps.append((reached, row["begin_utc"]))
+            reached = max(reached, row["end_utc"])
+            if reached + slack_seconds >= end_utc:
+                return gaps
+        gaps.append((reached, end_utc))
+        return gaps
+
+    def covers(self, subreddit: str, begin_utc: float, end_utc: float, slack_seconds: int = 600) -> bool:
+        """True when the stored coverage intervals span [begin_utc, end_utc] without gaps"""
+        return not self.gaps(subreddit, begin_utc, end_utc, slack_seconds)
+
+    def unsettled(self, subreddit: str, begin_utc: float, end_utc: float) -> bool:
+        """True when the window holds stream posts whose scores were never refreshed"""
+        row = self._connection().execute(
+            f"SELECT 1 FROM posts WHERE subreddit = ? AND created_utc BETWEEN ? AND ? AND {UNSETTLED} LIMIT 1",
+            (subreddit, int(begin_utc), int(end_utc), SCORE_SETTLE_SECONDS)
+        ).fetchone()
+        return row is not None
+
+    def window(self, subreddit: str, begin_utc: float, end_utc: float, limit: int) -> Tuple[List[Dict], bool]:
+        """
+        (posts of a subreddit inside the window, whether the window is fully
+        covered). Settled posts are the highest-scoring ones; unsettled stream
+        posts, whose scores mean nothing yet, are the newest ones and fill
+        their share of the window's posts.
+        """
+        conn = self._connection()
+        params = (subreddit, int(begin_utc), int(end_utc))
+        in_window = "subreddit = ? AND created_utc BETWEEN ? AND ? AND removed = 0"
+        total, unsettled = conn.execute(
+            f"SELECT COUNT(*), COALESCE(SUM({UNSETTLED}), 0) FROM posts WHERE {in_window}",
+            (SCORE_SETTLE_SECONDS,) + params
+        ).fetchone()
+        settled_rows = conn.execute(
+            f"SELECT * FROM posts WHERE {in_window} AND NOT ({UNSETTLED}) ORDER BY score DESC LIMIT ?",
+            params + (SCORE_SETTLE_SECONDS, int(limit))
+        ).fetchall()
+        unsettled_rows = conn.execute(
+            f"SELECT * FROM posts WHERE {in_window} AND {UNSETTLED} ORDER BY created_utc DESC LIMIT ?",
+            params + (SCORE_SETTLE_SECONDS, int(limit))
+        ).fetchall() if unsettled else []
+
+        share = min(len(unsettled_rows), round(limit * unsettled / total)) if total else 0
+        # Whichever side runs short leaves its share to the other
+        settled_take = min(len(settled_rows), limit - share)
+        rows = settled_rows[:settled_take] + unsettled_rows[:limit - settled_take]
+        return [row_to_post(row) for row in rows], self.covers(subreddit, begin_utc, end_utc)
+
+    def stats(self) -> Dict:
+        conn = self._connection()
+        posts = conn.execute("SELECT COUNT(*) FROM posts").fetchone()[0]
+        ranges = conn.execute("SELECT COUNT(*), MIN(begin_utc), MAX(end_utc) FROM coverage").fetchone()
+        return {
+            "path": self.path,
+            "posts": posts,
+            "coverage_ranges": ranges[0],
+            "covered_from": ranges[1],
+            "covered_to": ranges[2],
+        }
+
+
+def covered_spans(begin_utc: float, end_utc: float, gaps: List[Tuple[float, float]]) -> List[Tuple[float, float]]:
+    """The parts of [begin_utc, end_utc] between the given gaps"""
+    spans = []
+    start = begin_utc
+    for gap_begin, gap_end in gaps:
+        if gap_begin > start:
+            spans.append((start, gap_begin))
+        start = max(start, gap_end)
+    if start < end_utc:
+        spans.append((start, end_utc))
+    return spans
+
+
+_store: Optional[PostStore] = None
+_store_lock = threading.Lock()
+
+
+def get_post_store(create: bool = False) -> Optional[PostStore]:
+    """
+    Process-wide store. Without create=True this returns None until something
+    (dump ingestion or the stream worker) has created the database, so the
+    scraper pays nothing when no local data exists.
+    """
+    global _store
+    with _store_lock:
+        if _store is None and (create or os.path.exists(STORE_PATH)):
+            _store = PostStore(STORE_PATH)
+        return _store
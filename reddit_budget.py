@@ -0,0 +1,161 @@
+"""
+Overlap-weighted post budget across subreddits
+Enhanced mode used to give every subreddit the same share of post_limit, so
+low-overlap or quiet subreddits burned fetch budget for a handful of posts.
+The allocator splits post_limit by overlap score times an activity estimate,
+takes back whatever a subreddit did not use and hands it to subreddits that
+filled their share. Top-ups re-read only the subreddit's listings with a
+larger limit: the pages read the first time are served from the listing
+cache, so only the new pages cost API calls, and the uncached search and
+ID-window steps are not repeated.
+
+Activity is the fraction of its budget a subreddit filled on earlier runs,
+kept as a moving average in SUBREDDIT_ACTIVITY_PATH
+(default .cache/subreddit_activity.json). Subreddits without history start
+from their metadata (subreddit_metadata.py): small or long-idle subreddits
+get a smaller first share than large, busy ones.
+"""
+
+import json
+import math
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+DEFAULT_ACTIVITY_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "subreddit_activity.json")
+ACTIVITY_PATH = os.getenv("SUBREDDIT_ACTIVITY_PATH", DEFAULT_ACTIVITY_PATH)
+
+# Weight of the newest observation in the activity moving average
+ACTIVITY_ALPHA = 0.3
+# Unknown subreddits are assumed to fill their budget
+DEFAULT_ACTIVITY = 1.0
+# Nobody drops to zero: quiet subreddits still get a small probe
+MIN_ACTIVITY = 0.05
+MIN_SHARE = 10
+# A subreddit counts as productive when it delivers this much of its budget
+SATURATED_FILL = 0.9
+MAX_TOP_UPS = 2
+# Subreddits this large count as fully active; smaller ones scale down logarithmically
+ACTIVE_SUBSCRIBERS = 100000
+# Subreddits whose newest post is older than this are scaled down by how long they have been idle
+IDLE_SECONDS = 30 * 86400
+
+_activity_lock = threading.Lock()
+
+
+def load_activity() -> Dict[str, float]:
+    try:
+        with open(ACTIVITY_PATH) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_activity(observed: Dict[str, float]):
+    """Fold this run's fill ratios into the persisted moving averages"""
+    with _activity_lock:
+        activity = load_activity()
+        for subreddit, fill in observed.items():
+            key = subreddit.lower()
+            previous = activity.get(key, DEFAULT_ACTIVITY)
+            activity[key] = round((1 - ACTIVITY_ALPHA) * previous + ACTIVITY_ALPHA * fill, 4)
+        try:
+            os.makedirs(os.path.dirname(ACTIVITY_PATH), exist_ok=True)
+            tmp_path = f"{ACTIVITY_PATH}.{os.getpid()}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(activity, f, sort_keys=True)
+            os.replace(tmp_path, ACTIVITY_PATH)
+        except OSError as e:
+            print(f"⚠️ Could not save subreddit activity: {e}")
+
+
+def seed_activity(metadata: Optional[Dict], now: float = None) -> float:
+    """Activity prior of a subreddit never scraped before, from its subscribers and newest post"""
+    if not metadata:
+        return DEFAULT_ACTIVITY
+    activity = DEFAULT_ACTIVITY
+    subscribers = metadata.get("subscribers")
+    if subscribers is not None:
+        activity = min(activity, math.log10(subscribers + 1) / math.log10(ACTIVE_SUBSCRIBERS))
+    last_activity = metadata.get("last_activity")
+    if last_activity:
+        idle = (now if now is not None else time.time()) - last_activity
+        if idle > IDLE_SECONDS:
+            activity *= IDLE_SECONDS / idle
+    return max(activity, MIN_ACTIVITY)
+
+
+class BudgetAllocator:
+    """Splits a post budget across subreddits and moves unused budget to productive ones"""
+
+    def __init__(self, total: int, overlap_scores: Dict[str, float], activity: Dict[str, float] = None,
+                 metadata: Dict[str, Optional[Dict]] = None):
+        activity = activity if activity is not None else load_activity()
+        metadata = metadata or {}
+        self.total = total
+        self.weights = {
+            subreddit: max(score, 0.0) * max(
+                activity[subreddit.lower()] if subreddit.lower() in activity else seed_activity(metadata.get(subreddit)),
+                MIN_ACTIVITY
+            )
+            for subreddit, score in overlap_scores.items()
+        }
+        self.allocations = self._initial_allocations()
+        self.pool = 0
+        self.waiting: List[str] = []  # productive subreddits wanting more budget
+        self.top_ups: Dict[str, int] = {}
+        self.fills: Dict[str, float] = {}
+
+    def _initial_allocations(self) -> Dict[str, int]:
+        subreddits = list(self.weights)
+        if not subreddits:
+            return {}
+        floor = min(MIN_SHARE, self.total // len(subreddits))
+        spare = self.total - floor * len(subreddits)
+        weight_sum = sum(self.weights.values())
+        if weight_sum <= 0:
+            shares = {s: spare / len(subreddits) for s in subreddits}
+        else:
+            shares = {s: spare * w / weight_sum for s, w in self.weights.items()}
+
+        # Largest remainder so the allocations add up to exactly total
+        allocations = {s: floor + int(shares[s]) for s in subreddits}
+        leftover = self.total - sum(allocations.values())
+        for s in sorted(subreddits, key=lambda s: shares[s] - int(shares[s]), reverse=True)[:leftover]:
+            allocations[s] += 1
+        return allocations
+
+    def allocation(self, subreddit: str) -> int:
+        return self.allocations.get(subreddit, 0)
+
+    def settle(self, subreddit: str, requested: int, delivered: int) -> List[Tuple[str, int]]:
+        """
+        Record a finished scrape. Returns (subreddit, new limit) pairs to re-run
+        with budget taken back from subreddits that could not use theirs.
+        """
+        self.fills[subreddit] = min(1.0, delivered / requested) if requested else 0.0
+        if delivered < requested * SATURATED_FILL:
+            self.pool += requested - delivered
+            self.allocations[subreddit] = delivered
+        elif self.top_ups.get(subreddit, 0) < MAX_TOP_UPS:
+            self.waiting.append(subreddit)
+        return self._hand_out()
+
+    def _hand_out(self) -> List[Tuple[str, int]]:
+        grants = []
+        # Heaviest subreddits get reassigned budget first
+        self.waiting.sort(key=lambda s: self.weights.get(s, 0.0), reverse=True)
+        while self.waiting and self.pool >= MIN_SHARE:
+            subreddit = self.waiting.pop(0)
+            extra = min(self.pool, max(MIN_SHARE, self.allocations[subreddit]))
+            self.pool -= extra
+            self.allocations[subreddit] += extra
+            self.top_ups[subreddit] = self.top_ups.get(subreddit, 0) + 1
+            grants.append((subreddit, self.allocations[subreddit]))
+        return grants
+
+    def summary(self) -> str:
+        top = sorted(self.allocations.items(), key=lambda x: x[1], reverse=True)[:5]
+        text = ", ".join(f"r/{s}={n}" for s, n in top)
+        return f"💰 Budget {self.total}: {text}... (unused pool {self.pool}, top-ups {sum(self.top_ups.values())})"
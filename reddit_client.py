@@ -0,0 +1,233 @@
+"""
+Lazily created, pooled Reddit clients
+Nothing touches the network until a scrape asks for a client. Several app
+credentials can be configured; clients are handed out round-robin, skipping
+credentials whose rate-limit budget is exhausted, and a client that failed is
+thrown away so the next request reconnects instead of staying broken.
+
+Credentials:
+    REDDIT_CLIENT_ID / REDDIT_CLIENT_SECRET     primary app
+    REDDIT_CREDENTIALS="id1:secret1,id2:secret2" additional apps
+
+Concurrent scrapes share one RateLimiter sized at
+REDDIT_REQUESTS_PER_MINUTE (default 100, Reddit's OAuth budget) per app.
+"""
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+USER_AGENT = "CollectPosts/1.0 (by /u/collectposts)"
+
+# Leave a few requests in reserve before treating a credential as exhausted
+MIN_REMAINING_REQUESTS = 5
+
+
+class RedditCredential:
+    """One Reddit app and the rate-limit state last reported for it"""
+
+    def __init__(self, client_id: str, client_secret: str, user_agent: str = USER_AGENT):
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.user_agent = user_agent
+        self.idle_clients = []
+        self.remaining: Optional[float] = None
+        self.used: Optional[int] = None
+        self.reset_at: Optional[float] = None
+        self.leases = 0
+        self.failures = 0
+
+    def exhausted(self) -> bool:
+        return (
+            self.remaining is not None
+            and self.remaining < MIN_REMAINING_REQUESTS
+            and self.reset_at is not None
+            and self.reset_at > time.time()
+        )
+
+    def stats(self) -> Dict:
+        return {
+            "client_id": self.client_id[:6] + "...",
+            "remaining": self.remaining,
+            "used": self.used,
+            "reset_in": round(self.reset_at - time.time(), 1) if self.reset_at else None,
+            "leases": self.leases,
+            "failures": self.failures,
+            "idle_clients": len(self.idle_clients),
+        }
+
+
+class RedditClientPool:
+    """Thread-safe pool of praw.Reddit clients across one or more credentials"""
+
+    def __init__(self, credentials: List[RedditCredential]):
+        if not credentials:
+            raise ValueError("At least one Reddit credential is required")
+        self.credentials = credentials
+        self._next = 0
+        self._lock = threading.Lock()
+        self._owners = {}  # id(client) -> credential
+
+    def _create_client(self, credential: RedditCredential):
+        import praw
+        client = praw.Reddit(
+            client_id=credential.client_id,
+            client_secret=credential.client_secret,
+            user_agent=credential.user_agent
+        )
+        print(f"✅ Reddit client created for app {credential.client_id[:6]}...")
+        return client
+
+    def _pick_credential(self) -> RedditCredential:
+        """Next credential in round-robin order that still has budget"""
+        count = len(self.credentials)
+        for offset in range(count):
+            credential = self.credentials[(self._next + offset) % count]
+            if not credential.exhausted():
+                self._next = (self._next + offset + 1) % count
+                return credential
+        # Everything is exhausted: use the one that resets first (praw will wait)
+        return min(self.credentials, key=lambda c: c.reset_at or 0)
+
+    def acquire(self):
+        """Lease a client for exclusive use by the calling thread"""
+        with self._lock:
+            credential = self._pick_credential()
+            credential.leases += 1
+            client = credential.idle_clients.pop() if credential.idle_clients else None
+
+        if client is None:
+            client = self._create_client(credential)
+
+        with self._lock:
+            self._owners[id(client)] = credential
+        return client
+
+    def release(self, client, failed: bool = False):
+        """Return a leased client; failed clients are dropped so the next lease reconnects"""
+        with self._lock:
+            credential = self._owners.pop(id(client), None)
+            if credential is None:
+                return
+            self._record_limits(credential, client)
+            if failed:
+                credential.failures += 1
+            else:
+                credential.idle_clients.append(client)
+
+    def _record_limits(self, credential: RedditCredential, client):
+        try:
+            limits = client.auth.limits
+        except Exception:
+            return
+        if limits.get("remaining") is not None:
+            credential.remaining = limits["remaining"]
+            credential.used = limits.get("used")
+            credential.reset_at = limits.get("reset_timestamp")
+
+    def stats(self) -> List[Dict]:
+        with self._lock:
+            return [c.stats() for c in self.credentials]
+
+
+def load_credentials_from_env() -> List[RedditCredential]:
+    """Primary app from REDDIT_CLIENT_ID/SECRET plus any extra apps in REDDIT_CREDENTIALS"""
+    credentials = [RedditCredential(
+        os.getenv("REDDIT_CLIENT_ID", "F9rgR81aVwJSjyB0cfqzLQ"),
+        os.getenv("REDDIT_CLIENT_SECRET", "jW9w9dSkntRzjlo2_S_HKRxaiSFgVw")
+    )]
+    for pair in os.getenv("REDDIT_CREDENTIALS", "").split(","):
+        if ":" not in pair:
+            continue
+        client_id, client_secret = pair.strip().split(":", 1)
+        if client_id and client_secret and client_id not in {c.client_id for c in credentials}:
+            credentials.append(RedditCredential(client_id, client_secret))
+    return credentials
+
+
+class RateLimiter:
+    """Token bucket shared by every thread that talks to Reddit"""
+
+    def __init__(self, requests_per_minute: float, burst: Optional[float] = None):
+        self.rate = requests_per_minute / 60.0
+        self.capacity = burst if burst is not None else max(1.0, requests_per_minute / 6.0)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+        self.waited_seconds = 0.0
+        self.acquired = 0
+
+    def acquire(self, cost: float = 1.0):
+        """Block until `cost` requests may be made"""
+        cost = min(cost, self.capacity)
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= cost:
+                    self._tokens -= cost
+                    self.acquired += cost
+                    return
+                wait = (cost - self._tokens) / self.rate
+                self.waited_seconds += wait
+            time.sleep(wait)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "requests_per_minute": round(self.rate * 60, 1),
+                "available": round(self._tokens, 1),
+                "acquired": round(self.acquired, 1),
+                "waited_seconds": round(self.waited_seconds, 1),
+            }
+
+
+_pool: Optional[RedditClientPool] = None
+_pool_lock = threading.Lock()
+_rate_limiter: Optional[RateLimiter] = None
+
+
+def get_reddit_pool() -> RedditClientPool:
+    """Process-wide client pool, created on first use"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = RedditClientPool(load_credentials_from_env())
+            print(f"✅ Reddit client pool ready with {len(_pool.credentials)} app credential(s)")
+        return _pool
+
+
+def get_rate_limiter() -> RateLimiter:
+    """Process-wide Reddit rate limiter sized for every configured app"""
+    global _rate_limiter
+    pool = get_reddit_pool()
+    with _pool_lock:
+        if _rate_limiter is None:
+            per_app = float(os.getenv("REDDIT_REQUESTS_PER_MINUTE", "100"))
+            _rate_limiter = RateLimiter(per_app * len(pool.credentials))
+        return _rate_limiter
+
+
+@contextmanager
+def reddit_session():
+    """
+    Lease a Reddit client for the duration of a with-block:
+
+        with reddit_session() as reddit:
+            reddit.subreddit("python").top(limit=10)
+
+    An exception escaping the block marks the client as failed.
+    """
+    pool = get_reddit_pool()
+    client = pool.acquire()
+    failed = False
+    try:
+        yield client
+    except Exception:
+        failed = True
+        raise
+    finally:
+        pool.release(client, failed=failed)
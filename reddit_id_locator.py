@@ -0,0 +1,195 @@
+"""
+Historical date windows on Reddit via base36 submission IDs
+Submission IDs are assigned in increasing order across all of Reddit, so the IDs
+posted at begin_date and end_date can be found by bisecting the ID space with
+batched /api/info lookups (100 IDs per call, a handful of calls per boundary).
+
+Posts inside the window are read from the subreddit's /new listing (cached
+pages, real item cursors) while it reaches back that far. The part of the
+window beyond the listing depth is located by ID and sampled with random
+IDs, but only when the subreddit's share of the IDs its listing spans
+promises enough hits for the sampling budget; the measured hit rate then
+decides whether sampling continues.
+"""
+
+import random
+import threading
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterator, List, Optional
+
+from reddit_listing_cache import iter_listing
+from reddit_raw_listing import fetch_raw_info
+
+BASE36 = "0123456789abcdefghijklmnopqrstuvwxyz"
+INFO_BATCH_SIZE = 100
+
+# Boundary lookups are global (not per subreddit), so they are reused across requests
+_boundary_cache: Dict[int, int] = {}
+_boundary_lock = threading.Lock()
+MAX_CACHED_BOUNDARIES = 1000
+
+# Random ID sampling (and locating the window for it) is skipped unless the whole
+# sampling budget is expected to find this many of the subreddit's posts
+MIN_EXPECTED_SAMPLE_HITS = 2.0
+# Sampling calls made before the measured hit rate may stop it
+SAMPLE_PROBE_CALLS = 5
+
+
+def base36_to_int(value: str) -> int:
+    return int(value, 36)
+
+
+def int_to_base36(number: int) -> str:
+    if number <= 0:
+        return "0"
+    digits = []
+    while number:
+        number, rem = divmod(number, 36)
+        digits.append(BASE36[rem])
+    return "".join(reversed(digits))
+
+
+def fetch_submissions(reddit, ids: List[int], rate_limiter=None) -> list:
+    """Look up submissions by numeric ID in /api/info batches; missing IDs are skipped"""
+    found = []
+    for start in range(0, len(ids), INFO_BATCH_SIZE):
+        batch = ids[start:start + INFO_BATCH_SIZE]
+        if rate_limiter:
+            rate_limiter.acquire(1)
+        found.extend(fetch_raw_info(reddit, [f"t3_{int_to_base36(i)}" for i in batch]))
+    return found
+
+
+def locate_id_at(reddit, timestamp: float, lo: int, hi: int, rate_limiter=None, max_calls: int = 12) -> int:
+    """
+    Approximate first submission ID created at or after `timestamp`.
+    Each round probes 100 evenly spaced IDs in [lo, hi] and narrows to the pair
+    that brackets the timestamp, shrinking the range ~100x per call.
+    """
+    key = int(timestamp)
+    with _boundary_lock:
+        if key in _boundary_cache:
+            return _boundary_cache[key]
+
+    for _ in range(max_calls):
+        if hi - lo <= INFO_BATCH_SIZE:
+            break
+        step = (hi - lo) / (INFO_BATCH_SIZE - 1)
+        probes = sorted({lo + round(k * step) for k in range(INFO_BATCH_SIZE)})
+        known = sorted(
+            (base36_to_int(s.id), s.created_utc)
+            for s in fetch_submissions(reddit, probes, rate_limiter)
+        )
+        if not known:
+            break
+
+        new_lo, new_hi = lo, hi
+        for sid, created in known:
+            if created < timestamp:
+                new_lo = sid
+            else:
+                new_hi = sid
+                break
+        if (new_lo, new_hi) == (lo, hi):
+            break
+        lo, hi = new_lo, new_hi
+
+    # Only a converged boundary is worth reusing; an unrefined one (no probe
+    # found, or no progress) would mislead every later window at this timestamp
+    if hi - lo <= INFO_BATCH_SIZE:
+        with _boundary_lock:
+            if len(_boundary_cache) >= MAX_CACHED_BOUNDARIES:
+                _boundary_cache.clear()
+            _boundary_cache[key] = hi
+    return hi
+
+
+def iter_posts_in_id_window(
+    reddit,
+    subreddit_name: str,
+    begin_date: datetime,
+    end_date: datetime,
+    rate_limiter=None,
+    should_stop: Optional[Callable[[], bool]] = None,
+    max_sample_calls: int = 20
+) -> Iterator:
+    """
+    Yield submissions of a subreddit created inside [begin_date, end_date].
+
+    1. Page /r/<sub>/new (through the listing cache) down to the window. This
+       reaches it directly as long as it lies within Reddit's ~1000-item listing
+       depth, which covers long stretches of history for small and mid-sized
+       subreddits.
+    2. If the listing ends before reaching begin_date, sample random IDs
+       through /api/info in the rest of the window (up to max_sample_calls),
+       keeping the ones from this subreddit. The remainder ends at the oldest
+       listed post (or at end_date, located by ID, when the listing ended
+       before the window); its start is located by ID. The listing's posts
+       per ID spanned estimate the hits, so hopeless subreddits cost no
+       locating calls; after SAMPLE_PROBE_CALLS calls the measured hit rate
+       must still promise MIN_EXPECTED_SAMPLE_HITS over the budget.
+    """
+    should_stop = should_stop or (lambda: False)
+    begin_ts = (begin_date - datetime(1970, 1, 1)).total_seconds()
+    end_ts = (end_date - datetime(1970, 1, 1)).total_seconds()
+
+    # Step 1: page backwards from the newest post
+    seen = set()
+    newest = oldest = None
+    for post in iter_listing(reddit, subreddit_name, "new", limit=1000, rate_limiter=rate_limiter):
+        if should_stop():
+            return
+        seen.add(post.id)
+        newest = newest or post
+        oldest = post
+        if post.created_utc < begin_ts:
+            # The listing reached past the window, so it held every post in it
+            return
+        if post.created_utc <= end_ts:
+            yield post
+
+    if should_stop() or len(seen) < 2:
+        return
+    newest_id, oldest_id = base36_to_int(newest.id), base36_to_int(oldest.id)
+    if newest_id <= oldest_id:
+        return
+
+    # Step 2: the listing ended before begin_date - sample IDs in the rest of the window.
+    # The subreddit's share of the IDs its listing spans estimates the hits per call.
+    expected_hits = INFO_BATCH_SIZE * (len(seen) - 1) / (newest_id - oldest_id)
+    if expected_hits * max_sample_calls < MIN_EXPECTED_SAMPLE_HITS:
+        print(f"⏭️ r/{subreddit_name} is too small for ID sampling "
+              f"(~{expected_hits:.2f} hits per call, {max_sample_calls} calls)")
+        return
+
+    remainder_end_ts = min(end_ts, oldest.created_utc)
+    if oldest.created_utc <= end_ts:
+        end_id = oldest_id
+    else:
+        end_id = locate_id_at(reddit, end_ts, 0, oldest_id, rate_limiter)
+    begin_id = locate_id_at(reddit, begin_ts, 0, end_id, rate_limiter)
+    remainder_end = datetime(1970, 1, 1) + timedelta(seconds=remainder_end_ts)
+    print(f"🧭 ID window for {begin_date.strftime('%Y-%m-%d')}..{remainder_end.strftime('%Y-%m-%d')}: "
+          f"{int_to_base36(begin_id)}..{int_to_base36(end_id)} (~{expected_hits:.2f} hits per call)")
+    span = max(1, end_id - begin_id)
+
+    target = subreddit_name.lower()
+    hits = 0
+    for calls in range(1, max_sample_calls + 1):
+        if should_stop():
+            return
+        batch = [begin_id + random.randrange(span) for _ in range(INFO_BATCH_SIZE)]
+        for post in fetch_submissions(reddit, batch, rate_limiter):
+            if str(post.subreddit).lower() != target:
+                continue
+            hits += 1
+            if post.id in seen:
+                continue
+            seen.add(post.id)
+            if begin_ts <= post.created_utc <= remainder_end_ts:
+                yield post
+        # Once a few calls are in, the measured rate has to pass the same gate
+        if calls < max_sample_calls and calls >= SAMPLE_PROBE_CALLS \
+                and hits / calls * max_sample_calls < MIN_EXPECTED_SAMPLE_HITS:
+            print(f"⏭️ Stopping ID sampling for r/{subreddit_name}: {hits} hit(s) in {calls} calls")
+            return
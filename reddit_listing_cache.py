@@ -0,0 +1,139 @@
+"""
+Cache of Reddit listing pages
+Listings are fetched 100 items at a time and every page is cached under
+(subreddit, strategy, time_filter, after-cursor), so repeated passes over the
+same .top() listing and overlapping requests for the same subreddit are served
+locally. Pages expire according to how fast the listing changes: top(all) is
+stable for hours, new/rising change by the minute.
+
+    LISTING_CACHE_MAX_PAGES   pages kept in memory (default 2000, LRU)
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from reddit_raw_listing import fetch_raw_listing
+
+PAGE_SIZE = 100
+
+# Seconds a cached page stays valid, by time filter
+LISTING_TTLS = {
+    "hour": 60,
+    "day": 300,
+    "week": 900,
+    "month": 3600,
+    "year": 6 * 3600,
+    "all": 24 * 3600,
+}
+# new/rising (and anything without a time filter)
+VOLATILE_TTL = 60
+
+TIME_FILTERED_STRATEGIES = {"top", "controversial"}
+
+
+class ListingCache:
+    """Thread-safe LRU cache of listing pages with per-entry TTL"""
+
+    def __init__(self, max_pages: int = 2000):
+        self.max_pages = max_pages
+        self._pages: "OrderedDict[Tuple, tuple]" = OrderedDict()  # key -> (expires_at, items, after)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def ttl_for(strategy: str, time_filter: Optional[str]) -> float:
+        if strategy not in TIME_FILTERED_STRATEGIES:
+            return VOLATILE_TTL
+        return LISTING_TTLS.get(time_filter, VOLATILE_TTL)
+
+    def get(self, key: Tuple) -> Optional[Tuple[list, Optional[str]]]:
+        with self._lock:
+            entry = self._pages.get(key)
+            if entry is None or entry[0] < time.time():
+                if entry is not None:
+                    del self._pages[key]
+                self.misses += 1
+                return None
+            self._pages.move_to_end(key)
+            self.hits += 1
+            return entry[1], entry[2]
+
+    def set(self, key: Tuple, items: list, after: Optional[str]):
+        _, strategy, time_filter, _ = key
+        with self._lock:
+            self._pages[key] = (time.time() + self.ttl_for(strategy, time_filter), items, after)
+            self._pages.move_to_end(key)
+            while len(self._pages) > self.max_pages:
+                self._pages.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._pages.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "pages": len(self._pages),
+                "max_pages": self.max_pages,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "evictions": self.evictions,
+            }
+
+
+listing_cache = ListingCache(max_pages=int(os.getenv("LISTING_CACHE_MAX_PAGES", "2000")))
+
+
+def fetch_listing_page(reddit, subreddit_name: str, strategy: str, time_filter: Optional[str], after: Optional[str]):
+    """One page of r/<subreddit>/<strategy>; returns (RedditRecords, after-cursor of the next page)"""
+    params = {"limit": PAGE_SIZE}
+    if strategy in TIME_FILTERED_STRATEGIES and time_filter:
+        params["t"] = time_filter
+    if after:
+        params["after"] = after
+    return fetch_raw_listing(reddit, f"r/{subreddit_name}/{strategy}", params)
+
+
+def iter_listing(
+    reddit,
+    subreddit_name: str,
+    strategy: str,
+    time_filter: Optional[str] = None,
+    limit: int = 1000,
+    after: Optional[str] = None,
+    rate_limiter=None,
+    cache: ListingCache = None
+) -> Iterator:
+    """
+    Iterate a subreddit listing page by page, serving cached pages locally.
+    Only pages that actually hit Reddit take a rate limiter token.
+    """
+    cache = cache or listing_cache
+    count = 0
+    while count < limit:
+        key = (subreddit_name.lower(), strategy, time_filter, after)
+        page = cache.get(key)
+        if page is None:
+            if rate_limiter:
+                rate_limiter.acquire(1)
+            items, next_after = fetch_listing_page(reddit, subreddit_name, strategy, time_filter, after)
+            cache.set(key, items, next_after)
+        else:
+            items, next_after = page
+
+        for item in items:
+            yield item
+            count += 1
+            if count >= limit:
+                return
+        if not items or not next_after:
+            return
+        after = next_after
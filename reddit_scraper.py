@@ -1,78 +1,40 @@
 import os
-import praw
 import re
-import nltk
-import requests
+import threading
 from datetime import datetime, timedelta
-from typing import List, Dict, Set
+from typing import Callable, List, Dict, Set, Tuple
 from collections import Counter
-import random
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.feature_extraction import text
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 
-# Download required NLTK data - ensure punkt_tab is downloaded first
-def ensure_nltk_data():
-    """Ensure all required NLTK data is downloaded"""
-    try:
-        # Try to find punkt_tab first (newer NLTK versions require this)
-        try:
-            nltk.data.find('tokenizers/punkt_tab')
-        except LookupError:
-            print("Downloading punkt_tab...")
-            nltk.download('punkt_tab', quiet=True)
-        
-        # Also download punkt for compatibility
-        try:
-            nltk.data.find('tokenizers/punkt')
-        except LookupError:
-            print("Downloading punkt...")
-            nltk.download('punkt', quiet=True)
-        
-        # Download tagger (try both old and new names)
-        try:
-            nltk.data.find('taggers/averaged_perceptron_tagger')
-        except LookupError:
-            print("Downloading averaged_perceptron_tagger...")
-            nltk.download('averaged_perceptron_tagger', quiet=True)
-        
-        # Download new tagger name (for newer NLTK versions)
-        try:
-            nltk.data.find('taggers/averaged_perceptron_tagger_eng')
-        except LookupError:
-            print("Downloading averaged_perceptron_tagger_eng...")
-            nltk.download('averaged_perceptron_tagger_eng', quiet=True)
-        
-        # Download stopwords
-        try:
-            nltk.data.find('corpora/stopwords')
-        except LookupError:
-            print("Downloading stopwords...")
-            nltk.download('stopwords', quiet=True)
-        
-        print("✅ NLTK data ready")
-    except Exception as e:
-        print(f"⚠️  NLTK download error: {e}")
+from reddit_client import get_reddit_pool, get_rate_limiter, reddit_session
+from reddit_listing_cache import iter_listing
+from reddit_raw_listing import author_name
+from reddit_strategy_planner import CallCounter, planner
+from subreddit_overlap import get_overlap_scores
+from reddit_budget import BudgetAllocator, save_activity
+from subreddit_metadata import metadata_cache, usable_subreddits
+from post_store import covered_spans, get_post_store
+from hashtag_extraction import count_nouns
+from hashtag_accumulator import HashtagAccumulator, accumulate
 
-# Download NLTK data on import
-ensure_nltk_data()
+# praw, nltk and sklearn are imported on first use so that importing this module
+# (and api.main) stays fast and never touches the network
 
-from nltk.corpus import stopwords
-from nltk.tokenize import word_tokenize
-from nltk.tag import pos_tag
+_nltk_ready = False
 
-# Initialize Reddit with proper error handling
-try:
-    reddit = praw.Reddit(
-        client_id=os.getenv("REDDIT_CLIENT_ID", "F9rgR81aVwJSjyB0cfqzLQ"),
-        client_secret=os.getenv("REDDIT_CLIENT_SECRET", "jW9w9dSkntRzjlo2_S_HKRxaiSFgVw"),
-        user_agent="CollectPosts/1.0 (by /u/collectposts)"
-    )
-    # Test the connection
-    reddit.user.me()
-    print("✅ Reddit API connection successful")
-except Exception as e:
-    print(f"❌ Reddit API connection failed: {e}")
-    reddit = None
+def ensure_nltk_data():
+    """Ensure the bundled NLTK data is on the search path (NLTK data is bundled at build time)"""
+    global _nltk_ready
+    if _nltk_ready:
+        return
+    from nltk_setup import configure_nltk_data, missing_nltk_resources
+    configure_nltk_data()
+    missing = missing_nltk_resources()
+    if missing:
+        print(f"⚠️  Missing NLTK resources {missing}; run 'python nltk_setup.py'")
+    else:
+        print("✅ NLTK data ready")
+    _nltk_ready = True
 
 def clean_text(text: str) -> str:
     """Clean text by removing newlines and extra whitespace"""
@@ -87,157 +49,71 @@ def preprocess_text(text: str) -> str:
     text = re.sub(r'[^a-z0-9\s.,!?]', ' ', text)
     return re.sub(r'\s+', ' ', text).strip()
 
-def get_top_overlapping_subreddits(base_subreddit: str, top_n: int = 19) -> List[str]:
+def get_top_overlap_scores(base_subreddit: str, top_n: int = 19) -> List[Tuple[str, float]]:
     """
-    Gets 19 relevant overlapping subreddits based on the user provided subreddit for a total of 20
-    Uses subredditstats.com API to find overlapping subreddits
+    (subreddit, overlap multiplier) pairs for the subreddits whose users overlap most with base_subreddit
+    Uses subredditstats.com API (cached on disk, see subreddit_overlap.py)
     """
-    session = requests.Session()
-    session.headers.update({
-        'User-Agent': 'Mozilla/5.0',
-        'Referer': f'https://subredditstats.com/subreddit-user-overlaps/{base_subreddit}',
-        'Accept': 'application/json',
-    })
-    
     try:
         print(f"🔍 Finding overlapping subreddits for r/{base_subreddit}...")
-        
-        # Get global subreddit distribution
-        global_hist_url = f"https://subredditstats.com/api/globalSubredditsIdHist?v={random.random()}"
-        global_response = session.get(global_hist_url, timeout=30)
-        global_response.raise_for_status()
-        global_hist = global_response.json()
-        global_total = sum(global_hist.values())
-        global_dist = {k: v / global_total for k, v in global_hist.items()}
-
-        # Get subreddit-specific distribution
-        subreddit_hist_url = f"https://subredditstats.com/api/subredditNameToSubredditsHist?subredditName={base_subreddit}&v={random.random()}"
-        subreddit_response = session.get(subreddit_hist_url, timeout=30)
-        subreddit_response.raise_for_status()
-        subreddit_hist = subreddit_response.json()
-        subreddit_total = sum(subreddit_hist.values())
-        subreddit_dist = {k: v / subreddit_total for k, v in subreddit_hist.items()}
-
-        # Calculate multipliers (overlap scores)
-        multipliers = {}
-        for sid, prob in subreddit_dist.items():
-            if sid in global_dist and global_dist[sid] >= 0.0001:
-                multipliers[sid] = prob / global_dist[sid]
-
-        if not multipliers:
+        overlaps = get_overlap_scores(base_subreddit, top_n)
+
+        if not overlaps:
             print("⚠️ No overlapping subreddits found")
             return []
 
-        # Get subreddit names from IDs
-        subreddit_ids = list(multipliers.keys())
-        names_response = session.post(
-            "https://subredditstats.com/api/specificSubredditIdsToNames",
-            json={"subredditIds": subreddit_ids},
-            headers={"Content-Type": "application/json"}
-        )
-        names_response.raise_for_status()
-        subreddit_names = names_response.json()
-
-        # Create overlaps list with scores
-        overlaps = []
-        for i, (sid, score) in enumerate(multipliers.items()):
-            if i < len(subreddit_names):
-                overlaps.append((subreddit_names[i], round(score, 3)))
-
-        # Sort by score and return top N
-        overlaps.sort(key=lambda x: x[1], reverse=True)
-        overlapping_subreddits = [name for name, _ in overlaps[:top_n]]
-        
-        print(f"✅ Found {len(overlapping_subreddits)} overlapping subreddits")
-        return overlapping_subreddits
+        print(f"✅ Found {len(overlaps)} overlapping subreddits")
+        return overlaps
 
     except Exception as e:
         print(f"❌ Overlap scrape error: {e}")
         return []
 
+def get_top_overlapping_subreddits(base_subreddit: str, top_n: int = 19) -> List[str]:
+    """
+    Gets 19 relevant overlapping subreddits based on the user provided subreddit for a total of 20
+    """
+    return [name for name, _ in get_top_overlap_scores(base_subreddit, top_n)]
+
 def extract_noun_hashtags(posts: List[Dict], max_hashtags: int = 50) -> List[str]:
     """
     Extract noun hashtags from Reddit posts using NLTK POS tagging
     Only returns actual nouns/words, not random strings
+    See hashtag_extraction.py for the batched, parallel tagging
     """
     if not posts:
         return []
     
     print(f"🔍 Extracting noun hashtags from {len(posts)} Reddit posts...")
     
-    # Combine all text from posts
-    all_text = ""
-    for post in posts:
-        title = post.get("title", "")
-        content = post.get("content", "")
-        all_text += f" {title} {content}"
-    
-    # Tokenize and clean text
-    words = word_tokenize(all_text.lower())
-    
-    # Remove stopwords and non-alphabetic words
-    stop_words = set(stopwords.words('english'))
-    filtered_words = [word for word in words if word.isalpha() and word not in stop_words and len(word) > 2]
-    
-    # POS tagging to identify nouns
-    pos_tags = pos_tag(filtered_words)
+    ensure_nltk_data()
     
-    # Extract nouns and proper nouns
-    nouns = []
-    for word, pos in pos_tags:
-        if pos in ['NN', 'NNS', 'NNP', 'NNPS']:  # Nouns and proper nouns
-            nouns.append(word)
-    
-    # Count frequency and get most common nouns
-    noun_counts = Counter(nouns)
+    # Tokenize, filter and POS-tag posts in chunks (across processes for large corpora)
+    noun_counts = count_nouns(posts)
     top_nouns = [noun for noun, count in noun_counts.most_common(max_hashtags)]
     
     print(f"✅ Extracted {len(top_nouns)} noun hashtags")
     return top_nouns
 
-def generate_enhanced_hashtags(posts: List[Dict], subreddits: List[str], max_hashtags: int = 50) -> List[str]:
+def generate_enhanced_hashtags(posts: List[Dict], subreddits: List[str], max_hashtags: int = 50,
+                               accumulator: HashtagAccumulator = None) -> List[str]:
     """
     Enhanced hashtag generation using TF-IDF and subreddit names
     Combines subreddit names with top keywords from posts
+    Pass the accumulator that collected the posts to skip re-tokenizing them
     """
     if not posts:
         return []
     
     print(f"🔍 Generating enhanced hashtags from {len(posts)} posts across {len(subreddits)} subreddits...")
     
-    # Combine all post titles and content into one text block
-    documents = [preprocess_text(p["title"]) + " " + preprocess_text(p["content"]) for p in posts]
-    
-    # Enhanced stopwords list
-    base_stopwords = text.ENGLISH_STOP_WORDS
-    custom_stopwords = base_stopwords.union({
-        'trump', 'biden', 'like', 'just', 'know', 'think', 'thing', 'things', 'people', 'said', 'also',
-        'would', 'could', 'should', 'still', 'even', 'one', 'get', 'going', 'see', 'say', 'make', 'made',
-        'want', 'need', 'much', 'many', 'really', 'got', 'look', 'take', 'though', 'well', 'without',
-        'every', 'around', 'another', 'others', 'done', 'being', 'next', 'used', 'new', 'time', 'way',
-        'good', 'great', 'best', 'better', 'bad', 'worst', 'right', 'wrong', 'true', 'false', 'real',
-        'fake', 'news', 'post', 'comment', 'reddit', 'user', 'subreddit', 'thread', 'discussion'
-    })
-    
-    stopword_list = list(custom_stopwords)
-    
-    # Vectorize with TF-IDF
-    vectorizer = TfidfVectorizer(
-        stop_words=stopword_list,
-        token_pattern=r'\b[a-z]{4,}\b',  # Only words 4+ characters
-        max_df=0.6,  # Ignore words that appear in more than 60% of documents
-        max_features=100
-    )
-    
     try:
-        tfidf_matrix = vectorizer.fit_transform(documents)
-        feature_names = vectorizer.get_feature_names_out()
-        tfidf_scores = tfidf_matrix.sum(axis=0).A1
-        word_scores = list(zip(feature_names, tfidf_scores))
-        
-        # Get top keywords
-        top_keywords = sorted(word_scores, key=lambda x: x[1], reverse=True)[:max_hashtags//2]
-        top_tags = [f"#{word}" for word, _ in top_keywords]
+        # Incremental TF-IDF (see hashtag_accumulator.py)
+        if accumulator is None:
+            accumulator = accumulate(posts)
+        top_tags = accumulator.hashtags(max_hashtags // 2)
+        if not top_tags:
+            raise ValueError("no terms remain after pruning")
         
         # Add subreddit names as hashtags
         base_tags = [f"#{s.lower()}" for s in subreddits if s.isalnum() and len(s) > 2]
@@ -257,25 +133,96 @@ def collect_reddit_posts_with_overlapper(
     begin_date: datetime = None,
     end_date: datetime = None,
     limit: int = 1000,
-    fetch_multiplier: int = 5
+    fetch_multiplier: int = 5,
+    stop_event: threading.Event = None,
+    on_posts: Callable[[List[Dict]], None] = None,
+    listings_only: bool = False
 ) -> List[Dict]:
     """
     Enhanced Reddit scraper with comprehensive overlapper functionality
     Uses multiple strategies and time filters to get maximum coverage
+    Setting stop_event ends the scrape early (used by the parallel subreddit fan-out)
+    on_posts receives posts as they are collected (used by the pipelined orchestrator)
+    listings_only skips the uncached search and ID-window steps (budget top-ups,
+    whose earlier listing pages are served from the listing cache)
     """
     
-    if not reddit:
-        print("❌ Reddit API not available")
+    # Invalid names and subreddits already known to be dead fail fast, without a client
+    metadata = metadata_cache.get(subreddit_name)
+    if metadata and metadata["status"] != "ok":
+        print(f"⏭️ Skipping r/{subreddit_name}: {metadata['status']}")
         return []
 
-    posts: List[Dict] = []
-    seen_urls = set()
-    
     # Set default date range if not provided
     if not begin_date:
         begin_date = datetime.utcnow() - timedelta(days=7)
     if not end_date:
         end_date = datetime.utcnow()
+
+    # Windows the local store (dumps, live stream) holds completely never touch the API.
+    # A partly covered window takes the covered spans' share of the limit from the
+    # store and scrapes only the gaps, so the result is not skewed towards the
+    # part of the window the store happens to hold
+    stored_posts = []
+    covered = []
+    store = get_post_store()
+    if store is not None:
+        try:
+            begin_utc = (begin_date - datetime(1970, 1, 1)).total_seconds()
+            end_utc = (end_date - datetime(1970, 1, 1)).total_seconds()
+            gaps = store.gaps(subreddit_name, begin_utc, end_utc)
+            if not gaps:
+                # Fresh stream posts, whose scores are not settled yet, are taken by recency
+                stored_posts, _ = store.window(subreddit_name, begin_utc, end_utc, limit)
+                print(f"💾 r/{subreddit_name}: {len(stored_posts)} posts from the local store")
+                return stored_posts
+            covered = covered_spans(begin_utc, end_utc, gaps)
+            window_seconds = max(1.0, end_utc - begin_utc)
+            for span_begin, span_end in covered:
+                share = int(limit * (span_end - span_begin) / window_seconds)
+                if share:
+                    stored_posts += store.window(subreddit_name, span_begin, span_end, share)[0]
+            if stored_posts:
+                print(f"💾 r/{subreddit_name}: {len(stored_posts)} posts from the local store, "
+                      f"scraping {len(gaps)} uncovered span(s)")
+        except Exception as e:
+            print(f"⚠️ Local store lookup failed: {e}")
+            stored_posts = []
+            covered = []
+
+    # Lease a client from the pool; it is created (or recreated) on first use
+    pool = get_reddit_pool()
+    try:
+        reddit = pool.acquire()
+    except Exception as e:
+        print(f"❌ Reddit API not available: {e}")
+        return []
+    failed = False
+    errors = 0
+    rate_limiter = get_rate_limiter()
+
+    if metadata is None:
+        try:
+            if not usable_subreddits(reddit, [subreddit_name], rate_limiter):
+                pool.release(reddit)
+                print(f"⏭️ Skipping r/{subreddit_name}: {(metadata_cache.get(subreddit_name) or {}).get('status', 'unavailable')}")
+                return []
+        except Exception as e:
+            # Metadata is an optimization; scrape anyway if the lookup itself failed
+            print(f"⚠️ Subreddit metadata check failed: {e}")
+
+    posts: List[Dict] = []
+
+    def done() -> bool:
+        return len(posts) >= limit or (stop_event is not None and stop_event.is_set())
+
+    seen_urls = set()
+    # Posts the local store already had for this window count towards the limit
+    for post in stored_posts:
+        posts.append(post)
+        seen_urls.add(post["url"])
+    if on_posts and stored_posts:
+        on_posts(stored_posts)
     
     print(f"🔍 Scraping r/{subreddit_name} with comprehensive overlapper from {begin_date.strftime('%Y-%m-%d')} to {end_date.strftime('%Y-%m-%d')}")
 
@@ -342,238 +289,273 @@ def collect_reddit_posts_with_overlapper(
             use_search = False
             search_aggressive = False
         
-        # Strategy 1: For historical data, use search API with keyword queries
-        # This helps get more posts that might be in our date range
-        if use_search and len(posts) < limit:
+        # Search queries used by the search steps
+        # Reddit search doesn't support timestamp queries, but we can search for common terms
+        # and filter by date. This helps find posts that .top() might miss.
+        # For aggressive search (narrow/large historical), use more queries
+        if search_aggressive:
+            # Extract keywords from subreddit name for better search
+            # Split camelCase, snake_case, or use as-is
+            keywords = []
+            if '_' in subreddit_name:
+                keywords = subreddit_name.split('_')
+            elif any(c.isupper() for c in subreddit_name[1:]):
+                # CamelCase - split on uppercase
+                keywords = re.findall(r'[A-Z]?[a-z]+', subreddit_name)
+            else:
+                keywords = [subreddit_name]
+
+            search_queries = [
+                "",  # Empty query returns all posts
+                subreddit_name,  # Full subreddit name
+            ] + keywords[:3]  # Add up to 3 keywords
+        else:
+            search_queries = [
+                "",  # Empty query returns all posts
+                subreddit_name,  # Search for the subreddit name itself
+            ]
+
+        def add_post(post, post_time: datetime, strategy: str, time_filter: str) -> bool:
+            """Append a post unless its URL was already collected"""
+            post_url = f"https://reddit.com{getattr(post, 'permalink', '')}"
+            if post_url in seen_urls:
+                return False
+            # The store already supplied the covered spans' share
+            created_utc = (post_time - datetime(1970, 1, 1)).total_seconds()
+            if any(span_begin <= created_utc <= span_end for span_begin, span_end in covered):
+                return False
+            seen_urls.add(post_url)
+
+            posts.append({
+                "source": "reddit",
+                "title": clean_text(getattr(post, "title", "")),
+                "content": clean_text(getattr(post, "selftext", "")),
+                "author": author_name(post),
+                "url": post_url,
+                "score": getattr(post, "score", 0),
+                "timestamp": post_time.isoformat() + "Z",
+                "id": post.id,
+                "strategy": strategy,
+                "time_filter": time_filter
+            })
+            if on_posts:
+                on_posts(posts[-1:])
+            return True
+
+        def run_id_window(limiter):
+            """Jump straight to the date window by bisecting the base36 submission ID space"""
+            nonlocal errors
             try:
-                print(f"🔍 Using Reddit search API to find more posts in date range {begin_date.strftime('%Y-%m-%d')} to {end_date.strftime('%Y-%m-%d')}...")
-                
-                # Reddit search doesn't support timestamp queries, but we can search for common terms
-                # and filter by date. This helps find posts that .top() might miss.
-                # For aggressive search (narrow/large historical), use more queries
-                if search_aggressive:
-                    # Extract keywords from subreddit name for better search
-                    # Split camelCase, snake_case, or use as-is
-                    keywords = []
-                    if '_' in subreddit_name:
-                        keywords = subreddit_name.split('_')
-                    elif any(c.isupper() for c in subreddit_name[1:]):
-                        # CamelCase - split on uppercase
-                        import re
-                        keywords = re.findall(r'[A-Z]?[a-z]+', subreddit_name)
-                    else:
-                        keywords = [subreddit_name]
-                    
-                    search_queries = [
-                        "",  # Empty query returns all posts
-                        subreddit_name,  # Full subreddit name
-                    ] + keywords[:3]  # Add up to 3 keywords
-                else:
-                    search_queries = [
-                        "",  # Empty query returns all posts
-                        subreddit_name,  # Search for the subreddit name itself
-                    ]
-                
-                # Try search with different sort methods
-                for search_query in search_queries:
-                    if len(posts) >= limit:
-                        break
-                    
-                    for sort in ['relevance', 'top', 'new']:
-                        if len(posts) >= limit:
-                            break
-                        
-                        try:
-                            print(f"🔍 Searching with query='{search_query or '(all)'}', sort='{sort}'...")
-                            
-                            search_results = subreddit.search(
-                                query=search_query,
-                                sort=sort,
-                                limit=1000,  # Max Reddit allows
-                                time_filter='all'
-                            )
-                            
-                            search_count = 0
-                            for post in search_results:
-                                search_count += 1
-                                if len(posts) >= limit:
-                                    break
-                                
-                                post_time = datetime.utcfromtimestamp(post.created_utc)
-                                if post_time < begin_date or post_time > end_date:
-                                    continue
-                                
-                                post_url = f"https://reddit.com{getattr(post, 'permalink', '')}"
-                                if post_url in seen_urls:
-                                    continue
-                                seen_urls.add(post_url)
-                                
-                                posts.append({
-                                    "source": "reddit",
-                                    "title": clean_text(getattr(post, "title", "")),
-                                    "content": clean_text(getattr(post, "selftext", "")),
-                                    "author": (post.author.name if getattr(post, "author", None) else "[deleted]"),
-                                    "url": post_url,
-                                    "score": getattr(post, "score", 0),
-                                    "timestamp": post_time.isoformat() + "Z",
-                                    "id": post.id,
-                                    "strategy": "search",
-                                    "time_filter": sort
-                                })
-                            
-                            if search_count > 0:
-                                found = len([p for p in posts if p.get('strategy') == 'search' and p.get('time_filter') == sort])
-                                print(f"✅ Search ({sort}): {found} posts in date range (checked {search_count} posts)")
-                        except Exception as e:
-                            print(f"⚠️ Search ({sort}) failed: {e}")
-                            continue
-                    
+                from reddit_id_locator import iter_posts_in_id_window
+                window_count = 0
+                for post in iter_posts_in_id_window(
+                    reddit, subreddit_name, begin_date, end_date,
+                    rate_limiter=limiter, should_stop=done
+                ):
+                    if add_post(post, datetime.utcfromtimestamp(post.created_utc), "id_window", "window"):
+                        window_count += 1
+                print(f"✅ ID window: {window_count} posts in date range")
             except Exception as e:
-                print(f"⚠️ Search API failed: {e}")
-                print(f"⚠️ Falling back to .top() method")
-        
-        # Strategy 2: Use .top() with time filters
-        for time_filter in time_filters:
-            if len(posts) >= limit:
-                break
-                
-            for strategy in strategies:
-                if len(posts) >= limit:
+                print(f"⚠️ ID window lookup failed: {e}")
+                errors += 1
+            return False
+
+        def run_search(sort: str, limiter):
+            """Search API with keyword queries, keeping posts inside the date range"""
+            nonlocal errors
+            print(f"🔍 Using Reddit search API (sort='{sort}') to find posts in date range {begin_date.strftime('%Y-%m-%d')} to {end_date.strftime('%Y-%m-%d')}...")
+            for search_query in search_queries:
+                if done():
                     break
-                    
+
                 try:
-                    print(f"📊 Scraping .{strategy}() with time_filter='{time_filter}'...")
-                    
-                    # Get method dynamically
-                    method = getattr(subreddit, strategy)
-                    
-                    # Calculate fetch limit based on strategy and time filter
-                    if strategy == "top":
-                        if time_filter == 'all':
-                            # For historical data, fetch much more to ensure we get enough posts
-                            # Reddit's .top(all) returns posts sorted by score, so we need to fetch many
-                            if is_large_historical:
-                                # For 3-year periods, fetch VERY aggressively
-                                # Reddit API limits to ~1000 per call, but we can make multiple calls
-                                # For large limits (400+), fetch even more aggressively
-                                if limit >= 300:
-                                    fetch_limit = min(10000, max(5000, limit * 100))  # Fetch 100x for very large limits
-                                else:
-                                    fetch_limit = min(5000, max(2000, limit * 50))  # Fetch 50x or at least 2000
-                            elif is_narrow_historical or is_historical:
-                                # For historical windows, fetch aggressively
-                                fetch_limit = min(3000, max(1000, limit * 30))  # Fetch 30x or at least 1000
-                            else:
-                                fetch_limit = min(10000, max(1000, limit * 100))  # Fetch 100x or at least 1000
-                        elif time_filter == 'year':
-                            fetch_limit = min(2000, limit * fetch_multiplier)
-                        elif time_filter == 'month':
-                            fetch_limit = min(1000, limit * fetch_multiplier)
-                        else:
-                            fetch_limit = min(500, limit * fetch_multiplier)
-                        
-                        # Use time_filter for top posts
-                        # For historical data with 'all', fetch aggressively
-                        fetched_count = 0
-                        in_range_count = 0
-                        
-                        # Fetch posts - Reddit limits to ~1000 posts per call
-                        # For large historical ranges, make multiple calls if needed
-                        posts_per_call = min(1000, fetch_limit)  # Reddit's practical limit per call
-                        
-                        # For large historical ranges, we may need multiple iterations
-                        # Reddit doesn't support pagination directly, but we can try different approaches
-                        max_iterations = 1
-                        if is_large_historical and fetch_limit > 1000:
-                            # For very large ranges, try fetching multiple times
-                            # (though Reddit will return same top posts, this helps with date filtering)
-                            max_iterations = min(3, (fetch_limit // 1000) + 1)
-                        
-                        for iteration in range(max_iterations):
-                            if len(posts) >= limit:
-                                break
-                            
-                            for post in method(limit=posts_per_call, time_filter=time_filter):
-                                fetched_count += 1
-                                
-                                # Check if post is within date range
-                                post_time = datetime.utcfromtimestamp(post.created_utc)
-                                if post_time < begin_date or post_time > end_date:
-                                    continue
-                                
-                                in_range_count += 1
-                                if len(posts) >= limit:
-                                    break
-                                
-                                post_url = f"https://reddit.com{getattr(post, 'permalink', '')}"
-                                if post_url in seen_urls:
-                                    continue
-                                seen_urls.add(post_url)
-
-                                posts.append({
-                                    "source": "reddit",
-                                    "title": clean_text(getattr(post, "title", "")),
-                                    "content": clean_text(getattr(post, "selftext", "")),
-                                    "author": (post.author.name if getattr(post, "author", None) else "[deleted]"),
-                                    "url": post_url,
-                                    "score": getattr(post, "score", 0),
-                                    "timestamp": post_time.isoformat() + "Z",
-                                    "id": post.id,
-                                    "strategy": strategy,
-                                    "time_filter": time_filter
-                                })
-                                
-                                # For large historical ranges, continue fetching even if we have some posts
-                                # to maximize coverage
-                                if fetched_count >= posts_per_call:
-                                    break
-                        
-                        # Early exit if we've fetched enough and have posts (for non-large ranges)
-                        if not is_large_historical and fetched_count >= fetch_limit and len(posts) > 0:
+                    print(f"🔍 Searching with query='{search_query or '(all)'}', sort='{sort}'...")
+
+                    limiter.acquire(10)  # up to 10 listing pages of 100
+                    search_results = subreddit.search(
+                        query=search_query,
+                        sort=sort,
+                        limit=1000,  # Max Reddit allows
+                        time_filter='all'
+                    )
+
+                    search_count = 0
+                    for post in search_results:
+                        search_count += 1
+                        if done():
                             break
-                    else:
-                        # For controversial and rising, use smaller limits
-                        fetch_limit = min(200, limit - len(posts))
-                        
-                        for post in method(limit=fetch_limit):
-                            if len(posts) >= limit:
-                                break
-                            
-                            # Check if post is within date range
-                            post_time = datetime.utcfromtimestamp(post.created_utc)
-                            if post_time < begin_date or post_time > end_date:
-                                continue
-                            
-                            post_url = f"https://reddit.com{getattr(post, 'permalink', '')}"
-                            if post_url in seen_urls:
-                                continue
-                            seen_urls.add(post_url)
-
-                            posts.append({
-                                "source": "reddit",
-                                "title": clean_text(getattr(post, "title", "")),
-                                "content": clean_text(getattr(post, "selftext", "")),
-                                "author": (post.author.name if getattr(post, "author", None) else "[deleted]"),
-                                "url": post_url,
-                                "score": getattr(post, "score", 0),
-                                "timestamp": post_time.isoformat() + "Z",
-                                "id": post.id,
-                                "strategy": strategy,
-                                "time_filter": time_filter
-                            })
-                    
-                    strategy_posts = len([p for p in posts if p.get('strategy') == strategy and p.get('time_filter') == time_filter])
-                    if time_filter == 'all':
-                        print(f"✅ {strategy}({time_filter}): {strategy_posts} posts (fetched {fetched_count}, {in_range_count} in date range)")
-                    else:
-                        print(f"✅ {strategy}({time_filter}): {strategy_posts} posts")
-                    
+
+                        post_time = datetime.utcfromtimestamp(post.created_utc)
+                        if post_time < begin_date or post_time > end_date:
+                            continue
+
+                        add_post(post, post_time, "search", sort)
+
+                    if search_count > 0:
+                        found = len([p for p in posts if p.get('strategy') == 'search' and p.get('time_filter') == sort])
+                        print(f"✅ Search ({sort}): {found} posts in date range (checked {search_count} posts)")
                 except Exception as e:
-                    print(f"⚠️ Error with {strategy}({time_filter}): {e}")
+                    print(f"⚠️ Search ({sort}) failed: {e}")
+                    errors += 1
                     continue
+            return False
+
+        def run_listing(strategy: str, time_filter: str, limiter) -> bool:
+            """
+            .top()/.controversial()/.rising() through the listing page cache.
+            Returns True when this time filter has been fetched in full and
+            further strategies for it can be skipped.
+            """
+            print(f"📊 Scraping .{strategy}() with time_filter='{time_filter}'...")
+            fetched_count = 0
+            in_range_count = 0
+            satisfied = False
+
+            # Calculate fetch limit based on strategy and time filter
+            if strategy == "top":
+                if time_filter == 'all':
+                    # For historical data, fetch much more to ensure we get enough posts
+                    # Reddit's .top(all) returns posts sorted by score, so we need to fetch many
+                    if is_large_historical:
+                        # For 3-year periods, fetch VERY aggressively
+                        # Reddit API limits to ~1000 per call, but we can make multiple calls
+                        # For large limits (400+), fetch even more aggressively
+                        if limit >= 300:
+                            fetch_limit = min(10000, max(5000, limit * 100))  # Fetch 100x for very large limits
+                        else:
+                            fetch_limit = min(5000, max(2000, limit * 50))  # Fetch 50x or at least 2000
+                    elif is_narrow_historical or is_historical:
+                        # For historical windows, fetch aggressively
+                        fetch_limit = min(3000, max(1000, limit * 30))  # Fetch 30x or at least 1000
+                    else:
+                        fetch_limit = min(10000, max(1000, limit * 100))  # Fetch 100x or at least 1000
+                elif time_filter == 'year':
+                    fetch_limit = min(2000, limit * fetch_multiplier)
+                elif time_filter == 'month':
+                    fetch_limit = min(1000, limit * fetch_multiplier)
+                else:
+                    fetch_limit = min(500, limit * fetch_multiplier)
+
+                # Fetch posts - Reddit limits to ~1000 posts per call
+                # For large historical ranges, make multiple calls if needed
+                posts_per_call = min(1000, fetch_limit)  # Reddit's practical limit per call
+
+                # For large historical ranges, we may need multiple iterations
+                # Reddit doesn't support pagination directly, but we can try different approaches
+                max_iterations = 1
+                if is_large_historical and fetch_limit > 1000:
+                    # For very large ranges, try fetching multiple times
+                    # (though Reddit will return same top posts, this helps with date filtering)
+                    max_iterations = min(3, (fetch_limit // 1000) + 1)
+
+                for iteration in range(max_iterations):
+                    if done():
+                        break
+
+                    # Repeated passes are served from the listing page cache
+                    for post in iter_listing(
+                        reddit, subreddit_name, strategy, time_filter,
+                        limit=posts_per_call, rate_limiter=limiter
+                    ):
+                        fetched_count += 1
+
+                        # Check if post is within date range
+                        post_time = datetime.utcfromtimestamp(post.created_utc)
+                        if post_time < begin_date or post_time > end_date:
+                            continue
+
+                        in_range_count += 1
+                        if done():
+                            break
+
+                        add_post(post, post_time, strategy, time_filter)
+
+                        # For large historical ranges, continue fetching even if we have some posts
+                        # to maximize coverage
+                        if fetched_count >= posts_per_call:
+                            break
+
+                # Early exit if we've fetched enough and have posts (for non-large ranges)
+                if not is_large_historical and fetched_count >= fetch_limit and len(posts) > 0:
+                    satisfied = True
+            else:
+                # For controversial and rising, use smaller limits
+                fetch_limit = min(200, limit - len(posts))
+
+                # praw's controversial() defaults to time_filter='all'; rising has none
+                listing_filter = "all" if strategy == "controversial" else None
+                for post in iter_listing(
+                    reddit, subreddit_name, strategy, listing_filter,
+                    limit=fetch_limit, rate_limiter=limiter
+                ):
+                    if done():
+                        break
+
+                    # Check if post is within date range
+                    post_time = datetime.utcfromtimestamp(post.created_utc)
+                    if post_time < begin_date or post_time > end_date:
+                        continue
+
+                    add_post(post, post_time, strategy, time_filter)
+
+            strategy_posts = len([p for p in posts if p.get('strategy') == strategy and p.get('time_filter') == time_filter])
+            if time_filter == 'all':
+                print(f"✅ {strategy}({time_filter}): {strategy_posts} posts (fetched {fetched_count}, {in_range_count} in date range)")
+            else:
+                print(f"✅ {strategy}({time_filter}): {strategy_posts} posts")
+            return satisfied
+
+        # Candidate steps from the rules above. The planner orders them by the new
+        # in-range posts per API call they produced on earlier runs and skips dead ones.
+        shape = (
+            "large_historical" if is_large_historical else
+            "narrow_historical" if is_narrow_historical else
+            "historical" if is_historical else
+            "recent"
+        )
+        steps = []
+        if is_historical and os.getenv("REDDIT_ID_WINDOW", "1") != "0":
+            steps.append(("id_window", "window", ""))
+        if use_search:
+            steps += [("search", "all", sort) for sort in ['relevance', 'top', 'new']]
+        steps += [(strategy, time_filter, "") for time_filter in time_filters for strategy in strategies]
+
+        plan, skipped = planner.plan(steps, shape)
+        if listings_only:
+            plan = [step for step in plan if step[0] not in ("id_window", "search")]
+        print(planner.describe_plan(subreddit_name, shape, plan, skipped))
+
+        results = []
+        satisfied_filters = set()
+        for step in plan:
+            if done():
+                break
+            strategy, time_filter, sort = step
+            if strategy not in ("id_window", "search") and time_filter in satisfied_filters:
+                continue
+
+            limiter = CallCounter(rate_limiter)
+            before = len(posts)
+            try:
+                if strategy == "id_window":
+                    run_id_window(limiter)
+                elif strategy == "search":
+                    run_search(sort, limiter)
+                elif run_listing(strategy, time_filter, limiter):
+                    satisfied_filters.add(time_filter)
+            except Exception as e:
+                print(f"⚠️ Error with {strategy}({time_filter}): {e}")
+                errors += 1
+            results.append(planner.record(step, shape, limiter.calls, len(posts) - before))
+
+        planner.report(subreddit_name, shape, results)
 
     except Exception as e:
         print(f"❌ Reddit scraping error: {e}")
+        failed = True
+
+    # A client whose every call failed is dropped so the next request reconnects
+    pool.release(reddit, failed=failed or (errors > 0 and not posts))
 
     # Remove strategy and time_filter fields from final output
     for post in posts:
@@ -590,7 +572,9 @@ def scrape_all_sources_via_reddit(
     time_period: str = "Past 6 Months", 
     post_limit: int = 1000,
     begin_date: datetime = None,
-    end_date: datetime = None
+    end_date: datetime = None,
+    on_posts: Callable[[List[Dict]], None] = None,
+    on_subreddits: Callable[[List[str]], None] = None
 ) -> tuple[List[Dict], List[str]]:
     """
     Main function that scrapes all sources via Reddit-driven hashtag architecture
@@ -601,6 +585,8 @@ def scrape_all_sources_via_reddit(
         post_limit: Maximum total posts to collect across all subreddits
         begin_date: Start date for filtering (optional)
         end_date: End date for filtering (optional)
+        on_posts: Receives each subreddit's new posts as it finishes (optional)
+        on_subreddits: Receives the usable subreddit list before scraping starts (optional)
     
     Returns:
         tuple: (all_posts, hashtag_bank)
@@ -611,8 +597,11 @@ def scrape_all_sources_via_reddit(
     
     # Step 1: Get overlapping subreddits
     print(f"\n🔍 Step 1: Finding overlapping subreddits...")
-    overlapping_subreddits = get_top_overlapping_subreddits(seed_subreddit, top_n=19)
+    overlaps = get_top_overlap_scores(seed_subreddit, top_n=19)
+    overlapping_subreddits = [name for name, _ in overlaps]
     all_subreddits = [seed_subreddit] + overlapping_subreddits
+    # The seed is weighted like the strongest overlap
+    overlap_scores = {seed_subreddit: max([score for _, score in overlaps], default=1.0), **dict(overlaps)}
     print(f"✅ Found {len(all_subreddits)} total subreddits: {all_subreddits[:5]}...")
     
     # Step 2: Set up date filtering
@@ -631,42 +620,113 @@ def scrape_all_sources_via_reddit(
     
     print(f"📅 Date range: {begin_date.strftime('%Y-%m-%d')} to {end_date.strftime('%Y-%m-%d')}")
     
-    # Step 3: Scrape all subreddits
-    print(f"\n🔍 Step 2: Scraping posts from {len(all_subreddits)} subreddits...")
+    # Drop banned, private, quarantined and nonexistent subreddits before budgeting
+    try:
+        with reddit_session() as reddit:
+            live_subreddits = usable_subreddits(reddit, all_subreddits, get_rate_limiter())
+        skipped = [s for s in all_subreddits if s not in live_subreddits]
+        if skipped:
+            print(f"⏭️ Skipping {len(skipped)} unusable subreddit(s): {skipped}")
+        all_subreddits = live_subreddits
+    except Exception as e:
+        print(f"⚠️ Subreddit metadata check failed: {e}")
+    
+    if on_subreddits:
+        on_subreddits(all_subreddits)
+    
+    # Step 3: Scrape all subreddits concurrently (bounded, sharing the Reddit rate limiter)
+    workers = max(1, min(int(os.getenv("REDDIT_SUBREDDIT_WORKERS", "4")), len(all_subreddits)))
+    print(f"\n🔍 Step 2: Scraping posts from {len(all_subreddits)} subreddits ({workers} at a time)...")
     all_posts = []
-    posts_per_subreddit = max(50, post_limit // len(all_subreddits))  # Distribute posts across subreddits
+    # Budget follows overlap and past activity; unused budget moves to productive subreddits
+    allocator = BudgetAllocator(
+        post_limit, {s: overlap_scores.get(s, 1.0) for s in all_subreddits},
+        metadata={s: metadata_cache.get(s) for s in all_subreddits}
+    )
+    print(allocator.summary())
+    stop_event = threading.Event()
+    seen_urls = set()
     
-    for i, subreddit in enumerate(all_subreddits):
-        if len(all_posts) >= post_limit:
-            break
-            
-        print(f"\n📊 Scraping r/{subreddit} ({i+1}/{len(all_subreddits)})...")
+    # Hashtag statistics are kept up to date as subreddits finish
+    accumulator = HashtagAccumulator()
+    
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="subreddit")
+    pending = {}
+
+    def collect(subreddit: str, limit: int, top_up: bool) -> Tuple[List[Dict], HashtagAccumulator]:
+        posts = collect_reddit_posts_with_overlapper(
+            subreddit_name=subreddit,
+            begin_date=begin_date,
+            end_date=end_date,
+            limit=limit,
+            fetch_multiplier=3,
+            stop_event=stop_event,
+            # A top-up only reads further down the listings the first run cached
+            listings_only=top_up
+        )
+        # Tokenized in the worker; merged below if every post is kept
+        return posts, accumulate(posts)
+
+    def submit(subreddit: str, limit: int, top_up: bool = False):
+        future = executor.submit(collect, subreddit, limit, top_up)
+        pending[future] = (subreddit, limit)
+
+    try:
+        for subreddit in all_subreddits:
+            if allocator.allocation(subreddit) > 0:
+                submit(subreddit, allocator.allocation(subreddit))
         
-        try:
-            posts = collect_reddit_posts_with_overlapper(
-                subreddit_name=subreddit,
-                begin_date=begin_date,
-                end_date=end_date,
-                limit=posts_per_subreddit,
-                fetch_multiplier=3
-            )
-            
-            # Add subreddit origin to each post
-            for post in posts:
-                post["subreddit_origin"] = subreddit
-            
-            all_posts.extend(posts)
-            print(f"✅ r/{subreddit}: {len(posts)} posts collected")
+        # Merge in completion order so fast subreddits are not held up by slow ones
+        while pending and len(all_posts) < post_limit:
+            finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                subreddit, requested = pending.pop(future)
+                try:
+                    posts, subreddit_terms = future.result()
+                except Exception as e:
+                    print(f"❌ Error scraping r/{subreddit}: {e}")
+                    posts, subreddit_terms = [], None
+                
+                # A re-run with a larger limit returns the earlier posts again
+                new_posts = []
+                for post in posts:
+                    if post["url"] in seen_urls:
+                        continue
+                    seen_urls.add(post["url"])
+                    # Add subreddit origin to each post
+                    post["subreddit_origin"] = subreddit
+                    new_posts.append(post)
+                new_posts = new_posts[:max(0, post_limit - len(all_posts))]
+                
+                if subreddit_terms is not None and len(new_posts) == len(posts):
+                    accumulator.merge(subreddit_terms)
+                else:
+                    accumulator.add_posts(new_posts)
+                all_posts.extend(new_posts)
+                if on_posts and new_posts:
+                    on_posts(new_posts)
+                print(f"✅ r/{subreddit}: {len(new_posts)} posts collected (budget {requested}, total {len(all_posts)}/{post_limit})")
+                
+                for top_up_subreddit, new_limit in allocator.settle(subreddit, requested, len(posts)):
+                    print(f"💰 r/{top_up_subreddit} is productive; raising its budget to {new_limit}")
+                    submit(top_up_subreddit, new_limit, top_up=True)
             
-        except Exception as e:
-            print(f"❌ Error scraping r/{subreddit}: {e}")
-            continue
+        if len(all_posts) >= post_limit:
+            print(f"🎯 Reached post_limit={post_limit}; stopping remaining subreddits")
+    finally:
+        # Unstarted subreddits are cancelled and running ones stop at their next check
+        stop_event.set()
+        executor.shutdown(wait=False, cancel_futures=True)
+    
+    print(allocator.summary())
+    save_activity(allocator.fills)
+    all_posts = all_posts[:post_limit]
     
     # Step 4: Generate enhanced hashtags
     print(f"\n🏷️ Step 3: Generating enhanced hashtag bank...")
     print(f"📊 Processing {len(all_posts)} posts from {len(all_subreddits)} subreddits")
     
-    hashtag_bank = generate_enhanced_hashtags(all_posts, all_subreddits, max_hashtags=100)
+    hashtag_bank = generate_enhanced_hashtags(all_posts, all_subreddits, max_hashtags=100, accumulator=accumulator)
     
     print(f"✅ Generated {len(hashtag_bank)} hashtags")
     print(f"📝 Sample hashtags: {hashtag_bank[:10]}")
@@ -0,0 +1,143 @@
+"""
+Adaptive Reddit strategy planner
+collect_reddit_posts_with_overlapper builds its candidate steps (id_window,
+search sorts, top/controversial/rising per time filter) from the date window.
+The planner orders those steps by the new in-range posts per API call each
+one produced on earlier runs with the same window shape, skips steps that
+keep coming back empty, and reports what the run actually achieved.
+
+Statistics are kept per (strategy, time_filter, sort, window shape) and
+persisted as JSON (see planner_stats.py):
+
+    STRATEGY_STATS_PATH   default .cache/strategy_stats.json
+"""
+
+import os
+import time
+from typing import Dict, List, Tuple
+
+from planner_stats import PlannerStats, smoothed_yield
+
+Step = Tuple[str, str, str]  # (strategy, time_filter, sort)
+
+# A step is skipped once it has this many runs and has yielded less than this per call...
+MIN_RUNS_TO_SKIP = 3
+SKIP_BELOW_YIELD = 0.2
+# ...but every Nth plan still runs it, so a step can recover when things change
+EXPLORE_EVERY = 10
+
+DEFAULT_STATS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "strategy_stats.json")
+
+
+def step_label(step: Step) -> str:
+    strategy, time_filter, sort = step
+    if strategy == "search":
+        return f"search({sort})"
+    if strategy == "id_window":
+        return "id_window"
+    return f"{strategy}({time_filter})"
+
+
+class CallCounter:
+    """Forwards to the shared rate limiter and counts the calls one step made"""
+
+    def __init__(self, rate_limiter=None):
+        self.rate_limiter = rate_limiter
+        self.calls = 0.0
+
+    def acquire(self, cost: float = 1.0):
+        self.calls += cost
+        if self.rate_limiter:
+            self.rate_limiter.acquire(cost)
+
+
+class StrategyPlanner(PlannerStats):
+    """Orders and prunes scrape steps by their observed in-range yield per call"""
+
+    label = "strategy stats"
+
+    def __init__(self, path: str = DEFAULT_STATS_PATH):
+        super().__init__(path)
+
+    @staticmethod
+    def _key(step: Step, shape: str) -> str:
+        return "|".join([*step, shape])
+
+    def expected_yield(self, step: Step, shape: str) -> float:
+        """New in-range posts per API call, smoothed towards the optimistic prior"""
+        entry = self._stats.get(self._key(step, shape), {})
+        return smoothed_yield(entry.get("posts", 0), entry.get("calls", 0))
+
+    def plan(self, steps: List[Step], shape: str) -> Tuple[List[Step], List[Step]]:
+        """(steps to run, best expected yield first; steps skipped as unproductive)"""
+        with self._lock:
+            scored = []
+            skipped = []
+            for index, step in enumerate(steps):
+                expected = self.expected_yield(step, shape)
+                entry = self._stats.setdefault(self._key(step, shape), {})
+                # Skipping looks at the observed yield only; the prior is for ordering
+                observed = entry["posts"] / entry["calls"] if entry.get("calls") else expected
+                if entry.get("runs", 0) >= MIN_RUNS_TO_SKIP and observed < SKIP_BELOW_YIELD:
+                    entry["skipped"] = entry.get("skipped", 0) + 1
+                    if entry["skipped"] % EXPLORE_EVERY != 0:
+                        skipped.append(step)
+                        continue
+                # Ties keep the rule-based order, so a cold start behaves as before
+                scored.append((-expected, index, step))
+            if not scored and skipped:
+                # Never plan nothing: fall back to the least bad skipped step
+                best = max(skipped, key=lambda s: self.expected_yield(s, shape))
+                skipped.remove(best)
+                scored.append((0, 0, best))
+            scored.sort()
+            return [step for _, _, step in scored], skipped
+
+    def describe_plan(self, subreddit: str, shape: str, plan: List[Step], skipped: List[Step]) -> str:
+        parts = [f"{step_label(s)} ~{self.expected_yield(s, shape):.1f}/call" for s in plan]
+        text = f"🧭 Plan for r/{subreddit} ({shape}): " + ", ".join(parts)
+        if skipped:
+            text += f" | skipped: {', '.join(step_label(s) for s in skipped)}"
+        return text
+
+    def record(self, step: Step, shape: str, calls: float, posts: int) -> Dict:
+        """Record one executed step; steps served entirely from cache (0 calls) carry no cost signal"""
+        if calls > 0:
+            with self._lock:
+                entry = self._stats.setdefault(self._key(step, shape), {})
+                entry["runs"] = entry.get("runs", 0) + 1
+                entry["calls"] = entry.get("calls", 0) + calls
+                entry["posts"] = entry.get("posts", 0) + posts
+        return {
+            "step": step_label(step),
+            "calls": calls,
+            "posts": posts,
+            "yield": round(posts / calls, 2) if calls else None,
+        }
+
+    def report(self, subreddit: str, shape: str, results: List[Dict]):
+        """Print and keep the achieved yield of a run, then persist the statistics"""
+        calls = sum(r["calls"] for r in results)
+        posts = sum(r["posts"] for r in results)
+        steps = ", ".join(f"{r['step']} {r['posts']}/{r['calls']:g}" for r in results)
+        print(f"📈 r/{subreddit} achieved {posts} posts in {calls:g} calls ({steps})")
+        self.recent_reports.append({
+            "subreddit": subreddit,
+            "shape": shape,
+            "at": time.time(),
+            "posts": posts,
+            "calls": calls,
+            "steps": results,
+        })
+        self.save()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            table = {
+                key: {**entry, "yield": round(entry["posts"] / entry["calls"], 2)}
+                for key, entry in self._stats.items() if entry.get("calls")
+            }
+            return {"path": self.path, "steps": table, "recent": list(self.recent_reports)}
+
+
+planner = StrategyPlanner(os.getenv("STRATEGY_STATS_PATH", DEFAULT_STATS_PATH))
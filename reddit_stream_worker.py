@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+CollectPosts - Real-time Reddit Ingestion Worker
+Follows new submissions for a watched set of subreddits (plus their overlap
+sets) by polling their combined /new listing and writes them into the local
+post store, deduplicated by ID.
+
+A poll only sees the newest 100 items. Coverage is therefore only recorded
+while polls connect: a poll that returned a full page of unseen posts may
+have missed some between polls, so the covered run ends there and a new one
+starts. API requests for recent, covered windows are answered from local
+data instead of live scraping (posts whose scores refresh_scores has not
+updated yet are taken by recency, see PostStore.window).
+
+Subreddits are followed as multireddits of up to 50 names, one poller per
+group, each on its own leased client.
+
+Usage:
+    python reddit_stream_worker.py --subreddits politics,technology --overlaps 19
+
+    STREAM_SUBREDDITS   default for --subreddits
+"""
+
+import argparse
+import os
+import signal
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List
+
+from post_store import get_post_store, post_row
+from reddit_client import get_rate_limiter, get_reddit_pool, reddit_session
+
+# Subreddits per multireddit stream (keeps the request path short)
+STREAM_GROUP_SIZE = 50
+# Items per /new poll (Reddit's page size)
+POLL_LIMIT = 100
+POLL_SECONDS = 5.0
+FLUSH_EVERY = 100
+FLUSH_SECONDS = 5.0
+MAX_BACKOFF_SECONDS = 300
+# IDs remembered to recognize already seen posts
+SEEN_IDS = 5000
+
+
+def watched_subreddits(seeds: List[str], overlaps: int) -> List[str]:
+    """Seeds plus their top overlapping subreddits, minus dead or invalid ones"""
+    from reddit_scraper import get_top_overlap_scores
+    from subreddit_metadata import usable_subreddits
+
+    names = list(seeds)
+    if overlaps > 0:
+        for seed in seeds:
+            names += [name for name, _ in get_top_overlap_scores(seed, top_n=overlaps)]
+    names = list(dict.fromkeys(names))
+
+    with reddit_session() as reddit:
+        return usable_subreddits(reddit, names, get_rate_limiter())
+
+
+class StreamWorker:
+    """Follows one multireddit stream per group of subreddits until stopped"""
+
+    def __init__(self, subreddits: List[str], flush_every: int = FLUSH_EVERY, flush_seconds: float = FLUSH_SECONDS):
+        self.subreddits = subreddits
+        self.flush_every = flush_every
+        self.flush_seconds = flush_seconds
+        self.store = get_post_store(create=True)
+        self.stop_event = threading.Event()
+        self.ingested = 0
+        self._lock = threading.Lock()
+
+    def _flush(self, group: List[str], batch: List[Dict], run_begin: float, covered_to: float, source: str):
+        if batch:
+            self.store.upsert_posts(batch)
+            with self._lock:
+                self.ingested += len(batch)
+        if covered_to > run_begin:
+            # Every post created in [run_begin, covered_to] was on a connected poll
+            self.store.set_coverage(group, run_begin, covered_to, source)
+
+    def _follow(self, index: int, group: List[str]):
+        """Poll one group's /new listing, restarting with backoff (and a new coverage run) after errors"""
+        pool = get_reddit_pool()
+        rate_limiter = get_rate_limiter()
+        backoff = 5
+        path = f"r/{'+'.join(group)}/new"
+        while not self.stop_event.is_set():
+            reddit = pool.acquire()
+            failed = False
+            seen: "OrderedDict[str, None]" = OrderedDict()
+            run_begin = covered_to = None
+            batch: List[Dict] = []
+            last_flush = time.time()
+            print(f"📡 Stream {index}: following {len(group)} subreddit(s)")
+            try:
+                while not self.stop_event.is_set():
+                    polled_at = time.time()
+                    rate_limiter.acquire(1)
+                    listing = reddit.request(method="GET", path=path, params={"limit": POLL_LIMIT, "raw_json": 1})
+                    items = [child["data"] for child in listing.get("data", {}).get("children", [])]
+                    new = [data for data in items if data.get("id") and data["id"] not in seen]
+
+                    # Connected: the page reached back to posts an earlier poll saw,
+                    # or it holds everything there is
+                    connected = len(new) < len(items) or len(items) < POLL_LIMIT
+                    if run_begin is None or not connected:
+                        if run_begin is not None:
+                            print(f"⚠️ Stream {index}: a full page of new posts, some may have been missed")
+                            self._flush(group, batch, run_begin, covered_to, f"stream:{index}:{int(run_begin)}")
+                            batch = []
+                        # Posts created before this poll are only partly known
+                        run_begin = covered_to = polled_at
+                    else:
+                        covered_to = polled_at
+
+                    batch.extend(post_row(data, "stream") for data in new)
+                    for data in new:
+                        seen[data["id"]] = None
+                    while len(seen) > SEEN_IDS:
+                        seen.popitem(last=False)
+
+                    if len(batch) >= self.flush_every or time.time() - last_flush >= self.flush_seconds:
+                        self._flush(group, batch, run_begin, covered_to, f"stream:{index}:{int(run_begin)}")
+                        if batch:
+                            print(f"📡 Stream {index}: +{len(batch)} posts ({self.ingested} total)")
+                        batch = []
+                        last_flush = time.time()
+                        backoff = 5
+                    self.stop_event.wait(POLL_SECONDS)
+                if run_begin is not None:
+                    self._flush(group, batch, run_begin, covered_to, f"stream:{index}:{int(run_begin)}")
+            except Exception as e:
+                failed = True
+                print(f"⚠️ Stream {index} failed: {e}; restarting in {backoff}s")
+                self.stop_event.wait(backoff)
+                backoff = min(MAX_BACKOFF_SECONDS, backoff * 2)
+            finally:
+                pool.release(reddit, failed=failed)
+
+    def run(self):
+        groups = [self.subreddits[i:i + STREAM_GROUP_SIZE] for i in range(0, len(self.subreddits), STREAM_GROUP_SIZE)]
+        threads = [
+            threading.Thread(target=self._follow, args=(index, group), name=f"stream-{index}", daemon=True)
+            for index, group in enumerate(groups)
+        ]
+        for thread in threads:
+            thread.start()
+        while any(thread.is_alive() for thread in threads):
+            for thread in threads:
+                thread.join(timeout=1.0)
+
+    def stop(self):
+        self.stop_event.set()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Stream new Reddit submissions into the local post store')
+    parser.add_argument('--subreddits', default=os.getenv("STREAM_SUBREDDITS", ""),
+                        help='Comma-separated subreddits to watch')
+    parser.add_argument('--overlaps', type=int, default=19,
+                        help='Also watch this many overlapping subreddits per seed (0 to disable)')
+    args = parser.parse_args()
+
+    seeds = [s.strip() for s in args.subreddits.split(",") if s.strip()]
+    if not seeds:
+        print("❌ No subreddits given (--subreddits or STREAM_SUBREDDITS)")
+        return 1
+
+    print("=" * 60)
+    print("CollectPosts - Real-time Reddit Ingestion")
+    print("=" * 60)
+    subreddits = watched_subreddits(seeds, args.overlaps)
+    if not subreddits:
+        print("❌ None of the subreddits can be streamed")
+        return 1
+    print(f"📡 Watching {len(subreddits)} subreddit(s): {subreddits[:10]}{'...' if len(subreddits) > 10 else ''}")
+
+    worker = StreamWorker(subreddits)
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(sig, lambda *_: worker.stop())
+    worker.run()
+    print(f"✅ Stopped after ingesting {worker.ingested} posts into {worker.store.path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+CollectPosts - Batched Score Refresh
+Rehydrates score, comment count and removal status of posts in the local
+store through /api/info, 100 IDs per call, instead of re-scraping them.
+Batches run on a few leased clients at once, and every call takes a token
+from the shared Reddit rate limiter, so a 100k-post corpus costs ~1000 calls.
+
+Usage:
+    python refresh_scores.py --max-age-hours 6 --limit 100000 --workers 4
+"""
+
+import argparse
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, List
+
+from post_store import get_post_store
+from reddit_client import get_rate_limiter, get_reddit_pool
+
+INFO_BATCH_SIZE = 100
+
+
+def fetch_stats(reddit, ids: List[str]) -> List[Dict]:
+    """Current score/num_comments/removed for up to 100 post IDs"""
+    listing = reddit.request(
+        method="GET",
+        path="api/info",
+        params={"id": ",".join(f"t3_{post_id}" for post_id in ids), "raw_json": 1}
+    )
+    now = int(time.time())
+    rows = {}
+    for child in listing.get("data", {}).get("children", []):
+        data = child.get("data", {})
+        if child.get("kind") != "t3" or "id" not in data:
+            continue
+        rows[data["id"]] = {
+            "id": data["id"],
+            "score": int(data.get("score") or 0),
+            "num_comments": int(data.get("num_comments") or 0),
+            "removed": int(
+                bool(data.get("removed_by_category"))
+                or data.get("selftext") in ("[removed]", "[deleted]")
+            ),
+            "updated_utc": now,
+        }
+    # IDs missing from the answer are left as they are (still stale), so a
+    # partial response never marks live posts removed; the next run retries them
+    return list(rows.values())
+
+
+def refresh_batch(ids: List[str]) -> List[Dict]:
+    """One /api/info call on a leased client"""
+    pool = get_reddit_pool()
+    reddit = pool.acquire()
+    failed = False
+    try:
+        get_rate_limiter().acquire(1)
+        return fetch_stats(reddit, ids)
+    except Exception:
+        failed = True
+        raise
+    finally:
+        pool.release(reddit, failed=failed)
+
+
+def refresh_stored_posts(max_age_hours: float = 6.0, limit: int = 100000,
+                         subreddit: str = None, workers: int = 4) -> Dict:
+    """Refresh posts whose stats are older than max_age_hours; returns a summary"""
+    store = get_post_store()
+    if store is None:
+        return {"posts": 0, "calls": 0, "updated": 0, "removed": 0, "missing": 0, "failed_batches": 0, "seconds": 0.0}
+
+    started = time.time()
+    ids = store.stale_ids(started - max_age_hours * 3600, limit, subreddit)
+    batches = [ids[i:i + INFO_BATCH_SIZE] for i in range(0, len(ids), INFO_BATCH_SIZE)]
+    print(f"🔄 Refreshing {len(ids)} stored posts in {len(batches)} /api/info call(s)...")
+
+    updated = removed = missing = failed_batches = 0
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="refresh") as executor:
+        futures = {executor.submit(refresh_batch, batch): batch for batch in batches}
+        for done_count, future in enumerate(as_completed(futures), start=1):
+            try:
+                rows = future.result()
+            except Exception as e:
+                failed_batches += 1
+                print(f"⚠️ Refresh batch failed: {e}")
+                continue
+            updated += store.update_stats(rows)
+            removed += sum(row["removed"] for row in rows)
+            missing += len(futures[future]) - len(rows)
+            if done_count % 50 == 0:
+                print(f"🔄 {done_count}/{len(batches)} batches, {updated} posts updated")
+
+    summary = {
+        "posts": len(ids),
+        "calls": len(batches),
+        "updated": updated,
+        "removed": removed,
+        "missing": missing,
+        "failed_batches": failed_batches,
+        "seconds": round(time.time() - started, 1),
+    }
+    print(f"✅ Refreshed {updated} posts ({removed} removed, {missing} not returned) with {len(batches)} calls in {summary['seconds']}s")
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Refresh scores of stored Reddit posts via /api/info')
+    parser.add_argument('--max-age-hours', type=float, default=6.0,
+                        help='Refresh posts whose stats are older than this')
+    parser.add_argument('--limit', type=int, default=100000, help='Maximum posts to refresh')
+    parser.add_argument('--subreddit', default=None, help='Only refresh this subreddit')
+    parser.add_argument('--workers', type=int, default=4, help='Concurrent /api/info calls')
+    args = parser.parse_args()
+
+    if get_post_store() is None:
+        print("❌ No local post store yet (run ingest_reddit_dumps.py or reddit_stream_worker.py first)")
+        return 1
+    summary = refresh_stored_posts(args.max_age_hours, args.limit, args.subreddit, args.workers)
+    return 1 if summary["failed_batches"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,269 @@
+"""
+Pipelined Reddit -> hashtag -> source scraping
+YouTube, Instagram, Quora and Threads used to wait for the whole Reddit step
+and hashtag extraction. Here Reddit posts are fed to a HashtagStabilizer as
+they are collected; as soon as the top terms of the growing sample stop
+changing, the downstream sources start with that early bank while Reddit
+collection continues. End-to-end time approaches max(Reddit, other sources)
+instead of their sum.
+
+If the bank never settles (small or slow samples), downstream sources start
+with the full Reddit bank when Reddit finishes, exactly as before, or with
+the current bank after PIPELINE_MAX_WAIT_SECONDS.
+
+The stabilizer has counted every Reddit post by the time collection ends, so
+the final bank is read from its counts (final_bank) rather than tagging the
+posts a second time.
+
+    PIPELINE_TOP_N              terms that must stop changing (default 10)
+    PIPELINE_MIN_POSTS          sample size before stability is checked (default 50)
+    PIPELINE_STABLE_CHECKS      consecutive unchanged checks required (default 3)
+    PIPELINE_MAX_WAIT_SECONDS   start downstream with the current bank after this (default 60)
+    PIPELINE_ENABLED            set to 0 to run the steps one after another
+"""
+
+import os
+import queue
+import threading
+import time
+from collections import Counter
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+TOP_N = int(os.getenv("PIPELINE_TOP_N", "10"))
+MIN_POSTS = int(os.getenv("PIPELINE_MIN_POSTS", "50"))
+STABLE_CHECKS = int(os.getenv("PIPELINE_STABLE_CHECKS", "3"))
+MAX_WAIT_SECONDS = float(os.getenv("PIPELINE_MAX_WAIT_SECONDS", "60"))
+POLL_SECONDS = 0.5
+
+
+def pipeline_enabled() -> bool:
+    return os.getenv("PIPELINE_ENABLED", "1") != "0"
+
+
+def sample_size(limit: int) -> int:
+    """Posts to sample before checking stability; small requests settle on a quarter of their limit"""
+    return max(1, min(MIN_POSTS, max(10, limit // 4)))
+
+
+class HashtagStabilizer:
+    """
+    Tracks the hashtag bank of a growing post sample. add_posts is cheap and
+    safe to call from scraper threads; the counting happens in poll(), which
+    reports whether the top terms have stopped changing.
+    """
+
+    def __init__(self, ingest: Callable[[List[Dict]], None], top: Callable[[int], List[str]],
+                 bank: Callable[[], List[str]], min_posts: int = MIN_POSTS, top_n: int = TOP_N,
+                 stable_checks: int = STABLE_CHECKS):
+        self.ingest = ingest
+        self.top = top
+        self.bank = bank
+        self.min_posts = min_posts
+        self.top_n = top_n
+        self.stable_checks = stable_checks
+        self.check_every = max(5, min_posts // 2)
+        self._lock = threading.Lock()
+        # poll() runs on the orchestrator thread and, via final_bank, on the Reddit thread
+        self._poll_lock = threading.Lock()
+        self._pending: List[Dict] = []
+        self.posts = 0
+        self._checked_at = 0
+        self._last_top = None
+        self._unchanged = 0
+
+    def add_posts(self, posts: List[Dict]):
+        with self._lock:
+            self._pending.extend(posts)
+
+    def poll(self) -> bool:
+        """Count posts received since the last poll; True once the top terms are stable"""
+        with self._poll_lock:
+            with self._lock:
+                batch, self._pending = self._pending, []
+            if batch:
+                self.ingest(batch)
+                self.posts += len(batch)
+            if self.posts < self.min_posts or self.posts - self._checked_at < self.check_every:
+                return self.stable
+            self._checked_at = self.posts
+
+            top = set(self.top(self.top_n))
+            if len(top) >= self.top_n and top == self._last_top:
+                self._unchanged += 1
+            else:
+                self._unchanged = 0
+            self._last_top = top
+            return self.stable
+
+    def final_bank(self, posts: List[Dict], extract: Callable[[List[Dict]], List[str]]) -> List[str]:
+        """
+        Bank of the finished Reddit step. When every one of these posts went
+        through add_posts, the counts already made are reused; otherwise (posts
+        filtered or sampled afterwards, a failed ingest) extract(posts) runs.
+        """
+        try:
+            self.poll()
+            with self._poll_lock:
+                if self.posts == len(posts):
+                    return self.bank()
+        except Exception as e:
+            print(f"⚠️ Could not reuse sampled hashtag counts: {e}")
+        return extract(posts)
+
+    @property
+    def stable(self) -> bool:
+        return self._unchanged >= self.stable_checks
+
+
+def noun_stabilizer(min_posts: int = MIN_POSTS, max_hashtags: int = 50) -> HashtagStabilizer:
+    """Stabilizer over the noun bank extract_noun_hashtags builds"""
+    from hashtag_extraction import count_nouns
+    from reddit_scraper import ensure_nltk_data
+    counts = Counter()
+
+    def ingest(posts: List[Dict]):
+        ensure_nltk_data()
+        counts.update(count_nouns(posts, parallel=False))
+
+    def top(k: int) -> List[str]:
+        return [noun for noun, _ in counts.most_common(k)]
+
+    return HashtagStabilizer(ingest, top, lambda: top(max_hashtags), min_posts=min_posts)
+
+
+def tfidf_stabilizer(subreddits: List[str], min_posts: int = MIN_POSTS, max_hashtags: int = 100) -> HashtagStabilizer:
+    """
+    Stabilizer over the enhanced (TF-IDF + subreddit names) bank
+    subreddits is read when the bank is built, so it may be filled in later
+    """
+    from hashtag_accumulator import HashtagAccumulator
+    accumulator = HashtagAccumulator()
+
+    def bank() -> List[str]:
+        base_tags = [f"#{s.lower()}" for s in subreddits if s.isalnum() and len(s) > 2]
+        return list(dict.fromkeys(base_tags + accumulator.hashtags(max_hashtags // 2)))[:max_hashtags]
+
+    return HashtagStabilizer(accumulator.add_posts, accumulator.hashtags, bank, min_posts=min_posts)
+
+
+SourceResult = Tuple[str, List[Dict], Optional[Exception]]
+
+
+class PipelinedScrape:
+    """
+    Runs collect_reddit(on_posts) -> (posts, bank) in the background and starts
+    run_sources(bank) -> iterator of (source, posts, error) once the bank is
+    stable. Iterating yields ("reddit", posts, error) and every source result
+    in completion order. Setting stop_event (or closing the iterator) stops
+    waiting and ends the source fan-out early; the Reddit step finishes in the
+    background, since identical requests may be waiting on it.
+    """
+
+    def __init__(self, collect_reddit: Callable[[Callable[[List[Dict]], None]], Tuple[List[Dict], List[str]]],
+                 run_sources: Callable[[List[str]], Iterator[SourceResult]],
+                 stabilizer: HashtagStabilizer, fallback_terms: Optional[List[str]] = None,
+                 max_wait_seconds: float = MAX_WAIT_SECONDS, stop_event: Optional[threading.Event] = None):
+        self.collect_reddit = collect_reddit
+        self.run_sources = run_sources
+        self.stabilizer = stabilizer
+        self.fallback_terms = fallback_terms or []
+        self.max_wait_seconds = max_wait_seconds
+        self.stop_event = stop_event or threading.Event()
+        # Filled in while running
+        self.reddit_bank: List[str] = []
+        self.source_bank: List[str] = []
+        self.sources_started_after: Optional[float] = None
+        self.start_reason = None
+
+    def __iter__(self) -> Iterator[SourceResult]:
+        finished = False
+        try:
+            yield from self._run()
+            finished = True
+        finally:
+            # Closed early (client gone): the sources worker stops at its next check
+            if not finished:
+                self.stop_event.set()
+
+    def _run(self) -> Iterator[SourceResult]:
+        results: "queue.Queue" = queue.Queue()
+        reddit_done = threading.Event()
+        started = time.monotonic()
+
+        def reddit_worker():
+            try:
+                posts, bank = self.collect_reddit(self.stabilizer.add_posts)
+                self.reddit_bank = list(bank)
+                results.put(("reddit", posts, None))
+            except Exception as e:
+                results.put(("reddit", [], e))
+            finally:
+                reddit_done.set()
+
+        def sources_worker(bank: List[str]):
+            sources = self.run_sources(bank)
+            try:
+                for result in sources:
+                    if self.stop_event.is_set():
+                        break
+                    results.put(result)
+            except Exception as e:
+                results.put(("sources", [], e))
+            finally:
+                close = getattr(sources, "close", None)
+                if close is not None:
+                    close()
+                results.put(None)
+
+        threading.Thread(target=reddit_worker, name="pipeline-reddit", daemon=True).start()
+
+        # Wait for a stable early bank, Reddit finishing or the deadline
+        while True:
+            finished = reddit_done.wait(POLL_SECONDS)
+            if self.stop_event.is_set():
+                return
+            if finished:
+                bank, self.start_reason = self.reddit_bank, "reddit_done"
+                break
+            try:
+                stable = self.stabilizer.poll()
+            except Exception as e:
+                print(f"⚠️ Hashtag sampling failed: {e}; waiting for Reddit")
+                reddit_done.wait()
+                bank, self.start_reason = self.reddit_bank, "reddit_done"
+                break
+            if stable:
+                bank, self.start_reason = self.stabilizer.bank(), "stable"
+                break
+            if time.monotonic() - started >= self.max_wait_seconds and self.stabilizer.posts >= self.stabilizer.min_posts:
+                bank, self.start_reason = self.stabilizer.bank(), "max_wait"
+                break
+
+        self.source_bank = list(bank) or list(self.fallback_terms)
+        self.sources_started_after = time.monotonic() - started
+        if self.start_reason == "reddit_done":
+            print(f"🏷️ Starting other sources after Reddit ({self.sources_started_after:.1f}s)")
+        else:
+            print(f"🏷️ Hashtag bank {self.start_reason} after {self.stabilizer.posts} Reddit posts "
+                  f"({self.sources_started_after:.1f}s); starting other sources while Reddit continues: "
+                  f"{self.source_bank[:TOP_N]}")
+        threading.Thread(target=sources_worker, args=(self.source_bank,), name="pipeline-sources", daemon=True).start()
+
+        # Reddit's result plus the sources' results, then the sources' end marker
+        remaining = 2
+        while remaining:
+            try:
+                item = results.get(timeout=POLL_SECONDS)
+            except queue.Empty:
+                if self.stop_event.is_set():
+                    return
+                continue
+            if item is None:
+                remaining -= 1
+                continue
+            if item[0] == "reddit":
+                remaining -= 1
+            if item[0] != "sources":
+                yield item
+            else:
+                print(f"❌ Source fan-out failed: {item[2]}")
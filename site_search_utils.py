@@ -4,7 +4,6 @@ from typing import List, Dict
 from urllib.parse import urlparse, parse_qs, unquote
 
 import requests
-from bs4 import BeautifulSoup
 
 
 AOL_URL = "https://search.aol.com/aol/search"
@@ -43,6 +42,8 @@ def search_site_posts(
         print(f"⚠️ AOL search failed for {site}: {e}")
         return posts
 
+    from bs4 import BeautifulSoup
+
     soup = BeautifulSoup(resp.text, "html.parser")
     results = soup.select("div.compTitle a")
 
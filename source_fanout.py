@@ -0,0 +1,174 @@
+"""
+Concurrent fan-out for the hashtag-driven sources (YouTube, Instagram, Quora, Threads)
+Every source runs in its own worker thread with its own deadline, and results are
+handed back in completion order so the slowest source sets the wall time instead
+of the sum of all of them.
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from datetime import datetime
+from typing import List, Dict, Iterator, Iterable, Optional, Tuple
+
+from youtube_scraper import collect_youtube_video_titles
+from instagram_scraper import collect_instagram_posts
+from quora_scraper import scrape_quora
+from threads_scraper import scrape_threads
+from source_query_planner import query_planner
+
+FANOUT_SOURCES = ["youtube", "instagram", "quora", "threads"]
+
+# Seconds each source may run before we stop waiting for it
+DEFAULT_SOURCE_DEADLINES = {
+    "youtube": 90,
+    "instagram": 120,
+    "quora": 45,
+    "threads": 45,
+}
+# How often a fan-out with a stop_event checks it while waiting
+STOP_CHECK_SECONDS = 0.5
+
+
+def get_source_deadline(source: str) -> float:
+    """Deadline for a source, overridable with SOURCE_DEADLINE_<SOURCE> (seconds)"""
+    env_value = os.getenv(f"SOURCE_DEADLINE_{source.upper()}")
+    if env_value:
+        try:
+            return float(env_value)
+        except ValueError:
+            pass
+    return float(DEFAULT_SOURCE_DEADLINES.get(source, 60))
+
+
+def run_source_scraper(
+    source: str,
+    query: str,
+    hashtags: List[str],
+    limit: int,
+    begin_date: datetime,
+    end_date: datetime,
+    time_passed: str = "week"
+) -> List[Dict]:
+    """Call the scraper for a single non-Reddit source"""
+    if source == 'youtube':
+        return collect_youtube_video_titles(
+            query=query,
+            hashtags=hashtags,
+            max_results=limit,
+            begin_date=begin_date,
+            end_date=end_date
+        )
+    if source == 'instagram':
+        return collect_instagram_posts(
+            query=query,
+            hashtags=hashtags,
+            max_posts=limit,
+            begin_date=begin_date,
+            end_date=end_date
+        )
+    if source == 'quora':
+        return scrape_quora(
+            query=query,
+            hashtags=hashtags,
+            time_passed=time_passed,
+            limit=limit,
+            begin_date=begin_date,
+            end_date=end_date
+        )
+    if source == 'threads':
+        return scrape_threads(
+            query=query,
+            hashtags=hashtags,
+            time_passed=time_passed,
+            limit=limit,
+            begin_date=begin_date,
+            end_date=end_date
+        )
+    raise ValueError(f"Unknown source: {source}")
+
+
+def iter_source_results(
+    sources: Iterable[str],
+    query: str,
+    hashtags: Iterable[str],
+    limits: Dict[str, int],
+    begin_date: datetime,
+    end_date: datetime,
+    time_passed: str = "week",
+    deadlines: Optional[Dict[str, float]] = None,
+    stop_event: Optional[threading.Event] = None
+) -> Iterator[Tuple[str, List[Dict], Optional[Exception]]]:
+    """
+    Run every requested non-Reddit source in parallel and yield
+    (source, posts, error) tuples as each one finishes.
+
+    Each source gets the hashtags the query planner picks for its call budget
+    (see source_query_planner.py), and its yield per term is recorded.
+
+    Sources that miss their deadline are yielded with a TimeoutError and left to
+    finish in the background; their late results are discarded. Setting
+    stop_event (the client went away) stops waiting for all of them the same way.
+    """
+    fanout = [s for s in dict.fromkeys(sources) if s in FANOUT_SOURCES]
+    if not fanout:
+        return
+
+    search_terms = list(hashtags)
+    planned = {}
+    for source in fanout:
+        planned[source], summary = query_planner.plan(source, search_terms, limits[source])
+        if planned[source]:
+            print(query_planner.describe_plan(summary))
+    deadlines = deadlines or {}
+    started = time.monotonic()
+    due = {s: started + deadlines.get(s, get_source_deadline(s)) for s in fanout}
+
+    executor = ThreadPoolExecutor(max_workers=len(fanout), thread_name_prefix="source")
+    try:
+        pending = {
+            executor.submit(
+                run_source_scraper,
+                source,
+                query,
+                planned[source],
+                limits[source],
+                begin_date,
+                end_date,
+                time_passed
+            ): source
+            for source in fanout
+        }
+
+        while pending:
+            if stop_event is not None and stop_event.is_set():
+                return
+            timeout = max(0.0, min(due[s] for s in pending.values()) - time.monotonic())
+            if stop_event is not None:
+                timeout = min(timeout, STOP_CHECK_SECONDS)
+            done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                source = pending.pop(future)
+                try:
+                    posts = future.result() or []
+                except Exception as e:
+                    yield source, [], e
+                    continue
+                try:
+                    query_planner.record(source, planned[source], posts, limits[source])
+                except Exception as e:
+                    print(f"⚠️ Could not record {source} query yields: {e}")
+                yield source, posts, None
+
+            now = time.monotonic()
+            for future, source in list(pending.items()):
+                if now >= due[source]:
+                    del pending[future]
+                    future.cancel()
+                    elapsed = now - started
+                    yield source, [], TimeoutError(f"{source} missed its deadline after {elapsed:.1f}s")
+    finally:
+        # Never block the caller on a straggler that already missed its deadline
+        executor.shutdown(wait=False, cancel_futures=True)
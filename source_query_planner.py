@@ -0,0 +1,248 @@
+"""
+Cost-aware hashtag planner for the non-Reddit sources
+Each downstream scraper queries the first few terms of the hashtag bank
+(YouTube 10 terms x 3 orders, each paginated 50 results at a time up to the
+post limit, Instagram 5, Quora and Threads 3), so calls were spent on
+whatever terms came first. The planner scores every term per
+source by its expected yield (posts it is likely to return), divides by the
+calls it costs, and fills each source's call budget with the best terms.
+
+Expected yield is the term's past posts per run for that source, smoothed
+towards a prior: the source's average yield scaled by how the term did on
+the other sources or, if it never ran, by its specificity (short and
+generic words like #news match everything and little of it is on topic).
+Untried terms keep the optimistic prior of planner_stats.py.
+
+Hits are credited to the terms a returned post mentions, or spread over the
+queried terms when it mentions none. Statistics persist as JSON:
+
+    SOURCE_QUERY_STATS_PATH        default .cache/source_query_stats.json
+    SOURCE_CALL_BUDGET_<SOURCE>    calls per run, e.g. SOURCE_CALL_BUDGET_YOUTUBE=12
+                                   (defaults spend what the scrapers did before);
+                                   a YouTube term is charged every page it may fetch
+"""
+
+import os
+import time
+from typing import Dict, List, Tuple
+
+from planner_stats import PRIOR_YIELD, PlannerStats, smoothed_yield
+
+# Most terms each scraper takes from the bank
+MAX_TERMS = {"youtube": 10, "instagram": 5, "quora": 3, "threads": 3}
+# Calls one term costs: YouTube searches it once per order (relevance, viewCount, rating)
+TERM_CALLS = {"youtube": 3, "instagram": 1, "quora": 1, "threads": 1}
+# Results per call of paginated sources: YouTube pages search.list 50 results at a
+# time and requests up to limit // 50 + 1 pages per order before it has `limit` posts
+PAGE_SIZE = {"youtube": 50}
+# YouTube Data API search.list costs 100 quota units per call
+QUOTA_UNITS_PER_CALL = {"youtube": 100}
+
+# A term's results on the other sources can at most triple its prior here
+MAX_RELATIVE_YIELD = 3.0
+
+# Words that match a lot of unrelated content
+GENERIC_TERMS = {
+    'video', 'videos', 'photo', 'photos', 'today', 'year', 'years', 'week', 'life', 'love', 'world',
+    'stuff', 'question', 'questions', 'answer', 'answers', 'help', 'update', 'game', 'music', 'home',
+    'news', 'post', 'people', 'thing', 'things', 'time', 'work', 'money', 'best', 'good', 'new',
+}
+GENERIC_SPECIFICITY = 0.3
+
+DEFAULT_STATS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "source_query_stats.json")
+
+
+def term_key(term: str) -> str:
+    return term.lstrip("#").strip().lower()
+
+
+def specificity(term: str) -> float:
+    """0-1: generic words score low, short words lower than long ones and phrases"""
+    word = term_key(term)
+    if not word:
+        return 0.0
+    if word in GENERIC_TERMS:
+        return GENERIC_SPECIFICITY
+    return min(1.0, 0.5 + len(word) / 16)
+
+
+def term_call_cost(source: str, limit: int) -> int:
+    """Most calls querying one term can cost, counting every page of a paginated source"""
+    page_size = PAGE_SIZE.get(source)
+    pages = limit // page_size + 1 if page_size else 1
+    return TERM_CALLS.get(source, 1) * pages
+
+
+def get_call_budget(source: str, limit: int = 0) -> int:
+    """Calls a source may spend per run, overridable with SOURCE_CALL_BUDGET_<SOURCE>"""
+    default = MAX_TERMS.get(source, 3) * term_call_cost(source, limit)
+    env_value = os.getenv(f"SOURCE_CALL_BUDGET_{source.upper()}")
+    if env_value:
+        try:
+            return max(0, int(env_value))
+        except ValueError:
+            pass
+    return default
+
+
+def describe_cost(source: str, calls: float) -> str:
+    units = QUOTA_UNITS_PER_CALL.get(source)
+    return f"{calls:g} calls ({calls * units:g} quota units)" if units else f"{calls:g} calls"
+
+
+class SourceQueryPlanner(PlannerStats):
+    """Allocates each source's call budget to the hashtags with the best expected yield per call"""
+
+    label = "source query stats"
+
+    def __init__(self, path: str = DEFAULT_STATS_PATH):
+        super().__init__(path)
+
+    @staticmethod
+    def _key(source: str, term: str) -> str:
+        return f"{source}|{term_key(term)}"
+
+    def _source_yields(self) -> Dict[str, float]:
+        """Average posts per term run of every source, smoothed towards PRIOR_YIELD"""
+        runs = dict.fromkeys(MAX_TERMS, 0.0)
+        posts = dict.fromkeys(MAX_TERMS, 0.0)
+        for key, entry in self._stats.items():
+            source = key.split("|", 1)[0]
+            if source in runs:
+                runs[source] += entry.get("runs", 0)
+                posts[source] += entry.get("posts", 0)
+        return {source: smoothed_yield(posts[source], runs[source]) for source in runs}
+
+    def _expected_yield(self, source: str, term: str, source_yields: Dict[str, float]) -> float:
+        # How the term did on the other sources compared to their average, if it ran there
+        ratios = []
+        for other in MAX_TERMS:
+            entry = self._stats.get(self._key(other, term), {})
+            if other != source and entry.get("runs"):
+                ratios.append((entry["posts"] / entry["runs"]) / source_yields[other])
+        relative = min(MAX_RELATIVE_YIELD, sum(ratios) / len(ratios)) if ratios else specificity(term)
+        prior = source_yields.get(source, PRIOR_YIELD) * relative
+        entry = self._stats.get(self._key(source, term), {})
+        return smoothed_yield(entry.get("posts", 0), entry.get("runs", 0), prior)
+
+    def expected_yield(self, source: str, term: str) -> float:
+        """Posts one query for term is expected to return from source"""
+        with self._lock:
+            return self._expected_yield(source, term, self._source_yields())
+
+    def plan(self, source: str, hashtags: List[str], limit: int) -> Tuple[List[str], Dict]:
+        """
+        (terms to query, best value first; plan summary with expected cost and yield)
+        An empty bank plans nothing, so the scraper falls back to the query.
+        """
+        term_calls = term_call_cost(source, limit)
+        budget = min(get_call_budget(source, limit), MAX_TERMS.get(source, 3) * term_calls)
+        terms, seen = [], set()
+        for term in hashtags:
+            key = term_key(term)
+            if key and key not in seen:
+                seen.add(key)
+                terms.append(term)
+
+        with self._lock:
+            source_yields = self._source_yields()
+            scored = [
+                (self._expected_yield(source, term, source_yields), index, term)
+                for index, term in enumerate(terms)
+            ]
+        # Best expected posts per call first; ties keep the bank order, as before
+        scored.sort(key=lambda item: (-item[0] / term_calls, item[1]))
+
+        planned: List[Tuple[str, float]] = []
+        calls = 0
+        for expected, _, term in scored:
+            if calls + term_calls > budget:
+                break
+            planned.append((term, expected))
+            calls += term_calls
+
+        # The scrapers stop querying once they have `limit` posts
+        expected_calls = expected_posts = 0.0
+        for _, expected in planned:
+            if expected_posts >= limit:
+                break
+            expected_calls += term_calls
+            expected_posts += expected
+
+        summary = {
+            "source": source,
+            "terms": [{"term": term, "expected_posts": round(expected, 2)} for term, expected in planned],
+            "candidates": len(terms),
+            "term_calls": term_calls,
+            "budget_calls": budget,
+            "planned_calls": calls,
+            "expected_calls": expected_calls,
+            "expected_posts": round(min(expected_posts, limit), 1),
+        }
+        return [term for term, _ in planned], summary
+
+    def describe_plan(self, summary: Dict) -> str:
+        source = summary["source"]
+        parts = [f"{t['term']} ~{t['expected_posts']:.1f}" for t in summary["terms"]]
+        return (f"🧭 {source} plan: {len(parts)}/{summary['candidates']} terms within {summary['budget_calls']} calls, "
+                f"expected {describe_cost(source, summary['expected_calls'])} for ~{summary['expected_posts']:g} posts: "
+                + ", ".join(parts))
+
+    def record(self, source: str, terms: List[str], posts: List[Dict], limit: int) -> Dict:
+        """
+        Credit the returned posts to the terms that produced them, print the
+        achieved cost and yield and persist the statistics
+        """
+        if not terms:
+            return {}
+        keys = [term_key(t) for t in terms]
+        credit = [0.0] * len(keys)
+        unmatched = 0
+        last_hit = -1
+        for post in posts:
+            text = f"{post.get('title', '')} {post.get('content', '')}".lower()
+            hits = [i for i, key in enumerate(keys) if key in text]
+            if hits:
+                for i in hits:
+                    credit[i] += 1 / len(hits)
+                last_hit = max(last_hit, hits[-1])
+            else:
+                unmatched += 1
+
+        # A scraper that reached its limit stopped early; the terms after the
+        # last one credited were most likely never queried
+        queried = len(keys) if len(posts) < limit else max(1, last_hit + 1)
+        for i in range(queried):
+            credit[i] += unmatched / queried
+
+        with self._lock:
+            for key, posts_credited in zip(keys[:queried], credit[:queried]):
+                entry = self._stats.setdefault(f"{source}|{key}", {})
+                entry["runs"] = entry.get("runs", 0) + 1
+                entry["posts"] = round(entry.get("posts", 0) + posts_credited, 3)
+
+        # Pages are not reported back, so a paginated term is charged all it may have fetched
+        calls = queried * term_call_cost(source, limit)
+        report = {
+            "source": source,
+            "at": time.time(),
+            "posts": len(posts),
+            "calls": calls,
+            "terms": {terms[i]: round(credit[i], 1) for i in range(queried)},
+        }
+        terms_text = ", ".join(f"{term} {posts_credited:g}" for term, posts_credited in report["terms"].items())
+        print(f"📈 {source} achieved {len(posts)} posts for {describe_cost(source, calls)} ({terms_text})")
+        self.recent_reports.append(report)
+        self.save()
+        return report
+
+    def stats(self) -> Dict:
+        with self._lock:
+            table = {
+                key: {**entry, "yield": round(entry["posts"] / entry["runs"], 2)}
+                for key, entry in self._stats.items() if entry.get("runs")
+            }
+            return {"path": self.path, "terms": table, "recent": list(self.recent_reports)}
+
+
+query_planner = SourceQueryPlanner(os.getenv("SOURCE_QUERY_STATS_PATH", DEFAULT_STATS_PATH))
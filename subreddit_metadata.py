@@ -0,0 +1,238 @@
+"""
+Subreddit metadata and existence cache
+Overlap lists and user queries (e.g. "Hamilton Beach") often name subreddits
+that are banned, private, quarantined or do not exist, which used to cost
+several failing listing and search calls each. Metadata (exists, subscribers,
+over18, last activity) is looked up in bulk before scraping and cached in
+memory and on disk, so dead targets are skipped without touching Reddit.
+
+- Names that cannot be subreddit names are rejected without any request
+- /api/info?sr_name=... answers up to 100 subreddits per call
+- Names missing from that answer are only cached as dead once /r/<name>/about
+  confirms it; /api/info also leaves out quarantined subreddits, and an empty
+  or partial answer must not blacklist live subreddits for DEAD_TTL
+- One combined r/a+b+c/new listing gives the last activity of all of them
+
+    SUBREDDIT_METADATA_PATH         default .cache/subreddit_metadata.json
+    SUBREDDIT_META_TTL_SECONDS      live subreddits (default 1 day)
+    SUBREDDIT_DEAD_TTL_SECONDS      missing/private/quarantined (default 7 days)
+"""
+
+import json
+import os
+import re
+import threading
+import time
+from typing import Dict, Iterable, List, Optional
+
+DEFAULT_METADATA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "subreddit_metadata.json")
+
+LIVE_TTL = float(os.getenv("SUBREDDIT_META_TTL_SECONDS", str(86400)))
+DEAD_TTL = float(os.getenv("SUBREDDIT_DEAD_TTL_SECONDS", str(7 * 86400)))
+
+INFO_BATCH_SIZE = 100
+# Multireddit paths get long; keep each combined /new listing to this many names
+ACTIVITY_BATCH_SIZE = 50
+# Per-name /about checks per refresh; names beyond this stay unverified and uncached
+MAX_ABOUT_CHECKS = 10
+
+# Reddit subreddit names: up to 21 letters, digits or underscores, not starting with _
+VALID_NAME = re.compile(r"^[A-Za-z0-9][A-Za-z0-9_]{0,20}$")
+
+# status values: ok, invalid, not_found (nonexistent or banned), private, quarantined,
+# unverified (missing from /api/info and not confirmed; never cached, scraped anyway)
+USABLE_STATUS = "ok"
+UNVERIFIED_STATUS = "unverified"
+
+
+def is_valid_subreddit_name(name: str) -> bool:
+    return bool(name) and bool(VALID_NAME.match(name))
+
+
+class SubredditMetadataCache:
+    """Thread-safe subreddit metadata keyed by lowercase name, persisted as JSON"""
+
+    def __init__(self, path: str = DEFAULT_METADATA_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Dict] = self._load()
+        self.hits = 0
+        self.lookups = 0
+
+    def _load(self) -> Dict[str, Dict]:
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save(self):
+        with self._lock:
+            data = json.dumps(self._entries, sort_keys=True)
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "w") as f:
+                f.write(data)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"⚠️ Could not save subreddit metadata: {e}")
+
+    def _fresh(self, entry: Optional[Dict]) -> bool:
+        if not entry:
+            return False
+        ttl = LIVE_TTL if entry.get("status") == USABLE_STATUS else DEAD_TTL
+        return time.time() - entry.get("checked_at", 0) < ttl
+
+    def get(self, name: str) -> Optional[Dict]:
+        """Cached metadata if still fresh"""
+        if not is_valid_subreddit_name(name):
+            return {"name": name, "status": "invalid", "exists": False}
+        with self._lock:
+            entry = self._entries.get(name.lower())
+            return dict(entry) if self._fresh(entry) else None
+
+    def lookup(self, reddit, names: Iterable[str], rate_limiter=None) -> Dict[str, Dict]:
+        """Metadata for every name, refreshing stale and unknown ones in bulk"""
+        names = list(dict.fromkeys(names))
+        result = {}
+        stale = []
+        for name in names:
+            entry = self.get(name)
+            if entry is None:
+                stale.append(name)
+            else:
+                result[name] = entry
+        with self._lock:
+            self.lookups += len(names)
+            self.hits += len(names) - len(stale)
+
+        if stale and reddit is not None:
+            refreshed = self.refresh(reddit, stale, rate_limiter)
+            result.update({name: refreshed[name.lower()] for name in stale if name.lower() in refreshed})
+        return result
+
+    def refresh(self, reddit, names: List[str], rate_limiter=None) -> Dict[str, Dict]:
+        """Fetch metadata for names (all assumed valid) and store it"""
+        now = time.time()
+        found: Dict[str, Dict] = {}
+        for start in range(0, len(names), INFO_BATCH_SIZE):
+            batch = names[start:start + INFO_BATCH_SIZE]
+            if rate_limiter:
+                rate_limiter.acquire(1)
+            listing = reddit.request(method="GET", path="api/info", params={"sr_name": ",".join(batch)})
+            for child in listing.get("data", {}).get("children", []):
+                if child.get("kind") == "t5":
+                    entry = self._entry_from_about(child["data"], now)
+                    found[entry["name"].lower()] = entry
+
+        entries = {}
+        checks = 0
+        for name in names:
+            key = name.lower()
+            entry = found.get(key)
+            if entry is None and checks < MAX_ABOUT_CHECKS:
+                checks += 1
+                entry = self._check_about(reddit, name, now, rate_limiter)
+            entries[key] = entry or {"name": name, "exists": None, "status": UNVERIFIED_STATUS, "checked_at": now}
+
+        live = [entries[n.lower()]["name"] for n in names if entries[n.lower()]["status"] == USABLE_STATUS]
+        self._record_activity(reddit, live, entries, rate_limiter)
+
+        with self._lock:
+            self._entries.update({key: e for key, e in entries.items() if e["status"] != UNVERIFIED_STATUS})
+        self._save()
+
+        dead = [f"r/{e['name']} ({e['status']})" for e in entries.values()
+                if e["status"] not in (USABLE_STATUS, UNVERIFIED_STATUS)]
+        print(f"🗂️ Refreshed metadata for {len(names)} subreddit(s)" + (f"; unusable: {', '.join(dead)}" if dead else ""))
+        return entries
+
+    @staticmethod
+    def _entry_from_about(data: Dict, now: float) -> Dict:
+        if data.get("quarantine"):
+            status = "quarantined"
+        elif data.get("subreddit_type") == "private":
+            status = "private"
+        else:
+            status = USABLE_STATUS
+        return {
+            "name": data.get("display_name"),
+            "exists": True,
+            "status": status,
+            "subscribers": data.get("subscribers"),
+            "over18": data.get("over18"),
+            "last_activity": None,
+            "checked_at": now,
+        }
+
+    def _check_about(self, reddit, name: str, now: float, rate_limiter=None) -> Optional[Dict]:
+        """
+        Confirm a name /api/info did not return with /r/<name>/about.
+        None when the answer is inconclusive (network trouble, rate limits).
+        """
+        from prawcore.exceptions import Forbidden, NotFound, Redirect
+        dead = {"name": name, "exists": False, "checked_at": now}
+        try:
+            if rate_limiter:
+                rate_limiter.acquire(1)
+            about = reddit.request(method="GET", path=f"r/{name}/about")
+        except (NotFound, Redirect):
+            # Nonexistent names redirect to search; banned ones answer 404
+            return {**dead, "status": "not_found"}
+        except Forbidden as e:
+            try:
+                reason = e.response.json().get("reason")
+            except Exception:
+                reason = None
+            if reason in ("private", "quarantined"):
+                return {**dead, "exists": True, "status": reason}
+            if reason == "banned":
+                return {**dead, "status": "not_found"}
+            return None
+        except Exception as e:
+            print(f"⚠️ Could not check r/{name}: {e}")
+            return None
+        if isinstance(about, dict) and about.get("kind") == "t5":
+            return self._entry_from_about({"display_name": name, **about.get("data", {})}, now)
+        return None
+
+    def _record_activity(self, reddit, live: List[str], entries: Dict[str, Dict], rate_limiter=None):
+        """Newest post time per subreddit from combined r/a+b+c/new listings"""
+        for start in range(0, len(live), ACTIVITY_BATCH_SIZE):
+            batch = live[start:start + ACTIVITY_BATCH_SIZE]
+            try:
+                if rate_limiter:
+                    rate_limiter.acquire(1)
+                listing = reddit.request(method="GET", path=f"r/{'+'.join(batch)}/new", params={"limit": 100})
+            except Exception as e:
+                print(f"⚠️ Could not read subreddit activity: {e}")
+                continue
+            for child in listing.get("data", {}).get("children", []):
+                data = child.get("data", {})
+                entry = entries.get(str(data.get("subreddit", "")).lower())
+                created = data.get("created_utc")
+                if entry and created and (entry["last_activity"] or 0) < created:
+                    entry["last_activity"] = created
+
+    def stats(self) -> Dict:
+        with self._lock:
+            by_status: Dict[str, int] = {}
+            for entry in self._entries.values():
+                by_status[entry.get("status", "unknown")] = by_status.get(entry.get("status", "unknown"), 0) + 1
+            return {
+                "path": self.path,
+                "entries": len(self._entries),
+                "by_status": by_status,
+                "hit_rate": round(self.hits / self.lookups, 3) if self.lookups else 0.0,
+            }
+
+
+metadata_cache = SubredditMetadataCache(os.getenv("SUBREDDIT_METADATA_PATH", DEFAULT_METADATA_PATH))
+
+
+def usable_subreddits(reddit, names: List[str], rate_limiter=None) -> List[str]:
+    """Names from `names` that exist and can be scraped, in their original order"""
+    metadata = metadata_cache.lookup(reddit, names, rate_limiter)
+    return [name for name in names
+            if metadata.get(name, {}).get("status") in (USABLE_STATUS, UNVERIFIED_STATUS)]
@@ -0,0 +1,192 @@
+"""
+Cached subredditstats.com overlap data
+The global subreddit histogram is large and hardly changes, per-subreddit
+histograms change slowly and subreddit IDs never change their names, so all
+three are kept on disk with TTLs (and the global one in memory as NumPy
+arrays). Overlap multipliers are scored vectorized, and only the top-N
+candidate IDs are resolved to names. A repeated overlapper call costs at most
+one small request.
+
+    OVERLAP_CACHE_DIR                 default .cache/overlap
+    OVERLAP_GLOBAL_TTL_SECONDS        global histogram (default 7 days)
+    OVERLAP_SUBREDDIT_TTL_SECONDS     per-subreddit histograms (default 1 day)
+    OVERLAP_NAMES_TTL_SECONDS         ID -> name entries (default 30 days)
+"""
+
+import json
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+import requests
+
+SUBREDDITSTATS_API = "https://subredditstats.com/api"
+
+CACHE_DIR = os.getenv(
+    "OVERLAP_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "overlap")
+)
+GLOBAL_HIST_TTL = float(os.getenv("OVERLAP_GLOBAL_TTL_SECONDS", str(7 * 86400)))
+SUBREDDIT_HIST_TTL = float(os.getenv("OVERLAP_SUBREDDIT_TTL_SECONDS", str(86400)))
+NAMES_TTL = float(os.getenv("OVERLAP_NAMES_TTL_SECONDS", str(30 * 86400)))
+
+# Subreddits rarer than this globally give noisy multipliers and are ignored
+MIN_GLOBAL_SHARE = 0.0001
+# Extra candidates resolved in case some IDs have no name (banned/deleted)
+NAME_MARGIN = 5
+
+_lock = threading.Lock()
+_global = None  # (loaded_at, sorted int ids, probabilities)
+_names: Optional[Dict[str, list]] = None  # id -> [name, resolved_at]
+
+
+def _session(base_subreddit: str) -> requests.Session:
+    session = requests.Session()
+    session.headers.update({
+        'User-Agent': 'Mozilla/5.0',
+        'Referer': f'https://subredditstats.com/subreddit-user-overlaps/{base_subreddit}',
+        'Accept': 'application/json',
+    })
+    return session
+
+
+def _cache_path(name: str) -> str:
+    return os.path.join(CACHE_DIR, name)
+
+
+def _read_json(name: str, ttl: float):
+    """Cached JSON if the file exists and is younger than ttl seconds"""
+    path = _cache_path(name)
+    try:
+        if time.time() - os.path.getmtime(path) > ttl:
+            return None
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_json(name: str, data):
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        path = _cache_path(name)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"⚠️ Could not write overlap cache {name}: {e}")
+
+
+def _histogram_arrays(hist: Dict[str, int]):
+    """{base36 id: count} -> (sorted int64 ids, matching probabilities)"""
+    import numpy as np
+    ids = np.fromiter((int(k, 36) for k in hist), dtype=np.int64, count=len(hist))
+    counts = np.fromiter(hist.values(), dtype=np.float64, count=len(hist))
+    order = np.argsort(ids)
+    return ids[order], counts[order] / counts.sum()
+
+
+def get_global_distribution(session: requests.Session):
+    """Global subreddit distribution as NumPy arrays (memory -> disk -> network)"""
+    global _global
+    with _lock:
+        if _global is not None and time.time() - _global[0] < GLOBAL_HIST_TTL:
+            return _global[1], _global[2]
+
+    hist = _read_json("global_hist.json", GLOBAL_HIST_TTL)
+    if hist is None:
+        print("🌐 Downloading global subreddit histogram...")
+        response = session.get(f"{SUBREDDITSTATS_API}/globalSubredditsIdHist", timeout=30)
+        response.raise_for_status()
+        hist = response.json()
+        _write_json("global_hist.json", hist)
+
+    ids, probs = _histogram_arrays(hist)
+    with _lock:
+        _global = (time.time(), ids, probs)
+    return ids, probs
+
+
+def get_subreddit_hist(session: requests.Session, subreddit: str) -> Dict[str, int]:
+    """Histogram of the subreddits a subreddit's users also post in"""
+    name = f"hist_{subreddit.lower()}.json"
+    hist = _read_json(name, SUBREDDIT_HIST_TTL)
+    if hist is None:
+        response = session.get(
+            f"{SUBREDDITSTATS_API}/subredditNameToSubredditsHist",
+            params={"subredditName": subreddit},
+            timeout=30
+        )
+        response.raise_for_status()
+        hist = response.json()
+        _write_json(name, hist)
+    return hist
+
+
+def _load_names() -> Dict[str, list]:
+    global _names
+    if _names is None:
+        _names = _read_json("names.json", float("inf")) or {}
+    return _names
+
+
+def resolve_subreddit_names(session: requests.Session, subreddit_ids: List[str]) -> Dict[str, str]:
+    """Names for the given IDs, asking subredditstats only for unknown or expired ones"""
+    now = time.time()
+    with _lock:
+        names = _load_names()
+        missing = [sid for sid in subreddit_ids
+                   if sid not in names or now - names[sid][1] > NAMES_TTL]
+
+    if missing:
+        response = session.post(
+            f"{SUBREDDITSTATS_API}/specificSubredditIdsToNames",
+            json={"subredditIds": missing},
+            headers={"Content-Type": "application/json"},
+            timeout=30
+        )
+        response.raise_for_status()
+        with _lock:
+            for sid, name in zip(missing, response.json()):
+                names[sid] = [name, now]
+            snapshot = dict(names)
+        _write_json("names.json", snapshot)
+
+    with _lock:
+        return {sid: names[sid][0] for sid in subreddit_ids if sid in names and names[sid][0]}
+
+
+def score_overlaps(subreddit_hist: Dict[str, int], global_ids, global_probs) -> List[Tuple[str, float]]:
+    """(id, multiplier) for every overlapping subreddit, highest multiplier first"""
+    import numpy as np
+    if not subreddit_hist:
+        return []
+
+    keys = list(subreddit_hist)
+    ids = np.fromiter((int(k, 36) for k in keys), dtype=np.int64, count=len(keys))
+    counts = np.fromiter(subreddit_hist.values(), dtype=np.float64, count=len(keys))
+    probs = counts / counts.sum()
+
+    # Look up each ID's global share in the sorted global arrays
+    positions = np.clip(np.searchsorted(global_ids, ids), 0, len(global_ids) - 1)
+    found = global_ids[positions] == ids
+    global_share = np.where(found, global_probs[positions], 0.0)
+
+    valid = np.flatnonzero(global_share >= MIN_GLOBAL_SHARE)
+    multipliers = probs[valid] / global_share[valid]
+    order = np.argsort(-multipliers, kind="stable")
+    return [(keys[valid[i]], float(multipliers[i])) for i in order]
+
+
+def get_overlap_scores(base_subreddit: str, top_n: int = 19) -> List[Tuple[str, float]]:
+    """Top-N (subreddit name, overlap multiplier) pairs for a subreddit, highest first"""
+    session = _session(base_subreddit)
+    global_ids, global_probs = get_global_distribution(session)
+    scored = score_overlaps(get_subreddit_hist(session, base_subreddit), global_ids, global_probs)
+
+    candidates = scored[:top_n + NAME_MARGIN]
+    names = resolve_subreddit_names(session, [sid for sid, _ in candidates])
+    overlaps = [(names[sid], round(score, 3)) for sid, score in candidates if sid in names]
+    return overlaps[:top_n]
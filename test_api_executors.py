@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+CollectPosts - API Executors Test
+Blocking calls sent through run_io leave the event loop free to serve other
+work, I/O calls run side by side up to IO_POOL_WORKERS, run_cpu runs in a
+separate process, and shutdown_pools lets the next call build fresh pools.
+"""
+
+import asyncio
+import os
+import sys
+import time
+
+from api import executors
+from api.executors import get_io_pool, run_cpu, run_io, shutdown_pools
+
+
+def with_workers(io_workers):
+    """Run test() against fresh pools sized by IO_POOL_WORKERS; the pools are shut down afterwards"""
+    def wrap(test):
+        def run():
+            original = os.environ.get("IO_POOL_WORKERS")
+            shutdown_pools()
+            os.environ["IO_POOL_WORKERS"] = io_workers
+            try:
+                test()
+            finally:
+                shutdown_pools()
+                if original is None:
+                    os.environ.pop("IO_POOL_WORKERS", None)
+                else:
+                    os.environ["IO_POOL_WORKERS"] = original
+        run.__name__, run.__doc__ = test.__name__, test.__doc__
+        return run
+    return wrap
+
+
+@with_workers("4")
+def test_blocking_io_does_not_block_the_loop():
+    """The loop keeps ticking while run_io sleeps, and four sleeps overlap on four workers"""
+    async def scenario():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        task = asyncio.create_task(ticker())
+        started = time.time()
+        results = await asyncio.gather(*(run_io(time.sleep, 0.2) for _ in range(4)))
+        elapsed = time.time() - started
+        task.cancel()
+        return ticks, elapsed, results
+
+    ticks, elapsed, results = asyncio.run(scenario())
+    print(f"{ticks} ticks while 4 x 0.2s sleeps ran in {elapsed:.2f}s")
+    assert results == [None] * 4
+    assert ticks >= 10, "the event loop was blocked by the I/O calls"
+    assert elapsed < 0.6, "the I/O calls did not run side by side"
+
+
+@with_workers("not-a-number")
+def test_bad_pool_size_falls_back_to_default():
+    """An unparsable IO_POOL_WORKERS uses the default; the pool is built once and reused"""
+    pool = get_io_pool()
+    assert pool._max_workers == 16, f"unexpected pool size {pool._max_workers}"
+    assert get_io_pool() is pool
+    shutdown_pools()
+    assert executors._io_pool is None and get_io_pool() is not pool, "shutdown did not reset the pool"
+
+
+@with_workers("2")
+def test_cpu_work_runs_in_another_process():
+    """run_cpu runs picklable work in a child process"""
+    pid = asyncio.run(run_cpu(os.getpid))
+    print(f"server pid {os.getpid()}, analysis pid {pid}")
+    assert pid != os.getpid(), "analysis ran in the server process"
+    assert asyncio.run(run_cpu(sum, [1, 2, 3], start=4)) == 10
+
+
+def main():
+    print("=" * 60)
+    print("CollectPosts - API Executors Test")
+    print("=" * 60)
+
+    results = []
+    for test in [test_blocking_io_does_not_block_the_loop, test_bad_pool_size_falls_back_to_default,
+                 test_cpu_work_runs_in_another_process]:
+        try:
+            test()
+            results.append((test.__name__, True))
+        except AssertionError as e:
+            print(f"FAIL: {e}")
+            results.append((test.__name__, False))
+
+    print("=" * 60)
+    for name, ok in results:
+        print(f"{name:48} {'PASS' if ok else 'FAIL'}")
+    print("=" * 60)
+    return 0 if all(ok for _, ok in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+CollectPosts - API Jobs Test
+Jobs move from queued to running to succeeded or failed with at most
+max_concurrent running, finished jobs make room for new ones (a submission
+is refused with 429 while every slot is active), retained results stay under
+the byte cap by evicting the largest first, and a run that answers
+{"status": "error"} is reported as failed while keeping that body as the
+result. Jobs run on a private event loop; no scraping happens.
+"""
+
+import asyncio
+import sys
+
+import api.main
+from api.jobs import JobLimitError, JobManager
+
+
+async def settle():
+    """Let queued tasks run until they block again"""
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+async def finished(manager, job_id):
+    """Wait (up to 5s) until a job has finished; results are measured in a worker thread"""
+    for _ in range(500):
+        if manager.get(job_id)["finished_at"]:
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError(f"job {job_id} never finished")
+
+
+def test_lifecycle_and_concurrency():
+    """A second job waits while the first holds the only slot; status never carries the result"""
+    async def scenario():
+        manager = JobManager(max_concurrent=1)
+        release = asyncio.Event()
+
+        async def blocked():
+            await release.wait()
+            return {"status": "success", "posts": [1, 2, 3]}
+
+        first = manager.submit("scrape", blocked)
+        second = manager.submit("scrape", blocked)
+        assert first["status"] == second["status"] == "queued"
+        await settle()
+        assert manager.status(first["job_id"])["status"] == "running"
+        assert manager.status(second["job_id"])["status"] == "queued", "two jobs ran with one slot"
+        release.set()
+        await finished(manager, first["job_id"])
+        await finished(manager, second["job_id"])
+        status = manager.status(first["job_id"])
+        print(f"finished status: {status}")
+        assert status["status"] == "succeeded" and "result" not in status and status["expires_at"]
+        assert manager.get(first["job_id"])["result"]["posts"] == [1, 2, 3]
+        assert manager.stats()["succeeded"] == 2
+    asyncio.run(scenario())
+
+
+def test_oldest_finished_jobs_make_room():
+    """Past max_jobs the oldest finished job is evicted; with every slot active submissions are refused"""
+    async def scenario():
+        manager = JobManager(max_concurrent=2, max_jobs=2)
+        release = asyncio.Event()
+
+        async def quick():
+            return {"status": "success"}
+
+        async def blocked():
+            await release.wait()
+            return {"status": "success"}
+
+        old = manager.submit("scrape", quick)["job_id"]
+        await finished(manager, old)
+        newer = manager.submit("scrape", quick)["job_id"]
+        await finished(manager, newer)
+        manager.submit("scrape", blocked)
+        assert manager.get(old) is None and manager.get(newer) is not None, "the wrong finished job was evicted"
+        manager.submit("scrape", blocked)
+        try:
+            manager.submit("scrape", blocked)
+            raise AssertionError("a submission was accepted with every slot active")
+        except JobLimitError as e:
+            print(f"refused: {e}")
+        assert manager.evictions == 2
+        release.set()
+        await settle()
+    asyncio.run(scenario())
+
+
+def test_largest_results_are_evicted_under_the_byte_cap():
+    """Retained results stay under max_result_bytes; a single oversized result fails its job"""
+    async def scenario():
+        manager = JobManager(max_result_bytes=1000)
+
+        def returning(size):
+            async def run():
+                return {"status": "success", "data": "x" * size}
+            return run
+
+        big = manager.submit("scrape", returning(500))["job_id"]
+        await finished(manager, big)
+        small = manager.submit("scrape", returning(100))["job_id"]
+        await finished(manager, small)
+        latest = manager.submit("scrape", returning(450))["job_id"]
+        await finished(manager, latest)
+        print(f"after three results: {manager.stats()}")
+        assert manager.get(big) is None, "the largest result was kept over the cap"
+        assert manager.get(small)["result"] and manager.get(latest)["result"]
+        assert manager.stats()["result_bytes"] <= 1000
+
+        huge = manager.submit("scrape", returning(5000))["job_id"]
+        await finished(manager, huge)
+        job = manager.get(huge)
+        assert job["status"] == "failed" and "JOB_MAX_RESULT_MB" in job["error"] and job["result"] is None
+        assert manager.get(small) is not None, "an oversized result evicted other jobs"
+    asyncio.run(scenario())
+
+
+def test_error_answer_is_a_failed_job():
+    """{"status": "error"} answers fail the job but keep the body, as the synchronous endpoint returns it"""
+    async def scenario():
+        manager = JobManager()
+
+        async def no_posts():
+            return {"status": "error", "message": "No posts found"}
+
+        async def crashing():
+            raise ValueError("scraper exploded")
+
+        empty = manager.submit("analyze", no_posts)["job_id"]
+        crashed = manager.submit("analyze", crashing)["job_id"]
+        await finished(manager, empty)
+        await finished(manager, crashed)
+        return manager, empty, crashed
+
+    manager, empty, crashed = asyncio.run(scenario())
+    assert manager.status(empty)["status"] == "failed" and manager.status(empty)["error"] == "No posts found"
+    assert manager.status(crashed)["error"] == "scraper exploded"
+
+    from fastapi.testclient import TestClient
+    original = api.main.job_manager
+    api.main.job_manager = manager
+    try:
+        client = TestClient(api.main.app)
+        response = client.get(f"/jobs/{empty}/result")
+        assert response.status_code == 200 and response.json() == {"status": "error", "message": "No posts found"}
+        response = client.get(f"/jobs/{crashed}/result")
+        assert response.status_code == 500 and response.json()["detail"] == "scraper exploded"
+        assert client.get("/jobs/unknown/result").status_code == 404
+    finally:
+        api.main.job_manager = original
+
+
+def test_full_job_table_answers_429():
+    """The job endpoints turn JobLimitError into HTTP 429"""
+    from fastapi import HTTPException
+
+    async def scenario():
+        original = api.main.job_manager
+        api.main.job_manager = JobManager(max_jobs=1)
+        release = asyncio.Event()
+        try:
+            api.main._submit_job("scrape", release.wait)
+            try:
+                api.main._submit_job("scrape", release.wait)
+                raise AssertionError("a full job table accepted a submission")
+            except HTTPException as e:
+                print(f"second submission: {e.status_code} {e.detail}")
+                assert e.status_code == 429
+        finally:
+            release.set()
+            await settle()
+            api.main.job_manager = original
+    asyncio.run(scenario())
+
+
+def main():
+    print("=" * 60)
+    print("CollectPosts - API Jobs Test")
+    print("=" * 60)
+
+    results = []
+    for test in [test_lifecycle_and_concurrency, test_oldest_finished_jobs_make_room,
+                 test_largest_results_are_evicted_under_the_byte_cap, test_error_answer_is_a_failed_job,
+                 test_full_job_table_answers_429]:
+        try:
+            test()
+            results.append((test.__name__, True))
+        except AssertionError as e:
+            print(f"FAIL: {e}")
+            results.append((test.__name__, False))
+
+    print("=" * 60)
+    for name, ok in results:
+        print(f"{name:48} {'PASS' if ok else 'FAIL'}")
+    print("=" * 60)
+    return 0 if all(ok for _, ok in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
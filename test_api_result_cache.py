@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+CollectPosts - API Result Cache Test
+Entries expire after their TTL, the least recently used go first once the
+serialized size passes max_bytes (an entry larger than the cap is never
+stored), and request keys normalize query, sources and window: relative
+windows are keyed on the span actually scraped and bucketed by time, and
+lookups also try the previous bucket. The cache clock is simulated.
+"""
+
+import sys
+from types import SimpleNamespace
+
+from api import result_cache
+from api.result_cache import (WINDOW_BUCKET_SECONDS, ResultCache, request_key, scrape_lookup_keys,
+                              scrape_request_key)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_000_000 * WINDOW_BUCKET_SECONDS + 10
+
+    def time(self) -> float:
+        return self.now
+
+
+def with_clock(test):
+    """Run test(clock) with the cache module's clock replaced by a controllable one"""
+    def run():
+        clock = FakeClock()
+        original = result_cache.time
+        result_cache.time = SimpleNamespace(time=clock.time)
+        try:
+            test(clock)
+        finally:
+            result_cache.time = original
+    run.__name__, run.__doc__ = test.__name__, test.__doc__
+    return run
+
+
+def scrape_request(**overrides):
+    fields = {"query": "Python", "sources": ["youtube", "reddit"], "limit_per_source": 50, "days": 7,
+              "begin_date": None, "end_date": None}
+    return SimpleNamespace(**{**fields, **overrides})
+
+
+@with_clock
+def test_entries_expire_after_ttl(clock):
+    """A hit within the TTL, a miss (and an expiration) after it"""
+    cache = ResultCache(ttl_seconds=60)
+    cache.set("k", {"posts": [1]})
+    clock.now += 59
+    assert cache.get("k") == {"posts": [1]}
+    clock.now += 2
+    assert cache.get("k") is None, "an expired entry was served"
+    stats = cache.stats()
+    print(f"stats: {stats}")
+    assert (stats["hits"], stats["misses"], stats["expirations"], stats["entries"], stats["bytes"]) == (1, 1, 1, 0, 0)
+
+
+def test_lru_eviction_under_the_size_cap():
+    """Past max_bytes the least recently used entries are evicted; oversized values are not stored"""
+    value = {"data": "x" * 80}  # ~93 bytes serialized
+    cache = ResultCache(max_bytes=300)
+    for key in ("a", "b", "c"):
+        cache.set(key, value)
+    cache.get("a")
+    cache.set("d", value)
+    assert cache.get("b") is None, "the least recently used entry survived"
+    assert cache.get("a") and cache.get("c") and cache.get("d")
+    assert cache.stats()["evictions"] == 1 and cache.stats()["bytes"] <= 300
+
+    cache.set("huge", {"data": "x" * 1000})
+    assert cache.get("huge") is None and cache.stats()["entries"] == 3, "an entry above the cap was stored"
+    cache.set("a", {"data": "y"})
+    assert cache.get("a") == {"data": "y"} and cache.stats()["entries"] == 3, "replacing an entry duplicated it"
+
+
+def test_keys_normalize_requests():
+    """Case, spacing and source order do not matter; limit, window and the stream flag do or don't as intended"""
+    base = scrape_request_key(scrape_request())
+    assert scrape_request_key(scrape_request(query=" python ", sources=["Reddit", "youtube"])) == base
+    assert scrape_request_key(scrape_request(stream=True)) == base, "the response mode changed the key"
+    assert scrape_request_key(scrape_request(limit_per_source=51)) != base
+    assert scrape_request_key(scrape_request(days=30)) != base
+    # Unsupported spans are scraped as the last week, so they share its entry
+    assert scrape_request_key(scrape_request(days=5)) == base
+    explicit = scrape_request(begin_date="2024-01-01", end_date="2024-02-01")
+    assert '"2024-01-01..2024-02-01"' in scrape_request_key(explicit)
+
+
+@with_clock
+def test_relative_windows_are_bucketed(clock):
+    """Requests in the same bucket share a key; just after a boundary the previous bucket is tried too"""
+    cache = ResultCache(ttl_seconds=3 * WINDOW_BUCKET_SECONDS)
+    request = scrape_request()
+    cache.set(scrape_request_key(request), {"posts": ["cached"]})
+
+    clock.now += WINDOW_BUCKET_SECONDS - 20
+    assert cache.get(scrape_request_key(request)), "a request in the same bucket missed"
+    clock.now += 20
+    keys = scrape_lookup_keys(request)
+    print(f"lookup keys after the boundary: {keys}")
+    assert cache.get(scrape_request_key(request)) is None, "the new bucket reused the old key"
+    assert cache.get_first(keys) == {"posts": ["cached"]}, "the previous bucket was not tried"
+    clock.now += WINDOW_BUCKET_SECONDS
+    assert cache.get_first(scrape_lookup_keys(request)) is None, "an entry two buckets old was served"
+
+    explicit = scrape_request(begin_date="2024-01-01", end_date="2024-02-01")
+    assert scrape_lookup_keys(explicit) == [scrape_request_key(explicit)], "explicit dates were bucketed"
+    assert request_key("q", ["reddit"], 10, 7, None, None, buckets_ago=1) != request_key("q", ["reddit"], 10, 7, None, None)
+
+
+def main():
+    print("=" * 60)
+    print("CollectPosts - API Result Cache Test")
+    print("=" * 60)
+
+    results = []
+    for test in [test_entries_expire_after_ttl, test_lru_eviction_under_the_size_cap,
+                 test_keys_normalize_requests, test_relative_windows_are_bucketed]:
+        try:
+            test()
+            results.append((test.__name__, True))
+        except AssertionError as e:
+            print(f"FAIL: {e}")
+            results.append((test.__name__, False))
+
+    print("=" * 60)
+    for name, ok in results:
+        print(f"{name:48} {'PASS' if ok else 'FAIL'}")
+    print("=" * 60)
+    return 0 if all(ok for _, ok in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+CollectPosts - API Single-Flight Test
+Concurrent calls with the same key run the function once and all get its
+result, different keys do not wait for each other, a failure reaches every
+waiter, and the key is released afterwards (also after a failure) so the
+next call runs again.
+"""
+
+import sys
+import threading
+import time
+
+from api.singleflight import SingleFlight
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.time() + timeout
+    while not condition():
+        if time.time() > deadline:
+            raise AssertionError("timed out waiting for callers to join")
+        time.sleep(0.005)
+
+
+def run_callers(flight, key, func, callers):
+    """Start `callers` threads calling flight.do(key, func); returns (threads, outcomes)"""
+    outcomes = []
+    lock = threading.Lock()
+
+    def call():
+        try:
+            outcome = ("result", flight.do(key, func))
+        except Exception as e:
+            outcome = ("error", e)
+        with lock:
+            outcomes.append(outcome)
+
+    threads = [threading.Thread(target=call) for _ in range(callers)]
+    for thread in threads:
+        thread.start()
+    return threads, outcomes
+
+
+def test_identical_calls_share_one_run():
+    """Five callers with one key: one execution, five identical results"""
+    flight = SingleFlight()
+    release = threading.Event()
+    runs = []
+
+    def scrape():
+        runs.append(1)
+        release.wait(5)
+        return {"posts": ["p1", "p2"]}
+
+    threads, outcomes = run_callers(flight, "python", scrape, 5)
+    wait_for(lambda: flight.stats()["shared"] == 4)
+    release.set()
+    for thread in threads:
+        thread.join()
+    print(f"outcomes: {outcomes}, stats {flight.stats()}")
+    assert len(runs) == 1, f"the work ran {len(runs)} times"
+    assert outcomes == [("result", {"posts": ["p1", "p2"]})] * 5
+    assert flight.stats() == {"in_flight": 0, "executed": 1, "shared": 4}
+
+
+def test_different_keys_run_independently():
+    """A call for another key is not held up by one in flight"""
+    flight = SingleFlight()
+    release = threading.Event()
+    threads, _ = run_callers(flight, "slow", lambda: release.wait(5), 1)
+    wait_for(lambda: flight.stats()["in_flight"] == 1)
+    assert flight.do("fast", lambda: "done") == "done"
+    release.set()
+    for thread in threads:
+        thread.join()
+    assert flight.stats()["executed"] == 2 and flight.stats()["shared"] == 0
+
+
+def test_failure_reaches_every_waiter_and_frees_the_key():
+    """Every caller gets the leader's exception; the next call for the key runs again"""
+    flight = SingleFlight()
+    release = threading.Event()
+
+    def failing():
+        release.wait(5)
+        raise RuntimeError("reddit is down")
+
+    threads, outcomes = run_callers(flight, "python", failing, 4)
+    wait_for(lambda: flight.stats()["shared"] == 3)
+    release.set()
+    for thread in threads:
+        thread.join()
+    print(f"outcomes: {[(kind, str(value)) for kind, value in outcomes]}")
+    assert len(outcomes) == 4 and all(kind == "error" for kind, _ in outcomes), "a waiter did not see the failure"
+    assert all(str(error) == "reddit is down" for _, error in outcomes)
+    assert flight.stats()["in_flight"] == 0, "the failed key stayed registered"
+    assert flight.do("python", lambda: "recovered") == "recovered", "the key stayed poisoned after a failure"
+    assert flight.stats()["executed"] == 2
+
+
+def main():
+    print("=" * 60)
+    print("CollectPosts - API Single-Flight Test")
+    print("=" * 60)
+
+    results = []
+    for test in [test_identical_calls_share_one_run, test_different_keys_run_independently,
+                 test_failure_reaches_every_waiter_and_frees_the_key]:
+        try:
+            test()
+            results.append((test.__name__, True))
+        except AssertionError as e:
+            print(f"FAIL: {e}")
+            results.append((test.__name__, False))
+
+    print("=" * 60)
+    for name, ok in results:
+        print(f"{name:48} {'PASS' if ok else 'FAIL'}")
+    print("=" * 60)
+    return 0 if all(ok for _, ok in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+CollectPosts - API Streaming Test
+/scrape-multi-source with stream=true answers NDJSON: one JSON object per
+line, posts first as each source finishes, then a final summary record (also
+when the answer comes from the result cache), and a failure reported in-band
+as an error record. When the client goes away the stop event is set and the
+blocking scrape iterator is closed. The scrapers are replaced with stand-ins.
+"""
+
+import asyncio
+import json
+import sys
+import threading
+
+import api.main
+from api.result_cache import ResultCache
+
+BATCHES = [
+    ("reddit", [{"id": "r1", "source": "reddit", "text": "line\nbreak"}, {"id": "r2", "source": "reddit"}]),
+    ("youtube", [{"id": "y1", "source": "youtube"}]),
+]
+
+
+def with_scrapers(batches):
+    """Run test(client, stop_events) with scraping replaced by fixed batches and a private result cache"""
+    def wrap(test):
+        def run():
+            from fastapi.testclient import TestClient
+            stop_events = []
+
+            def fake_iter(request, plan, summary, stop_event=None):
+                stop_events.append(stop_event)
+                for source, posts in batches:
+                    if source == "reddit":
+                        summary["hashtags"] = ["#python", "#django"]
+                        summary["source_hashtags"] = ["#python"]
+                    if isinstance(posts, Exception):
+                        raise posts
+                    yield source, posts
+
+            original = api.main._iter_scraped_posts, api.main.scrape_cache
+            api.main._iter_scraped_posts = fake_iter
+            api.main.scrape_cache = ResultCache()
+            try:
+                test(TestClient(api.main.app), stop_events)
+            finally:
+                api.main._iter_scraped_posts, api.main.scrape_cache = original
+        run.__name__, run.__doc__ = test.__name__, test.__doc__
+        return run
+    return wrap
+
+
+def stream(client, query="python"):
+    response = client.post("/scrape-multi-source", json={"sources": ["reddit", "youtube"], "query": query,
+                                                          "limit_per_source": 5, "stream": True})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    return response.text
+
+
+def records(body):
+    """Split an NDJSON body, checking every line is one complete JSON object"""
+    assert body.endswith("\n"), "the last record is not newline-terminated"
+    lines = body[:-1].split("\n")
+    parsed = [json.loads(line) for line in lines]
+    assert all(isinstance(record, dict) for record in parsed), "a line is not a JSON object"
+    return parsed
+
+
+@with_scrapers(BATCHES)
+def test_posts_then_summary(client, stop_events):
+    """One post per line in source order, then a summary counting them"""
+    parsed = records(stream(client))
+    print(f"streamed: {[record.get('id', record.get('type')) for record in parsed]}")
+    assert [record.get("id") for record in parsed[:-1]] == ["r1", "r2", "y1"]
+    assert parsed[0]["text"] == "line\nbreak", "an embedded newline broke the framing"
+    summary = parsed[-1]
+    assert summary["type"] == "summary" and summary["status"] == "success"
+    assert summary["total_posts"] == 3 and summary["source_breakdown"] == {"reddit": 2, "youtube": 1}
+    assert summary["hashtags"] == ["#python", "#django"] and summary["source_hashtags"] == ["#python"]
+    assert "all_posts" not in summary
+
+
+@with_scrapers(BATCHES)
+def test_completed_stream_is_replayed_from_cache(client, stop_events):
+    """A second identical stream is served from the cache with the same framing"""
+    first = records(stream(client))
+    second = records(stream(client))
+    assert len(stop_events) == 1, "the cached stream scraped again"
+    assert [r.get("id") for r in second] == [r.get("id") for r in first]
+    assert second[-1]["type"] == "summary" and second[-1]["total_posts"] == 3
+
+
+@with_scrapers([("reddit", [{"id": "r1", "source": "reddit"}]), ("youtube", RuntimeError("quota exceeded"))])
+def test_failure_is_reported_in_band(client, stop_events):
+    """Headers are already sent, so a failure ends the stream with an error record"""
+    parsed = records(stream(client, query="failing"))
+    print(f"streamed: {parsed}")
+    assert parsed[0]["id"] == "r1"
+    assert parsed[-1] == {"type": "error", "detail": "Multi-source scraping failed: quota exceeded"}
+    assert not api.main.scrape_cache.stats()["entries"], "a failed stream was cached"
+
+
+def test_disconnect_stops_and_closes_iterator():
+    """Closing the response generator early sets stop_event and closes the blocking iterator"""
+    stop_event = threading.Event()
+    closed = threading.Event()
+
+    def blocking():
+        try:
+            for i in range(100):
+                yield f'{{"id": {i}}}\n'
+        finally:
+            closed.set()
+
+    async def scenario():
+        body = api.main._iterate_in_io_pool(blocking(), stop_event)
+        received = [await body.__anext__() for _ in range(2)]
+        # What Starlette does when the client disconnects mid-stream
+        await body.aclose()
+        return received
+
+    received = asyncio.run(scenario())
+    print(f"received before disconnect: {received}")
+    assert received == ['{"id": 0}\n', '{"id": 1}\n']
+    assert stop_event.is_set(), "the scrape was not told to stop"
+    assert closed.wait(5), "the blocking iterator was never closed"
+
+
+def main():
+    print("=" * 60)
+    print("CollectPosts - API Streaming Test")
+    print("=" * 60)
+
+    results = []
+    for test in [test_posts_then_summary, test_completed_stream_is_replayed_from_cache,
+                 test_failure_is_reported_in_band, test_disconnect_stops_and_closes_iterator]:
+        try:
+            test()
+            results.append((test.__name__, True))
+        except AssertionError as e:
+            print(f"FAIL: {e}")
+            results.append((test.__name__, False))
+
+    print("=" * 60)
+    for name, ok in results:
+        print(f"{name:48} {'PASS' if ok else 'FAIL'}")
+    print("=" * 60)
+    return 0 if all(ok for _, ok in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+CollectPosts - Hashtag Accumulator Test
+The incremental TF-IDF bank must keep the same terms as the TfidfVectorizer
+it replaced (same token pattern, stopwords, max_df and max_features cut) and
+score them closely enough to rank the same top terms, give nearly the same
+bank whether posts arrive at once, one by one or through merged
+per-subreddit accumulators, be readable at any point of a stream, and be
+ranked again only after new posts arrive.
+
+Tests that compare against scikit-learn are skipped without it (also under pytest).
+"""
+
+import random
+import sys
+from types import SimpleNamespace
+
+import hashtag_accumulator
+from hashtag_accumulator import MAX_DF, HashtagAccumulator, accumulate, get_stop_words
+from reddit_scraper import preprocess_text
+
+try:
+    import sklearn  # noqa: F401
+    HAS_SKLEARN = True
+except ImportError:
+    HAS_SKLEARN = False
+
+VOCABULARY = [
+    "graphics", "card", "prices", "launch", "stock", "retailers", "benchmark", "driver", "cooling",
+    "monitor", "keyboard", "laptop", "battery", "screen", "memory", "storage", "python", "rust",
+    "compiler", "kernel", "network", "router", "server", "cloud", "budget", "review", "upgrade",
+    "warranty", "shipping", "refund", "console", "controller", "firmware", "update", "release",
+    "patch", "performance", "latency", "throughput", "cache", "thermal", "voltage", "silicon",
+    "wafer", "yield", "foundry", "chip", "socket", "chipset", "board",
+]
+# Stopwords and words too short for the token pattern never become terms
+NOISE = ["the", "and", "people", "really", "news", "gpu", "ram", "ssd", "https://example.com/x"]
+
+
+def needs_sklearn(test):
+    """Mark a test that compares with TfidfVectorizer; main() and pytest skip it without scikit-learn"""
+    test.needs_sklearn = True
+    try:
+        import pytest
+    except ImportError:
+        return test
+    return pytest.mark.skipif(not HAS_SKLEARN, reason="scikit-learn not installed")(test)
+
+
+def make_posts(count, seed=7):
+    """Posts with a Zipf-like vocabulary, stopword noise and one term found in nearly every post"""
+    rng = random.Random(seed)
+    weights = [1 / (rank + 1) for rank in range(len(VOCABULARY))]
+    posts = []
+    for i in range(count):
+        words = rng.choices(VOCABULARY, weights, k=rng.randint(3, 12)) + rng.sample(NOISE, 3)
+        if i % 10:
+            words.append("hardware")
+        rng.shuffle(words)
+        split = rng.randint(1, len(words))
+        posts.append({"title": " ".join(words[:split]).title(), "content": " ".join(words[split:])})
+    posts.append({"title": "", "content": "the and gpu"})  # no terms at all
+    return posts
+
+
+def vectorizer_scores(posts, max_features):
+    """The replaced implementation: summed TF-IDF columns of a fitted TfidfVectorizer"""
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    documents = [preprocess_text(p["title"]) + " " + preprocess_text(p["content"]) for p in posts]
+    vectorizer = TfidfVectorizer(stop_words=list(get_stop_words()), token_pattern=r'\b[a-z]{4,}\b',
+                                 max_df=MAX_DF, max_features=max_features)
+    matrix = vectorizer.fit_transform(documents)
+    return dict(zip(vectorizer.get_feature_names_out(), matrix.sum(axis=0).A1))
+
+
+def top_overlap(first, second, k=10):
+    """Terms shared by the top k of two (term, score) lists or dicts"""
+    def top(scores):
+        items = scores.items() if isinstance(scores, dict) else scores
+        return {term for term, _ in sorted(items, key=lambda item: (-item[1], item[0]))[:k]}
+    return len(top(first) & top(second))
+
+
+@needs_sklearn
+def test_scores_track_tfidf_vectorizer():
+    """The kept terms equal the vectorizer's; scores converge to its summed columns"""
+    posts = make_posts(300)
+    expected = vectorizer_scores(posts, hashtag_accumulator.MAX_FEATURES)
+    scored = dict(accumulate(posts).top_terms(len(expected) + 10))
+    print(f"{len(scored)} terms, top 5: {sorted(scored.items(), key=lambda item: -item[1])[:5]}")
+    assert "hardware" not in scored and "hardware" not in expected, "a term in 90% of posts was kept"
+    assert set(scored) == set(expected), f"term sets differ: {set(scored) ^ set(expected)}"
+    assert top_overlap(scored, expected) >= 9, "the top terms differ from a refit"
+
+    posts = make_posts(1000)
+    expected = vectorizer_scores(posts, hashtag_accumulator.MAX_FEATURES)
+    scored = dict(accumulate(posts).top_terms(len(expected)))
+    error = max(abs(scored[term] - score) / score for term, score in expected.items())
+    print(f"1000 posts: largest relative score error {error:.3f}")
+    assert error < 0.15, f"scores did not converge to the vectorizer's ({error:.3f})"
+    assert top_overlap(scored, expected) == 10
+
+
+@needs_sklearn
+def test_max_features_keeps_most_frequent_terms():
+    """With fewer features than terms, the same most frequent terms survive the cut"""
+    posts = make_posts(300)
+    accumulator = accumulate(posts)
+    eligible = sorted((count for term, count in accumulator.tf.items()
+                       if accumulator.df[term] <= MAX_DF * accumulator.documents), reverse=True)
+    # Pick a cut between two different frequencies so ties cannot decide it
+    limit = next(i for i in range(10, len(eligible)) if eligible[i - 1] != eligible[i])
+    original = hashtag_accumulator.MAX_FEATURES
+    hashtag_accumulator.MAX_FEATURES = limit
+    try:
+        scored = dict(accumulator.top_terms(limit))
+    finally:
+        hashtag_accumulator.MAX_FEATURES = original
+    expected = vectorizer_scores(posts, limit)
+    print(f"max_features={limit}: {sorted(scored)}")
+    assert set(scored) == set(expected), f"kept terms differ: {set(scored) ^ set(expected)}"
+    assert len(accumulator.top_terms(1000)) > limit, "the cached bank ignored the restored MAX_FEATURES"
+
+
+def test_arrival_order_and_merging_agree():
+    """Batch, one-by-one and merged per-subreddit accumulation count alike and rank the same top terms"""
+    posts = make_posts(200)
+    batch = accumulate(posts)
+    single = HashtagAccumulator()
+    for post in reversed(posts):
+        single.add_post(post)
+    merged = HashtagAccumulator()
+    for part in (posts[:50], posts[50:120], posts[120:]):
+        merged.merge(accumulate(part))
+
+    expected = batch.top_terms(25)
+    for label, accumulator in (("one by one", single), ("merged", merged)):
+        assert (accumulator.df, accumulator.tf) == (batch.df, batch.tf), f"{label} counts differ"
+        terms = accumulator.top_terms(25)
+        print(f"{label}: {[t for t, _ in terms[:5]]}")
+        assert top_overlap(terms, expected) == 10, f"{label} bank differs"
+        reference = dict(batch.top_terms(1000))
+        error = max(abs(score - reference[term]) / reference[term] for term, score in terms)
+        print(f"{label}: largest relative difference {error:.3f}")
+        assert error < 0.25, f"{label} scores differ by up to {error:.3f}"
+    assert batch.stats() == merged.stats() == {"documents": len(posts), "terms": len(batch.df)}
+    assert batch.hashtags(3) == [f"#{term}" for term, _ in expected[:3]]
+
+
+@needs_sklearn
+def test_bank_is_current_mid_stream():
+    """After each batch the bank ranks nearly the same top terms as a vectorizer fitted on the posts so far"""
+    posts = make_posts(240)
+    accumulator = HashtagAccumulator()
+    for end in (20, 80, len(posts)):
+        accumulator.add_posts(posts[accumulator.documents:end])
+        expected = vectorizer_scores(posts[:end], hashtag_accumulator.MAX_FEATURES)
+        top = accumulator.top_terms(10)
+        print(f"after {end} posts: {[term for term, _ in top[:5]]}")
+        assert top_overlap(top, expected) >= 9, f"bank after {end} posts differs from a refit"
+
+
+def test_bank_is_ranked_once_per_change():
+    """Reading the bank again reuses the ranking; adding or merging posts invalidates it"""
+    accumulator = accumulate(make_posts(100))
+    rankings = []
+    original = hashtag_accumulator.heapq
+    hashtag_accumulator.heapq = SimpleNamespace(nsmallest=lambda *args, **kwargs: rankings.append(1)
+                                                or original.nsmallest(*args, **kwargs))
+    try:
+        first = accumulator.top_terms(10)
+        assert accumulator.top_terms(5) == first[:5] and accumulator.hashtags(10)
+        assert len(rankings) == 1, f"the bank was ranked {len(rankings)} times without new posts"
+        accumulator.add_post({"title": "Silicon wafer yield", "content": ""})
+        accumulator.top_terms(10)
+        accumulator.merge(accumulate(make_posts(10, seed=3)))
+        accumulator.top_terms(10)
+        assert len(rankings) == 3, "new posts did not refresh the bank"
+    finally:
+        hashtag_accumulator.heapq = original
+
+
+def test_empty_accumulator_has_no_terms():
+    accumulator = HashtagAccumulator()
+    assert accumulator.top_terms(10) == [] and accumulator.hashtags(10) == []
+    accumulator.add_post({"title": "The and", "content": ""})
+    assert accumulator.top_terms(10) == [] and accumulator.documents == 1
+
+
+def main():
+    print("=" * 60)
+    print("CollectPosts - Hashtag Accumulator Test")
+    print("=" * 60)
+
+    results = []
+    for test in [test_scores_track_tfidf_vectorizer, test_max_features_keeps_most_frequent_terms,
+                 test_arrival_order_and_merging_agree, test_bank_is_current_mid_stream,
+                 test_bank_is_ranked_once_per_change, test_empty_accumulator_has_no_terms]:
+        if not HAS_SKLEARN and getattr(test, "needs_sklearn", False):
+            print(f"SKIP {test.__name__}: scikit-learn not installed")
+            results.append((test.__name__, None))
+            continue
+        try:
+            test()
+            results.append((test.__name__, True))
+        except AssertionError as e:
+            print(f"FAIL: {e}")
+            results.append((test.__name__, False))
+
+    print("=" * 60)
+    for name, ok in results:
+        print(f"{name:48} {'SKIP' if ok is None else 'PASS' if ok else 'FAIL'}")
+    print("=" * 60)
+    return 0 if all(ok is not False for _, ok in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
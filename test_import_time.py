@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+CollectPosts - Import Time Regression Test
+Importing the API and the scrapers must stay fast and side-effect free:
+no heavy libraries and no network calls until a request actually needs them.
+"""
+
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# Budget for `import api.main` in a fresh interpreter
+MAX_IMPORT_SECONDS = float(os.getenv("MAX_IMPORT_SECONDS", "1.0"))
+
+# Modules that must only be imported on first use
+HEAVY_MODULES = [
+    "nltk", "praw", "sklearn", "pandas", "sentence_transformers", "torch",
+    "hdbscan", "vaderSentiment", "instaloader", "bs4", "analysis", "analysis_pipeline",
+]
+
+PROBE = """
+import sys, time, json
+t = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - t
+print(json.dumps({{"seconds": elapsed, "loaded": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def probe_import(module: str) -> dict:
+    """Import a module in a fresh interpreter and report time and heavy modules loaded"""
+    import json
+    result = subprocess.run(
+        [sys.executable, "-c", PROBE.format(module=module, heavy=HEAVY_MODULES)],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        timeout=120
+    )
+    assert result.returncode == 0, f"import {module} failed: {result.stderr[-500:]}"
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def test_api_import_is_fast():
+    """import api.main stays under the budget"""
+    # Best of three to keep disk cache noise out of the measurement
+    seconds = min(probe_import("api.main")["seconds"] for _ in range(3))
+    print(f"import api.main: {seconds:.3f}s (budget {MAX_IMPORT_SECONDS:.1f}s)")
+    assert seconds < MAX_IMPORT_SECONDS, f"import api.main took {seconds:.2f}s"
+
+
+def test_no_heavy_modules_on_import():
+    """Scrapers and the API defer heavy imports until first use"""
+    for module in ["api.main", "reddit_scraper", "source_fanout", "main_scraper"]:
+        loaded = probe_import(module)["loaded"]
+        if module == "main_scraper":
+            # The CLI writes its CSV with pandas
+            loaded = [m for m in loaded if m != "pandas"]
+        print(f"import {module}: heavy modules loaded = {loaded}")
+        assert not loaded, f"import {module} pulled in {loaded}"
+
+
+def main():
+    print("=" * 60)
+    print("CollectPosts - Import Time Regression Test")
+    print("=" * 60)
+
+    results = []
+    for test in [test_api_import_is_fast, test_no_heavy_modules_on_import]:
+        try:
+            test()
+            results.append((test.__name__, True))
+        except AssertionError as e:
+            print(f"FAIL: {e}")
+            results.append((test.__name__, False))
+
+    print("=" * 60)
+    for name, ok in results:
+        print(f"{name:40} {'PASS' if ok else 'FAIL'}")
+    print("=" * 60)
+    return 0 if all(ok for _, ok in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
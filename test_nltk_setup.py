@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+CollectPosts - NLTK Setup Test
+missing_nltk_resources() must report exactly the resources found neither in
+the bundled data directory nor on NLTK's own search path, by the names
+NLTK 3.9+ downloads. Every test uses a temporary data directory and
+restores NLTK's search path afterwards.
+"""
+
+import os
+import sys
+import tempfile
+
+import nltk_setup
+from nltk_setup import NLTK_RESOURCES, missing_nltk_resources
+
+
+def with_data_dir(test):
+    """Run test(bundle_dir, other_dir) with the bundle and NLTK's search path pointing at temporary directories"""
+    def run():
+        import nltk
+        original = (nltk_setup.NLTK_DATA_DIR, list(nltk.data.path))
+        with tempfile.TemporaryDirectory() as tmp:
+            bundle, other = os.path.join(tmp, "bundle"), os.path.join(tmp, "other")
+            nltk_setup.NLTK_DATA_DIR = bundle
+            nltk.data.path[:] = [other]
+            try:
+                test(bundle, other)
+            finally:
+                nltk_setup.NLTK_DATA_DIR = original[0]
+                nltk.data.path[:] = original[1]
+    run.__name__, run.__doc__ = test.__name__, test.__doc__
+    return run
+
+
+def install(base, *names):
+    for name in names:
+        os.makedirs(os.path.join(base, NLTK_RESOURCES[name]))
+
+
+@with_data_dir
+def test_complete_bundle_has_nothing_missing(bundle, other):
+    """With every resource bundled nothing is reported"""
+    install(bundle, *NLTK_RESOURCES)
+    assert missing_nltk_resources() == []
+
+
+@with_data_dir
+def test_missing_resource_is_reported(bundle, other):
+    """A resource absent from the bundle and from NLTK's path is reported by its download name"""
+    install(bundle, "punkt_tab", "stopwords")
+    missing = missing_nltk_resources()
+    print(f"missing: {missing}")
+    assert missing == ["averaged_perceptron_tagger_eng"], f"unexpected missing list {missing}"
+    assert missing_nltk_resources() == ["averaged_perceptron_tagger_eng"], "a repeated check changed its answer"
+
+
+@with_data_dir
+def test_resource_installed_elsewhere_counts(bundle, other):
+    """A resource NLTK finds in one of its own locations is not missing"""
+    install(bundle, "punkt_tab")
+    install(other, "averaged_perceptron_tagger_eng", "stopwords")
+    assert missing_nltk_resources() == []
+
+
+@with_data_dir
+def test_empty_bundle_reports_everything(bundle, other):
+    """Without any data every resource is reported, in download order"""
+    assert missing_nltk_resources() == list(NLTK_RESOURCES)
+
+
+def main():
+    print("=" * 60)
+    print("CollectPosts - NLTK Setup Test")
+    print("=" * 60)
+
+    results = []
+    for test in [test_complete_bundle_has_nothing_missing, test_missing_resource_is_reported,
+                 test_resource_installed_elsewhere_counts, test_empty_bundle_reports_everything]:
+        try:
+            test()
+            results.append((test.__name__, True))
+        except AssertionError as e:
+            print(f"FAIL: {e}")
+            results.append((test.__name__, False))
+
+    print("=" * 60)
+    for name, ok in results:
+        print(f"{name:48} {'PASS' if ok else 'FAIL'}")
+    print("=" * 60)
+    return 0 if all(ok for _, ok in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+CollectPosts - Noun Lexicon Test
+The word -> noun lexicon must stay bounded and persistent, and hashtags
+extracted through it must match what the tagger-only extractor produced on a
+fixture corpus, while a warm vocabulary is served mostly by lookups, even
+when posts bring a few words never seen before. Every post is tagged on its
+own, so spreading the chunks over worker processes must not change the counts.
+
+Tests that need the bundled NLTK data are skipped without it (also under pytest).
+"""
+
+import multiprocessing
+import os
+import sys
+import tempfile
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+from hashtag_extraction import NOUN_TAGS, candidate_words, count_nouns, count_nouns_chunk, post_text
+from nltk_setup import missing_nltk_resources
+from noun_lexicon import MIN_OBSERVATIONS, NounLexicon, use_noun_lexicon
+
+MISSING_NLTK = missing_nltk_resources()
+
+
+def needs_nltk(test):
+    """Mark a test that tags text; main() and pytest skip it when NLTK data is missing"""
+    test.needs_nltk = True
+    try:
+        import pytest
+    except ImportError:
+        return test
+    return pytest.mark.skipif(bool(MISSING_NLTK), reason=f"missing NLTK resources {MISSING_NLTK}")(test)
+
+TOP_N = 20
+MIN_TOP_OVERLAP = 0.9
+MIN_WARM_HIT_RATE = 0.9
+
+FIXTURE_POSTS = [
+    {"title": "New graphics card prices finally dropping", "content": "Retailers cut the price of last generation cards after the launch of the new series. Stock is back at most stores."},
+    {"title": "Senate passes the infrastructure bill", "content": "The bill funds bridges, roads and broadband in rural counties. The house votes on it next week."},
+    {"title": "My laptop battery drains overnight", "content": "Even in sleep mode the battery loses half its charge. The manufacturer support team suggested a firmware update."},
+    {"title": "Housing market cools as mortgage rates climb", "content": "Buyers are waiting for lower rates and sellers are cutting prices in most cities."},
+    {"title": "Coach explains the trade deadline decision", "content": "The team kept its starting pitcher because the front office expects a playoff run this season."},
+    {"title": "Firmware update bricked my router", "content": "After the update the router keeps rebooting. Support told me to reset it with the button on the back."},
+    {"title": "City council approves new bike lanes", "content": "The lanes connect the university campus with downtown. Construction starts in the spring."},
+    {"title": "Best budget headphones for the gym", "content": "I need headphones that survive sweat and have a decent battery. Budget is around fifty dollars."},
+    {"title": "Inflation report shows food prices rising again", "content": "Grocery prices rose for the third month while energy prices fell slightly."},
+    {"title": "Studio announces sequel to the indie game", "content": "The sequel adds a new map, a crafting system and online multiplayer for the console release."},
+    {"title": "Governor signs the climate bill", "content": "The law sets targets for solar power and electric vehicle chargers across the state."},
+    {"title": "Electric vehicle range in cold weather", "content": "My car loses a third of its range in winter. Preheating the battery while charging helps a lot."},
+    {"title": "Court blocks the tariff on imported steel", "content": "The ruling says the agency exceeded its authority. The administration plans to appeal the decision."},
+    {"title": "Phone camera comparison in low light", "content": "The new phone takes sharper photos at night, but the older model has better colors."},
+    {"title": "League suspends player after the injury", "content": "The hit caused a concussion and the league office reviewed the video before the suspension."},
+    {"title": "Rent increases push families out of the city", "content": "Landlords raised rent by twenty percent and the council debates a cap on increases."},
+    {"title": "Console sales beat expectations this quarter", "content": "The company sold more consoles than analysts expected thanks to a strong holiday lineup."},
+    {"title": "Election officials test voting machines", "content": "Every machine is tested in public before the election and the results are published online."},
+    {"title": "Stock market rallies after the jobs report", "content": "Investors cheered the report and tech stocks led the rally in afternoon trading."},
+    {"title": "Graphics card drivers fix the crash bug", "content": "The driver update fixes crashes in several games and improves performance on older cards."},
+    {"title": "Campaign ad spending reaches record levels", "content": "Both campaigns spent more on television ads than in any previous election cycle."},
+    {"title": "Tips for keeping a router secure", "content": "Change the default password, install every firmware update and disable remote management."},
+    {"title": "Team signs a new coach for next season", "content": "The coach led a college team to two championships and brings his own staff."},
+    {"title": "Energy prices expected to fall this winter", "content": "Natural gas storage is above average, so analysts expect lower heating bills for most households."},
+    {"title": "Laptop or tablet for college notes", "content": "I take notes in every class and need a device with a good keyboard and a long battery life."},
+    {"title": "Mortgage applications drop to a new low", "content": "Higher rates keep buyers away and lenders report the fewest applications in years."},
+    {"title": "Game patch nerfs the popular weapon", "content": "Players complain that the patch ruined the weapon, while the studio says it was too strong."},
+    {"title": "Broadband expansion reaches rural towns", "content": "The program connects thousands of homes that had no internet access before the bill passed."},
+    {"title": "Charger compatibility between phone brands", "content": "The new charger works with most phones, but fast charging needs the original cable."},
+    {"title": "Policy debate over the minimum wage", "content": "The proposal raises the wage over three years and small businesses worry about costs."},
+]
+
+
+def legacy_nouns(posts) -> Counter:
+    """The tagger-only extractor: one concatenated corpus, one tagger pass"""
+    from nltk.tag import pos_tag
+    text = " ".join(f"{post['title']} {post['content']}" for post in posts)
+    return Counter(word for word, pos in pos_tag(candidate_words(text)) if pos in NOUN_TAGS)
+
+
+def top_overlap(counts: Counter, expected: Counter) -> float:
+    """Share of the reference top nouns found in the top of counts (ties at the cut-off are ignored)"""
+    ranked = expected.most_common(TOP_N + 1)
+    cutoff = ranked[-1][1] if len(ranked) > TOP_N else 0
+    reference = {word for word, count in ranked[:TOP_N] if count > cutoff}
+    top = {word for word, _ in counts.most_common(TOP_N)}
+    return len(top & reference) / len(reference) if reference else 1.0
+
+
+def test_lexicon_is_bounded_and_persistent():
+    """Least recently used words are dropped and saved words survive a reload"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "noun_lexicon.json")
+        lexicon = NounLexicon(path, max_words=3)
+        lexicon.merge({"battery": [2, 0], "router": [2, 0], "quickly": [0, 2]})
+        assert lexicon.noun_shares(["battery"]) == [1.0], "known noun was not looked up"
+        lexicon.merge({"firmware": [2, 0]})
+        assert lexicon.stats()["words"] == 3, "lexicon grew past max_words"
+        assert lexicon.noun_shares(["router"]) == [None], "least recently used word was not evicted"
+        lexicon.merge({"update": [1, 0]})
+        assert lexicon.noun_shares(["update", "battery"]) == [None, 1.0], \
+            f"trusted a word seen fewer than {MIN_OBSERVATIONS} times"
+
+        lexicon.save(force=True)
+        reloaded = NounLexicon(path, max_words=3)
+        assert reloaded.noun_shares(["battery", "firmware"]) == [1.0, 1.0], "saved words were not reloaded"
+        print(f"lexicon: {reloaded.stats()}")
+
+
+@needs_nltk
+def test_lexicon_matches_tagger_on_fixture_corpus():
+    """Top nouns through a cold and a warm lexicon match the tagger-only extractor"""
+    expected = legacy_nouns(FIXTURE_POSTS)
+    with tempfile.TemporaryDirectory() as tmp:
+        use_noun_lexicon(NounLexicon(os.path.join(tmp, "noun_lexicon.json")))
+        for label in ("cold", "warm"):
+            overlap = top_overlap(count_nouns(FIXTURE_POSTS, parallel=False), expected)
+            print(f"{label} lexicon: top-{TOP_N} overlap with tagger output {overlap:.0%}")
+            assert overlap >= MIN_TOP_OVERLAP, f"{label} lexicon top-{TOP_N} overlap {overlap:.0%}"
+
+
+@needs_nltk
+def test_warm_vocabulary_skips_tagger():
+    """Once the corpus vocabulary is known, words are counted by lookup"""
+    with tempfile.TemporaryDirectory() as tmp:
+        lexicon = NounLexicon(os.path.join(tmp, "noun_lexicon.json"))
+        use_noun_lexicon(lexicon)
+        for _ in range(MIN_OBSERVATIONS):
+            count_nouns(FIXTURE_POSTS, parallel=False)
+        lookups, hits = lexicon.lookups, lexicon.hits
+        count_nouns(FIXTURE_POSTS, parallel=False)
+        hit_rate = (lexicon.hits - hits) / (lexicon.lookups - lookups)
+        print(f"warm pass: {hit_rate:.0%} of words counted without the tagger")
+        assert hit_rate >= MIN_WARM_HIT_RATE, f"warm hit rate {hit_rate:.0%}"
+
+
+@needs_nltk
+def test_new_words_do_not_retag_known_posts():
+    """A post with one unseen word only sends that word to the tagger"""
+    with tempfile.TemporaryDirectory() as tmp:
+        use_noun_lexicon(NounLexicon(os.path.join(tmp, "noun_lexicon.json")))
+        for _ in range(MIN_OBSERVATIONS):
+            count_nouns(FIXTURE_POSTS, parallel=False)
+        novel = ["zorbium", "quaxel", "flindor"]
+        texts = [f"{post_text(post)} {novel[i % len(novel)]}" for i, post in enumerate(FIXTURE_POSTS)]
+        _, learned = count_nouns_chunk(texts)
+        print(f"long-tail pass: tagger saw {sorted(learned)}")
+        assert set(learned) <= set(novel), f"known words were tagged again: {sorted(set(learned) - set(novel))[:10]}"
+
+
+@needs_nltk
+def test_parallel_counts_match_serial():
+    """The process pool returns the same counts, in the same order, as one process"""
+    # Without the lexicon every count comes from the tagger, in the parent and the workers alike
+    previous = os.environ.get("NOUN_LEXICON_MAX_WORDS")
+    os.environ["NOUN_LEXICON_MAX_WORDS"] = "0"
+    try:
+        use_noun_lexicon(NounLexicon(max_words=0))
+        serial = count_nouns(FIXTURE_POSTS, chunk_posts=7, parallel=False)
+        with ProcessPoolExecutor(max_workers=2, mp_context=multiprocessing.get_context("spawn")) as executor:
+            parallel = count_nouns(FIXTURE_POSTS, chunk_posts=7, parallel=True, executor=executor)
+    finally:
+        if previous is None:
+            os.environ.pop("NOUN_LEXICON_MAX_WORDS", None)
+        else:
+            os.environ["NOUN_LEXICON_MAX_WORDS"] = previous
+    print(f"parallel pass: {len(parallel)} nouns, {sum(parallel.values()):g} occurrences")
+    assert parallel == serial, "parallel counts differ from the serial run"
+    assert parallel.most_common(TOP_N) == serial.most_common(TOP_N), "parallel ranking differs from the serial run"
+
+
+def main():
+    print("=" * 60)
+    print("CollectPosts - Noun Lexicon Test")
+    print("=" * 60)
+
+    results = []
+    for test in [test_lexicon_is_bounded_and_persistent, test_lexicon_matches_tagger_on_fixture_corpus,
+                 test_warm_vocabulary_skips_tagger, test_new_words_do_not_retag_known_posts,
+                 test_parallel_counts_match_serial]:
+        if MISSING_NLTK and getattr(test, "needs_nltk", False):
+            print(f"SKIP {test.__name__}: missing NLTK resources {MISSING_NLTK}")
+            results.append((test.__name__, None))
+            continue
+        try:
+            test()
+            results.append((test.__name__, True))
+        except AssertionError as e:
+            print(f"FAIL: {e}")
+            results.append((test.__name__, False))
+
+    print("=" * 60)
+    for name, ok in results:
+        print(f"{name:48} {'SKIP' if ok is None else 'PASS' if ok else 'FAIL'}")
+    print("=" * 60)
+    return 0 if all(ok is not False for _, ok in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+CollectPosts - Post Store Test
+Coverage intervals answer a window only when they span it without gaps
+(overlapping and '*' ranges merge, small gaps within the slack are ignored),
+window() returns the highest-scoring live posts of one subreddit, older stats
+never overwrite newer ones, and a zstd dump file is ingested with its time
+span recorded as coverage. Every test uses a throwaway SQLite file.
+"""
+
+import json
+import os
+import sys
+import tempfile
+
+from post_store import ALL_SUBREDDITS, PostStore, covered_spans, post_row
+
+DAY = 86400
+T0 = 1_700_000_000
+
+
+def submission(post_id, subreddit, created, score, **extra):
+    return {"id": post_id, "subreddit": subreddit, "created_utc": created, "title": f"post {post_id}",
+            "selftext": "", "author": "alice", "score": score, "num_comments": 0, **extra}
+
+
+def test_covers_needs_gapless_intervals():
+    """Overlapping ranges merge, a gap beyond the slack breaks coverage"""
+    with tempfile.TemporaryDirectory() as tmp:
+        store = PostStore(os.path.join(tmp, "posts.sqlite3"))
+        store.add_coverage("python", T0, T0 + 2 * DAY, "dump:a")
+        store.add_coverage("python", T0 + DAY, T0 + 4 * DAY, "dump:b")
+        store.add_coverage("python", T0 + 6 * DAY, T0 + 8 * DAY, "dump:c")
+        assert store.covers("python", T0 + 3600, T0 + 4 * DAY), "overlapping ranges were not merged"
+        assert not store.covers("python", T0, T0 + 7 * DAY), "a two-day gap counted as covered"
+        assert store.covers("python", T0 + 6 * DAY, T0 + 8 * DAY)
+        assert not store.covers("python", T0 - DAY, T0 + DAY), "a window starting before coverage was covered"
+        assert not store.covers("rust", T0, T0 + DAY), "coverage leaked to another subreddit"
+
+        # Ranges within slack_seconds of each other still join up
+        store.add_coverage("python", T0 + 4 * DAY + 300, T0 + 6 * DAY, "dump:d")
+        assert store.covers("python", T0, T0 + 8 * DAY), "a gap inside the slack broke coverage"
+        assert not store.covers("python", T0, T0 + 8 * DAY, slack_seconds=0)
+
+
+def test_gaps_and_covered_spans_partition_the_window():
+    """gaps() lists the uncovered parts of a window and covered_spans() the rest"""
+    with tempfile.TemporaryDirectory() as tmp:
+        store = PostStore(os.path.join(tmp, "posts.sqlite3"))
+        store.add_coverage("python", T0 + DAY, T0 + 3 * DAY, "dump:a")
+        store.add_coverage("python", T0 + 5 * DAY, T0 + 6 * DAY, "dump:b")
+        gaps = store.gaps("python", T0, T0 + 8 * DAY)
+        print(f"gaps: {[((b - T0) / DAY, (e - T0) / DAY) for b, e in gaps]}")
+        assert gaps == [(T0, T0 + DAY), (T0 + 3 * DAY, T0 + 5 * DAY), (T0 + 6 * DAY, T0 + 8 * DAY)]
+        assert covered_spans(T0, T0 + 8 * DAY, gaps) == [(T0 + DAY, T0 + 3 * DAY), (T0 + 5 * DAY, T0 + 6 * DAY)]
+        assert store.gaps("python", T0 + DAY, T0 + 3 * DAY) == []
+        assert store.gaps("rust", T0, T0 + DAY) == [(T0, T0 + DAY)]
+        assert covered_spans(T0, T0 + DAY, [(T0, T0 + DAY)]) == []
+
+
+def test_all_subreddit_coverage_applies_everywhere():
+    """A '*' range from an unfiltered dump covers every subreddit, also combined with specific ones"""
+    with tempfile.TemporaryDirectory() as tmp:
+        store = PostStore(os.path.join(tmp, "posts.sqlite3"))
+        store.add_coverage(ALL_SUBREDDITS, T0, T0 + DAY, "dump:all")
+        store.add_coverage("Python", T0 + DAY, T0 + 2 * DAY, "stream:0")
+        assert store.covers("rust", T0, T0 + DAY)
+        assert store.covers("python", T0, T0 + 2 * DAY), "'*' and per-subreddit ranges did not combine"
+        assert not store.covers("rust", T0, T0 + 2 * DAY)
+
+
+def test_window_ranks_live_posts():
+    """window() returns the top-scoring, non-removed posts inside the time range"""
+    with tempfile.TemporaryDirectory() as tmp:
+        store = PostStore(os.path.join(tmp, "posts.sqlite3"))
+        store.upsert_posts([
+            post_row(submission("a", "python", T0 + 10, 5), "dump", updated_utc=T0 + DAY),
+            post_row(submission("b", "python", T0 + 20, 50), "dump", updated_utc=T0 + DAY),
+            post_row(submission("c", "python", T0 + 30, 500, selftext="[removed]"), "dump", updated_utc=T0 + DAY),
+            post_row(submission("d", "python", T0 + 2 * DAY, 5000), "dump", updated_utc=T0 + DAY),
+            post_row(submission("e", "rust", T0 + 40, 9), "dump", updated_utc=T0 + DAY),
+        ])
+        store.add_coverage("python", T0, T0 + DAY, "dump:a")
+        posts, covered = store.window("python", T0, T0 + DAY, limit=10)
+        print(f"window: {[(p['id'], p['score']) for p in posts]}, covered={covered}")
+        assert [p["id"] for p in posts] == ["b", "a"], "window is not ranked, filtered and bounded"
+        assert covered
+        assert posts[0]["url"] == "https://reddit.com/r/python/comments/b/"
+        assert store.window("python", T0, T0 + DAY, limit=1)[0][0]["id"] == "b"
+
+
+def test_older_stats_never_overwrite_newer():
+    """An upsert with an older updated_utc leaves the stored score alone"""
+    with tempfile.TemporaryDirectory() as tmp:
+        store = PostStore(os.path.join(tmp, "posts.sqlite3"))
+        store.upsert_posts([post_row(submission("a", "python", T0, 100), "refresh", updated_utc=T0 + 2 * DAY)])
+        store.upsert_posts([post_row(submission("a", "python", T0, 3), "dump", updated_utc=T0 + DAY)])
+        assert store.window("python", T0, T0 + 1, limit=1)[0][0]["score"] == 100, "stale dump stats won"
+        store.upsert_posts([post_row(submission("a", "python", T0, 250), "refresh", updated_utc=T0 + 3 * DAY)])
+        assert store.window("python", T0, T0 + 1, limit=1)[0][0]["score"] == 250, "newer stats were dropped"
+        assert store.stats()["posts"] == 1, "an upsert duplicated the post"
+
+
+def test_dump_file_is_ingested_with_coverage():
+    """A zstd NDJSON dump lands in the store and its time span becomes coverage"""
+    try:
+        import zstandard
+    except ImportError:
+        print("SKIP: zstandard not installed")
+        return
+    from ingest_reddit_dumps import ingest_file
+
+    lines = [json.dumps(submission(f"p{i}", "python" if i % 2 else "rust", T0 + i * 3600, i)) for i in range(24)]
+    lines.insert(5, "{not json")
+    with tempfile.TemporaryDirectory() as tmp:
+        dump = os.path.join(tmp, "RS_2023-11.zst")
+        with open(dump, "wb") as fh:
+            fh.write(zstandard.ZstdCompressor().compress("\n".join(lines).encode("utf-8")))
+        store_path = os.path.join(tmp, "posts.sqlite3")
+        result = ingest_file(dump, store_path, subreddits={"python"}, batch_size=5)
+        print(f"ingest: {result}")
+        assert (result["lines"], result["kept"], result["bad"]) == (25, 12, 1), f"unexpected counts {result}"
+
+        store = PostStore(store_path)
+        # The dump spans T0 .. T0 + 23h
+        posts, covered = store.window("python", T0, T0 + 23 * 3600, limit=100)
+        assert len(posts) == 12 and covered, "ingested posts or coverage are missing"
+        assert not store.covers("python", T0, T0 + DAY), "coverage extends past the dump's last post"
+        assert not store.window("rust", T0, T0 + DAY, limit=100)[0], "a filtered-out subreddit was stored"
+
+
+def main():
+    print("=" * 60)
+    print("CollectPosts - Post Store Test")
+    print("=" * 60)
+
+    results = []
+    for test in [test_covers_needs_gapless_intervals, test_gaps_and_covered_spans_partition_the_window,
+                 test_all_subreddit_coverage_applies_everywhere,
+                 test_window_ranks_live_posts, test_older_stats_never_overwrite_newer,
+                 test_dump_file_is_ingested_with_coverage]:
+        try:
+            test()
+            results.append((test.__name__, True))
+        except AssertionError as e:
+            print(f"FAIL: {e}")
+            results.append((test.__name__, False))
+
+    print("=" * 60)
+    for name, ok in results:
+        print(f"{name:48} {'PASS' if ok else 'FAIL'}")
+    print("=" * 60)
+    return 0 if all(ok for _, ok in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+CollectPosts - Reddit Budget Test
+post_limit is split by overlap x activity with a largest-remainder split that
+always adds up to exactly the total, every subreddit keeps a minimum probe,
+unused budget moves to subreddits that filled theirs (at most MAX_TOP_UPS
+times each), and subreddits without history start from their metadata.
+"""
+
+import sys
+import time
+
+from reddit_budget import MAX_TOP_UPS, MIN_ACTIVITY, MIN_SHARE, BudgetAllocator, seed_activity
+
+
+def test_split_adds_up_exactly():
+    """Allocations sum to the total for awkward totals and weights"""
+    scores = {"a": 1.7, "b": 0.3, "c": 2.9, "d": 0.01, "e": 1.0, "f": 1.0, "g": 0.5}
+    for total in (7, 10, 69, 101, 997, 1000):
+        allocations = BudgetAllocator(total, scores, activity={}).allocations
+        assert sum(allocations.values()) == total, f"{total} split into {sum(allocations.values())}"
+    print(f"split of 101: {BudgetAllocator(101, scores, activity={}).allocations}")
+
+
+def test_split_follows_overlap_times_activity():
+    """Above the per-subreddit floor, shares are proportional to overlap x activity"""
+    allocator = BudgetAllocator(230, {"busy": 2.0, "quiet": 2.0, "minor": 1.0}, activity={"quiet": 0.5})
+    # floor 10 each, 200 spare split 2 : 1 : 1
+    assert allocator.allocations == {"busy": 110, "quiet": 60, "minor": 60}, allocator.allocations
+    tiny = BudgetAllocator(100, {"big": 100.0, "dead": 0.0}, activity={})
+    assert tiny.allocation("dead") == MIN_SHARE, "a zero-weight subreddit lost its probe"
+
+
+def test_unused_budget_moves_to_productive_subreddits():
+    """A subreddit that under-delivers frees its budget for one that filled its share"""
+    allocator = BudgetAllocator(100, {"full": 1.0, "sparse": 1.0}, activity={})
+    assert allocator.settle("full", 50, 50) == [], "budget was handed out before any was freed"
+    grants = allocator.settle("sparse", 50, 10)
+    print(f"grants after r/sparse delivered 10/50: {grants}")
+    assert grants == [("full", 90)], f"unexpected grants {grants}"
+    assert allocator.allocation("sparse") == 10 and allocator.pool == 0
+    assert sum(allocator.allocations.values()) == 100, "reassigning budget changed the total"
+
+
+def test_top_ups_are_capped():
+    """A subreddit is topped up at most MAX_TOP_UPS times"""
+    allocator = BudgetAllocator(1000, {"full": 1.0, "a": 1.0, "b": 1.0, "c": 1.0}, activity={})
+    requested = allocator.allocation("full")
+    grants = allocator.settle("full", requested, requested)
+    for other in ("a", "b", "c"):
+        grants += allocator.settle(other, allocator.allocation(other), 0)
+        # Every top-up fills its new budget too
+        while grants:
+            subreddit, limit = grants.pop()
+            grants += allocator.settle(subreddit, limit, limit)
+    print(f"top-ups: {allocator.top_ups}, unused pool {allocator.pool}")
+    assert allocator.top_ups == {"full": MAX_TOP_UPS}, f"topped up {allocator.top_ups}"
+    assert allocator.pool > 0, "the cap was never reached"
+
+
+def test_activity_seeded_from_metadata():
+    """Unknown subreddits start from subscribers and idleness; history wins once it exists"""
+    now = time.time()
+    assert seed_activity(None) == 1.0
+    assert seed_activity({"subscribers": 10 ** 6, "last_activity": now}, now) == 1.0
+    assert 0.5 < seed_activity({"subscribers": 1000}, now) < 0.7
+    idle = seed_activity({"subscribers": 10 ** 6, "last_activity": now - 300 * 86400}, now)
+    assert abs(idle - 0.1) < 1e-6, f"300 idle days gave {idle}"
+    assert seed_activity({"subscribers": 0}, now) == MIN_ACTIVITY
+
+    metadata = {"large": {"subscribers": 10 ** 6}, "small": {"subscribers": 30}, "known": {"subscribers": 30}}
+    allocator = BudgetAllocator(300, {name: 1.0 for name in metadata}, activity={"known": 1.0}, metadata=metadata)
+    print(f"seeded split: {allocator.allocations}")
+    assert allocator.allocation("large") > allocator.allocation("small"), "a small subreddit got an equal share"
+    assert abs(allocator.allocation("known") - allocator.allocation("large")) <= 1, "history was overridden by metadata"
+
+
+def main():
+    print("=" * 60)
+    print("CollectPosts - Reddit Budget Test")
+    print("=" * 60)
+
+    results = []
+    for test in [test_split_adds_up_exactly, test_split_follows_overlap_times_activity,
+                 test_unused_budget_moves_to_productive_subreddits, test_top_ups_are_capped,
+                 test_activity_seeded_from_metadata]:
+        try:
+            test()
+            results.append((test.__name__, True))
+        except AssertionError as e:
+            print(f"FAIL: {e}")
+            results.append((test.__name__, False))
+
+    print("=" * 60)
+    for name, ok in results:
+        print(f"{name:48} {'PASS' if ok else 'FAIL'}")
+    print("=" * 60)
+    return 0 if all(ok for _, ok in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
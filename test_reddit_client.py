@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+CollectPosts - Reddit Client Pool Test
+Clients are created on first lease only, reused once released, handed out
+round-robin across app credentials (skipping apps that ran out of budget)
+and dropped after a failure. praw is replaced with counting stand-ins, so no
+network access is needed. The shared rate limiter lets a burst through at
+once and then holds every thread together to its refill rate.
+"""
+
+import sys
+import threading
+import time
+from types import SimpleNamespace
+
+from reddit_client import MIN_REMAINING_REQUESTS, RateLimiter, RedditClientPool, RedditCredential
+
+
+class CountingPool(RedditClientPool):
+    """Pool whose clients report fixed rate-limit headers instead of talking to Reddit"""
+
+    def __init__(self, credentials):
+        super().__init__(credentials)
+        self.created = []
+        self.limits = {}  # client_id -> auth.limits reported by its clients
+
+    def _create_client(self, credential):
+        client = SimpleNamespace(
+            app=credential.client_id,
+            auth=SimpleNamespace(limits=self.limits.get(credential.client_id, {}))
+        )
+        self.created.append(client)
+        return client
+
+
+def make_pool(apps: int = 2) -> CountingPool:
+    return CountingPool([RedditCredential(f"app{i}", f"secret{i}") for i in range(apps)])
+
+
+def test_clients_are_lazy_and_reused():
+    """No client exists before the first lease, and a released client is leased again"""
+    pool = make_pool(apps=1)
+    assert not pool.created, "a client was created before anything asked for one"
+    client = pool.acquire()
+    pool.release(client)
+    again = pool.acquire()
+    print(f"lazy pool: {len(pool.created)} client(s) created for two leases")
+    assert again is client and len(pool.created) == 1, "released client was not reused"
+
+
+def test_leases_rotate_and_skip_exhausted_apps():
+    """Apps are used in turn; one close to its rate limit is skipped until it resets"""
+    pool = make_pool(apps=2)
+    first, second = pool.acquire(), pool.acquire()
+    assert {first.app, second.app} == {"app0", "app1"}, "leases did not rotate across apps"
+
+    pool.limits["app0"] = {"remaining": MIN_REMAINING_REQUESTS - 1, "used": 99, "reset_timestamp": time.time() + 60}
+    first.auth.limits = pool.limits["app0"]
+    pool.release(first)
+    pool.release(second)
+    apps = [pool.acquire().app for _ in range(3)]
+    print(f"leases with app0 exhausted: {apps}")
+    assert apps == ["app1"] * 3, f"an exhausted app was leased: {apps}"
+
+
+def test_failed_client_is_replaced():
+    """A client released as failed is dropped, so the next lease reconnects"""
+    pool = make_pool(apps=1)
+    client = pool.acquire()
+    pool.release(client, failed=True)
+    replacement = pool.acquire()
+    assert replacement is not client and len(pool.created) == 2, "failed client was leased again"
+    assert pool.credentials[0].failures == 1, "failure was not counted"
+
+
+def test_rate_limiter_burst_then_refill_rate():
+    """A full bucket is spent at once; after that requests follow the refill rate"""
+    limiter = RateLimiter(requests_per_minute=600, burst=5)  # 10 requests per second
+    started = time.monotonic()
+    for _ in range(5):
+        limiter.acquire()
+    burst = time.monotonic() - started
+    for _ in range(5):
+        limiter.acquire()
+    refill = time.monotonic() - started - burst
+    print(f"rate limiter: burst of 5 in {burst:.3f}s, next 5 in {refill:.2f}s")
+    assert burst < 0.05, f"burst was throttled ({burst:.3f}s)"
+    assert 0.4 <= refill < 0.8, f"next 5 requests took {refill:.2f}s instead of about 0.5s"
+
+
+def test_rate_limiter_is_shared_across_threads():
+    """Concurrent callers together stay within the bucket's budget"""
+    limiter = RateLimiter(requests_per_minute=1200, burst=2)  # 20 requests per second
+    started = time.monotonic()
+    threads = [threading.Thread(target=lambda: [limiter.acquire() for _ in range(5)]) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - started
+    # 20 requests: 2 from the bucket, 18 at 20 per second
+    print(f"rate limiter: 20 requests from 4 threads in {elapsed:.2f}s")
+    assert elapsed >= 0.85, f"threads exceeded the shared rate ({elapsed:.2f}s)"
+    assert limiter.stats()["acquired"] == 20, "not every request was counted"
+
+
+def main():
+    print("=" * 60)
+    print("CollectPosts - Reddit Client Pool Test")
+    print("=" * 60)
+
+    results = []
+    for test in [test_clients_are_lazy_and_reused, test_leases_rotate_and_skip_exhausted_apps,
+                 test_failed_client_is_replaced, test_rate_limiter_burst_then_refill_rate,
+                 test_rate_limiter_is_shared_across_threads]:
+        try:
+            test()
+            results.append((test.__name__, True))
+        except AssertionError as e:
+            print(f"FAIL: {e}")
+            results.append((test.__name__, False))
+
+    print("=" * 60)
+    for name, ok in results:
+        print(f"{name:48} {'PASS' if ok else 'FAIL'}")
+    print("=" * 60)
+    return 0 if all(ok for _, ok in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+CollectPosts - Reddit ID Locator Test
+Date windows are found by bisecting the submission ID space: boundaries
+converge in a few /api/info calls and only converged ones are cached. Posts
+in a window come from the subreddit's /new listing while it reaches back
+that far; the rest of the window is sampled by ID when the listing's density
+promises enough hits for the budget (checked before any locating call), and
+sampling stops early when the measured hit rate falls short. Reddit is
+replaced by a synthetic ID space (one submission per second, every
+`every`-th one in the test subreddit), so no network access is needed.
+"""
+
+import random
+import sys
+from datetime import datetime, timedelta
+
+import reddit_id_locator
+from reddit_id_locator import (INFO_BATCH_SIZE, SAMPLE_PROBE_CALLS, base36_to_int, int_to_base36,
+                               iter_posts_in_id_window, locate_id_at)
+
+FIRST_TS = 1.5e9
+NEWEST_ID = 10 ** 8
+LISTING_DEPTH = 1000
+
+
+class SyntheticReddit:
+    """
+    Submission i is created at FIRST_TS + i seconds; every `every`-th one from
+    ID `born` on is in r/<name>
+    """
+
+    def __init__(self, name: str, every: int, info_works: bool = True, born: int = 0):
+        self.name = name
+        self.every = every
+        self.info_works = info_works
+        self.born = born
+        self.calls = []
+
+    def post(self, i: int) -> dict:
+        subreddit = self.name if i % self.every == 0 and i >= self.born else "elsewhere"
+        return {"kind": "t3", "data": {
+            "id": int_to_base36(i), "title": f"post {i}", "created_utc": FIRST_TS + i,
+            "subreddit": subreddit, "permalink": f"/r/{subreddit}/comments/{int_to_base36(i)}/",
+        }}
+
+    def request(self, method, path, params):
+        self.calls.append(path)
+        if path == "api/info":
+            ids = [base36_to_int(fullname[3:]) for fullname in params["id"].split(",")]
+            children = [self.post(i) for i in ids if self.info_works and 0 < i <= NEWEST_ID]
+            return {"data": {"children": children, "after": None}}
+        if path == "r/all/new":
+            return {"data": {"children": [self.post(NEWEST_ID)], "after": None}}
+        if path == f"r/{self.name}/new":
+            # Newest first, `every` IDs apart, cut off at Reddit's listing depth
+            start = NEWEST_ID - NEWEST_ID % self.every
+            if params.get("after"):
+                start = base36_to_int(params["after"][3:]) - self.every
+            depth = (NEWEST_ID - start) // self.every
+            count = min(params["limit"], LISTING_DEPTH - depth)
+            ids = [start - k * self.every for k in range(max(0, count))]
+            more = depth + count < LISTING_DEPTH
+            return {"data": {"children": [self.post(i) for i in ids],
+                             "after": f"t3_{int_to_base36(ids[-1])}" if ids and more else None}}
+        raise AssertionError(f"unexpected request {path}")
+
+
+def utc(seconds: float) -> datetime:
+    return datetime(1970, 1, 1) + timedelta(seconds=seconds)
+
+
+def test_boundary_converges_and_is_cached():
+    """A boundary is found within one /api/info batch and reused without calls"""
+    reddit_id_locator._boundary_cache.clear()
+    reddit = SyntheticReddit("boundary", every=10)
+    target = 12_345_678
+    found = locate_id_at(reddit, FIRST_TS + target, 0, NEWEST_ID)
+    calls = len(reddit.calls)
+    print(f"boundary: {found} for {target} in {calls} /api/info calls")
+    assert abs(found - target) <= INFO_BATCH_SIZE, f"boundary {found} is off by {found - target}"
+    assert calls <= 6, f"bisection took {calls} calls"
+    assert locate_id_at(reddit, FIRST_TS + target, 0, NEWEST_ID) == found and len(reddit.calls) == calls, \
+        "converged boundary was looked up again"
+
+
+def test_unconverged_boundary_is_not_cached():
+    """When /api/info finds nothing the guess is returned but never reused"""
+    reddit_id_locator._boundary_cache.clear()
+    reddit = SyntheticReddit("unconverged", every=10, info_works=False)
+    locate_id_at(reddit, FIRST_TS + 5_000_000, 0, NEWEST_ID)
+    calls = len(reddit.calls)
+    locate_id_at(reddit, FIRST_TS + 5_000_000, 0, NEWEST_ID)
+    assert len(reddit.calls) > calls, "an unconverged boundary was cached"
+
+
+def test_recent_window_comes_from_new_listing():
+    """A window inside the listing depth is read from /new without touching /api/info"""
+    reddit_id_locator._boundary_cache.clear()
+    reddit = SyntheticReddit("recentsub", every=10)
+    begin, end = NEWEST_ID - 5000, NEWEST_ID - 2000
+    posts = list(iter_posts_in_id_window(reddit, "recentsub", utc(FIRST_TS + begin), utc(FIRST_TS + end)))
+    print(f"recent window: {len(posts)} posts from {len(reddit.calls)} listing calls")
+    assert len(posts) == (end - begin) // 10 + 1, f"expected every post in the window, got {len(posts)}"
+    assert all(FIRST_TS + begin <= p.created_utc <= FIRST_TS + end for p in posts), "post outside the window"
+    assert "api/info" not in reddit.calls, "the listing covered the window but IDs were looked up"
+
+
+def deep_window(reddit, max_sample_calls, begin=40_000_000, end=40_100_000):
+    """Posts of reddit's subreddit in a window far beyond its listing depth"""
+    reddit_id_locator._boundary_cache.clear()
+    random.seed(11)
+    return list(iter_posts_in_id_window(reddit, reddit.name, utc(FIRST_TS + begin), utc(FIRST_TS + end),
+                                        max_sample_calls=max_sample_calls))
+
+
+def in_window(posts, name, begin, end):
+    return all(p.subreddit == name and FIRST_TS + begin <= p.created_utc <= FIRST_TS + end for p in posts)
+
+
+def test_deep_window_samples_busy_subreddits():
+    """Beyond the listing depth a busy subreddit is located and sampled"""
+    busy = SyntheticReddit("busysub", every=10)
+    posts = deep_window(busy, max_sample_calls=3)
+    print(f"busy subreddit: {len(posts)} sampled posts, {busy.calls.count('api/info')} /api/info calls")
+    assert posts, "a busy subreddit was not sampled"
+    assert in_window(posts, "busysub", 40_000_000, 40_100_000), "sampled post from another subreddit or outside the window"
+    assert len({p.id for p in posts}) == len(posts), "a sampled post was yielded twice"
+
+
+def test_sparse_subreddit_is_gated_on_the_budget():
+    """The gate weighs the whole budget: 0.5 hits per call is sampled with 20 calls, skipped with 3"""
+    sparse = SyntheticReddit("sparsesub", every=200)
+    posts = deep_window(sparse, max_sample_calls=20)
+    print(f"sparse subreddit, 20 calls: {len(posts)} posts from {sparse.calls.count('api/info')} /api/info calls")
+    assert posts and in_window(posts, "sparsesub", 40_000_000, 40_100_000), "a sparse subreddit was not sampled"
+
+    tiny_budget = SyntheticReddit("sparsesub", every=200)
+    assert deep_window(tiny_budget, max_sample_calls=3) == []
+    assert "api/info" not in tiny_budget.calls, "calls were spent locating a window that would not be sampled"
+
+
+def test_measured_hit_rate_stops_sampling():
+    """A subreddit busy now but absent back then stops after the probe calls"""
+    young = SyntheticReddit("youngsub", every=10, born=NEWEST_ID - 50_000_000)
+    posts = deep_window(young, max_sample_calls=20)
+    busy = SyntheticReddit("busysub", every=10)
+    deep_window(busy, max_sample_calls=20)
+    print(f"young subreddit: {len(posts)} posts from {young.calls.count('api/info')} /api/info calls, "
+          f"busy one {busy.calls.count('api/info')}")
+    assert posts == []
+    # Both locate the same window; only the sampling differs
+    assert young.calls.count("api/info") == busy.calls.count("api/info") - 20 + SAMPLE_PROBE_CALLS, \
+        "sampling went on without hits"
+
+
+def test_listing_remainder_is_sampled():
+    """A window the listing only partly reaches gets its older part from ID sampling"""
+    reddit = SyntheticReddit("edgesub", every=10)
+    begin, end = NEWEST_ID - 20_000, NEWEST_ID - 5_000
+    reddit_id_locator._boundary_cache.clear()
+    random.seed(5)
+    posts = list(iter_posts_in_id_window(reddit, "edgesub", utc(FIRST_TS + begin), utc(FIRST_TS + end),
+                                         max_sample_calls=5))
+    oldest_listed = NEWEST_ID - (LISTING_DEPTH - 1) * 10
+    listed = [p for p in posts if p.created_utc >= FIRST_TS + oldest_listed]
+    sampled = [p for p in posts if p.created_utc < FIRST_TS + oldest_listed]
+    print(f"edge window: {len(listed)} listed + {len(sampled)} sampled posts")
+    assert len(listed) == (end - oldest_listed) // 10 + 1, "the listed part of the window is incomplete"
+    assert sampled, "the part of the window beyond the listing was never sampled"
+    assert in_window(posts, "edgesub", begin, end) and len({p.id for p in posts}) == len(posts)
+    assert "r/all/new" not in reddit.calls, "the end of the remainder was located although the listing gave it"
+
+
+def main():
+    print("=" * 60)
+    print("CollectPosts - Reddit ID Locator Test")
+    print("=" * 60)
+
+    results = []
+    for test in [test_boundary_converges_and_is_cached, test_unconverged_boundary_is_not_cached,
+                 test_recent_window_comes_from_new_listing, test_deep_window_samples_busy_subreddits,
+                 test_sparse_subreddit_is_gated_on_the_budget, test_measured_hit_rate_stops_sampling,
+                 test_listing_remainder_is_sampled]:
+        try:
+            test()
+            results.append((test.__name__, True))
+        except AssertionError as e:
+            print(f"FAIL: {e}")
+            results.append((test.__name__, False))
+
+    print("=" * 60)
+    for name, ok in results:
+        print(f"{name:48} {'PASS' if ok else 'FAIL'}")
+    print("=" * 60)
+    return 0 if all(ok for _, ok in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
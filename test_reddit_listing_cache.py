@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+CollectPosts - Reddit Listing Cache Test
+Listing pages are served locally until their TTL runs out: top(all) pages
+live for a day, new/rising pages for a minute. Repeated passes over a
+listing cost no API calls and no rate limiter tokens, and the least recently
+used pages are dropped past max_pages. Reddit is replaced with a counting
+stand-in and the cache clock is simulated, so the test runs instantly.
+"""
+
+import sys
+from types import SimpleNamespace
+
+import reddit_listing_cache
+from reddit_client import RateLimiter
+from reddit_listing_cache import LISTING_TTLS, VOLATILE_TTL, ListingCache, iter_listing
+
+
+class CountingReddit:
+    """Three pages of 100 posts per listing; counts the requests that reach it"""
+
+    def __init__(self):
+        self.requests = 0
+
+    def request(self, method, path, params):
+        self.requests += 1
+        page = int(params.get("after", "t3_0")[3:])
+        children = [{"kind": "t3", "data": {"id": f"{page}x{i}", "created_utc": 0}} for i in range(100)]
+        return {"data": {"children": children, "after": f"t3_{page + 1}" if page < 2 else None}}
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def time(self) -> float:
+        return self.now
+
+
+def with_clock(test):
+    """Run test(clock) with the cache's clock replaced by a controllable one"""
+    def run():
+        clock = FakeClock()
+        original = reddit_listing_cache.time
+        reddit_listing_cache.time = SimpleNamespace(time=clock.time)
+        try:
+            test(clock)
+        finally:
+            reddit_listing_cache.time = original
+    run.__name__, run.__doc__ = test.__name__, test.__doc__
+    return run
+
+
+def test_ttl_follows_listing_volatility():
+    """Stable listings are cached for long, volatile ones briefly"""
+    assert ListingCache.ttl_for("top", "all") == LISTING_TTLS["all"] == 24 * 3600
+    assert ListingCache.ttl_for("controversial", "week") == LISTING_TTLS["week"]
+    assert ListingCache.ttl_for("new", None) == ListingCache.ttl_for("rising", "all") == VOLATILE_TTL
+
+
+@with_clock
+def test_repeat_pass_is_free_until_expiry(clock):
+    """A second pass costs no calls or tokens; after the TTL the pages are fetched again"""
+    cache = ListingCache()
+    reddit = CountingReddit()
+    limiter = RateLimiter(requests_per_minute=600)
+    for _ in range(2):
+        assert len(list(iter_listing(reddit, "python", "top", "week", rate_limiter=limiter, cache=cache))) == 300
+    print(f"two passes: {reddit.requests} requests, {limiter.stats()['acquired']:g} tokens, {cache.stats()}")
+    assert reddit.requests == 3, f"repeat pass made {reddit.requests - 3} extra requests"
+    assert limiter.stats()["acquired"] == 3, "cached pages took rate limiter tokens"
+
+    clock.now += LISTING_TTLS["week"] - 1
+    list(iter_listing(reddit, "python", "top", "week", cache=cache))
+    assert reddit.requests == 3, "pages expired before their TTL"
+    clock.now += 2
+    list(iter_listing(reddit, "python", "top", "week", cache=cache))
+    assert reddit.requests == 6, "expired pages were still served"
+
+
+@with_clock
+def test_volatile_pages_expire_first(clock):
+    """After a minute /new is fetched again while top(all) is still cached"""
+    cache = ListingCache()
+    reddit = CountingReddit()
+    list(iter_listing(reddit, "python", "new", cache=cache))
+    list(iter_listing(reddit, "python", "top", "all", cache=cache))
+    clock.now += VOLATILE_TTL + 1
+    before = reddit.requests
+    list(iter_listing(reddit, "python", "top", "all", cache=cache))
+    assert reddit.requests == before, "top(all) pages expired after a minute"
+    list(iter_listing(reddit, "python", "new", cache=cache))
+    assert reddit.requests == before + 3, "stale /new pages were served"
+
+
+def test_least_recently_used_pages_are_evicted():
+    """Past max_pages the oldest untouched pages go first"""
+    cache = ListingCache(max_pages=2)
+    cache.set(("a", "top", "all", None), [1], None)
+    cache.set(("b", "top", "all", None), [2], None)
+    cache.get(("a", "top", "all", None))
+    cache.set(("c", "top", "all", None), [3], None)
+    assert cache.get(("b", "top", "all", None)) is None, "recently unused page was kept"
+    assert cache.get(("a", "top", "all", None)) is not None, "recently used page was evicted"
+    assert cache.stats()["evictions"] == 1
+
+
+def main():
+    print("=" * 60)
+    print("CollectPosts - Reddit Listing Cache Test")
+    print("=" * 60)
+
+    results = []
+    for test in [test_ttl_follows_listing_volatility, test_repeat_pass_is_free_until_expiry,
+                 test_volatile_pages_expire_first, test_least_recently_used_pages_are_evicted]:
+        try:
+            test()
+            results.append((test.__name__, True))
+        except AssertionError as e:
+            print(f"FAIL: {e}")
+            results.append((test.__name__, False))
+
+    print("=" * 60)
+    for name, ok in results:
+        print(f"{name:48} {'PASS' if ok else 'FAIL'}")
+    print("=" * 60)
+    return 0 if all(ok for _, ok in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
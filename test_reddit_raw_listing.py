@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+CollectPosts - Raw Reddit Listing Test
+Listing JSON is projected into compact RedditRecords: only t3 children, only
+the fields the scraper reads, deleted authors as None, and the next-page
+cursor passed through. Requests always ask for raw_json. Reddit is replaced
+with a recording stand-in, so no network access is needed.
+"""
+
+import sys
+
+from reddit_raw_listing import RedditRecord, author_name, fetch_raw_info, fetch_raw_listing, project_listing
+
+LISTING = {
+    "kind": "Listing",
+    "data": {
+        "after": "t3_abc3",
+        "children": [
+            {"kind": "t3", "data": {
+                "id": "abc1", "title": "First &amp; only", "selftext": "body", "author": "alice",
+                "permalink": "/r/python/comments/abc1/first/", "score": 42, "created_utc": 1700000000.0,
+                "subreddit": "python", "num_comments": 7, "thumbnail": "self", "upvote_ratio": 0.97,
+            }},
+            {"kind": "t3", "data": {"id": "abc2", "title": "Gone", "author": "[deleted]", "created_utc": 1700000100.0}},
+            {"kind": "more", "data": {"count": 3, "children": ["x", "y", "z"]}},
+        ],
+    },
+}
+
+
+class RecordingReddit:
+    def __init__(self, response):
+        self.response = response
+        self.requests = []
+
+    def request(self, method, path, params):
+        self.requests.append((method, path, params))
+        return self.response
+
+
+def test_projection_keeps_only_read_fields():
+    """t3 children become RedditRecords with the scraper's fields and nothing else"""
+    records, after = project_listing(LISTING)
+    assert after == "t3_abc3", "next-page cursor was lost"
+    assert [r.id for r in records] == ["abc1", "abc2"], "non-post children were projected"
+    first = records[0]
+    assert (first.title, first.author, first.score, first.subreddit) == ("First &amp; only", "alice", 42, "python")
+    assert not hasattr(first, "__dict__") and not hasattr(first, "num_comments"), "record kept unread fields"
+    missing = records[1]
+    assert missing.selftext == "" and missing.score == 0 and missing.permalink == "", "missing fields have no defaults"
+
+
+def test_deleted_author_reads_as_deleted():
+    """A [deleted] author is stored as None and reported as [deleted]"""
+    records, _ = project_listing(LISTING)
+    assert records[1].author is None
+    assert author_name(records[1]) == "[deleted]" and author_name(records[0]) == "alice"
+
+
+def test_malformed_listing_projects_to_nothing():
+    """Error bodies and empty listings yield no records and no cursor"""
+    assert project_listing({"error": 404}) == ([], None)
+    assert project_listing([]) == ([], None)
+
+
+def test_requests_ask_for_raw_json():
+    """Listing and /api/info requests add raw_json and pass parameters through"""
+    reddit = RecordingReddit(LISTING)
+    records, after = fetch_raw_listing(reddit, "r/python/top", {"limit": 100, "t": "week"})
+    assert len(records) == 2 and after == "t3_abc3"
+    method, path, params = reddit.requests[0]
+    assert (method, path) == ("GET", "r/python/top")
+    assert params == {"limit": 100, "t": "week", "raw_json": 1}, f"unexpected parameters {params}"
+
+    fetch_raw_info(reddit, ["t3_abc1", "t3_abc2"])
+    _, path, params = reddit.requests[1]
+    assert path == "api/info" and params["id"] == "t3_abc1,t3_abc2" and params["raw_json"] == 1
+    print(f"requests: {[(p, sorted(q)) for _, p, q in reddit.requests]}")
+
+
+def main():
+    print("=" * 60)
+    print("CollectPosts - Raw Reddit Listing Test")
+    print("=" * 60)
+
+    results = []
+    for test in [test_projection_keeps_only_read_fields, test_deleted_author_reads_as_deleted,
+                 test_malformed_listing_projects_to_nothing, test_requests_ask_for_raw_json]:
+        try:
+            test()
+            results.append((test.__name__, True))
+        except AssertionError as e:
+            print(f"FAIL: {e}")
+            results.append((test.__name__, False))
+
+    print("=" * 60)
+    for name, ok in results:
+        print(f"{name:48} {'PASS' if ok else 'FAIL'}")
+    print("=" * 60)
+    return 0 if all(ok for _, ok in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+CollectPosts - Reddit Store-First Test
+The scraper answers a window from the local post store before touching the
+API: a window the store covers completely is served locally (also a recent
+one whose stream posts have no refreshed scores yet), and a partly
+covered one takes only the covered spans' share of the limit from the store
+and scrapes the gaps. Reddit is replaced with a listing stand-in that counts
+its requests, so no network access is needed.
+"""
+
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta, timezone
+
+import reddit_listing_cache
+import reddit_scraper
+from post_store import PostStore, post_row
+from reddit_client import RateLimiter
+from reddit_listing_cache import ListingCache
+from reddit_scraper import collect_reddit_posts_with_overlapper
+from reddit_strategy_planner import StrategyPlanner
+
+HOUR = 3600
+EPOCH = datetime(1970, 1, 1)
+
+
+def utcnow() -> datetime:
+    """Naive UTC now, like the scraper's dates"""
+    return datetime.now(timezone.utc).replace(tzinfo=None, microsecond=0)
+
+
+def epoch(moment: datetime) -> float:
+    return (moment - EPOCH).total_seconds()
+
+
+class ListingReddit:
+    """One page of hourly posts across the test window for every listing; counts requests"""
+
+    def __init__(self, subreddit, begin_utc, hours):
+        self.subreddit_name = subreddit
+        self.children = [
+            {"kind": "t3", "data": {"id": f"live{i}", "title": f"live post {i}", "selftext": "",
+                                    "author": "bob", "permalink": f"/r/{subreddit}/comments/live{i}/",
+                                    "score": 10, "created_utc": begin_utc + i * HOUR + 60,
+                                    "subreddit": subreddit}}
+            for i in range(hours)
+        ]
+        self.requests = []
+
+    def request(self, method, path, params):
+        self.requests.append(path)
+        return {"data": {"children": self.children, "after": None}}
+
+    def subreddit(self, name):
+        return name
+
+
+class FakePool:
+    def __init__(self, reddit):
+        self.reddit = reddit
+        self.leases = 0
+
+    def acquire(self):
+        self.leases += 1
+        return self.reddit
+
+    def release(self, reddit, failed=False):
+        pass
+
+
+class KnownSubreddits:
+    def get(self, name):
+        return {"status": "ok"}
+
+
+def scrape(store, reddit, tmp, **kwargs):
+    """Run the scraper with the store, Reddit, planner and caches replaced; returns (posts, pool)"""
+    pool = FakePool(reddit)
+    names = ("get_post_store", "get_reddit_pool", "get_rate_limiter", "metadata_cache", "planner")
+    original = {name: getattr(reddit_scraper, name) for name in names}
+    original_cache = reddit_listing_cache.listing_cache
+    reddit_scraper.get_post_store = lambda create=False: store
+    reddit_scraper.get_reddit_pool = lambda: pool
+    reddit_scraper.get_rate_limiter = lambda: RateLimiter(requests_per_minute=6000)
+    reddit_scraper.metadata_cache = KnownSubreddits()
+    reddit_scraper.planner = StrategyPlanner(os.path.join(tmp, "strategy_stats.json"))
+    # A private page cache, so listings from other tests are never served
+    reddit_listing_cache.listing_cache = ListingCache()
+    try:
+        posts = collect_reddit_posts_with_overlapper(reddit.subreddit_name, **kwargs)
+    finally:
+        for name, value in original.items():
+            setattr(reddit_scraper, name, value)
+        reddit_listing_cache.listing_cache = original_cache
+    return posts, pool
+
+
+def test_covered_window_is_served_locally():
+    """A completely covered historical window makes no API calls"""
+    end = utcnow() - timedelta(days=60)
+    begin = end - timedelta(days=2)
+    with tempfile.TemporaryDirectory() as tmp:
+        store = PostStore(os.path.join(tmp, "posts.sqlite3"))
+        store.upsert_posts([
+            post_row({"id": f"d{i}", "subreddit": "storetest", "created_utc": epoch(begin) + i * HOUR, "score": i},
+                     "dump", updated_utc=epoch(end) + 86400)
+            for i in range(48)
+        ])
+        store.add_coverage("storetest", epoch(begin), epoch(end), "dump:test")
+        reddit = ListingReddit("storetest", epoch(begin), 48)
+        posts, pool = scrape(store, reddit, tmp, begin_date=begin, end_date=end, limit=10)
+        print(f"covered window: {len(posts)} posts, {pool.leases} client lease(s), {len(reddit.requests)} request(s)")
+        assert [p["id"] for p in posts] == [f"d{i}" for i in range(47, 37, -1)], "not the top stored posts"
+        assert pool.leases == 0 and not reddit.requests, "a covered window went to the API"
+
+
+def test_recent_stream_window_is_served_locally():
+    """A window up to now, covered by the stream, needs no refreshed scores and no API calls"""
+    end = utcnow()
+    begin = end - timedelta(hours=3)
+    with tempfile.TemporaryDirectory() as tmp:
+        store = PostStore(os.path.join(tmp, "posts.sqlite3"))
+        store.upsert_posts([
+            post_row({"id": f"s{i}", "subreddit": "storetest", "created_utc": epoch(begin) + i * 600, "score": 1},
+                     "stream", updated_utc=epoch(begin) + i * 600)
+            for i in range(18)
+        ])
+        store.set_coverage(["storetest"], epoch(begin), epoch(end), "stream:0:test")
+        reddit = ListingReddit("storetest", epoch(begin), 3)
+        posts, pool = scrape(store, reddit, tmp, begin_date=begin, end_date=end, limit=5)
+        print(f"recent stream window: {[p['id'] for p in posts]}, {pool.leases} lease(s)")
+        assert [p["id"] for p in posts] == ["s17", "s16", "s15", "s14", "s13"], "not the newest stream posts"
+        assert pool.leases == 0 and not reddit.requests, "a covered recent window went to the API"
+
+
+def test_partly_covered_window_scrapes_the_gaps():
+    """The store supplies its covered span's share of the limit; the rest comes from the uncovered span"""
+    end = utcnow() - timedelta(hours=1)
+    begin = end - timedelta(days=4)
+    middle = begin + timedelta(days=2)
+    with tempfile.TemporaryDirectory() as tmp:
+        store = PostStore(os.path.join(tmp, "posts.sqlite3"))
+        # Plenty of high-scoring posts in the covered first half
+        store.upsert_posts([
+            post_row({"id": f"d{i}", "subreddit": "storetest", "created_utc": epoch(begin) + i * 1800,
+                      "score": 1000 + i}, "dump", updated_utc=epoch(end))
+            for i in range(96)
+        ])
+        store.add_coverage("storetest", epoch(begin), epoch(middle), "dump:test")
+        reddit = ListingReddit("storetest", epoch(begin), 96)
+        posts, pool = scrape(store, reddit, tmp, begin_date=begin, end_date=end, limit=20)
+
+        stored = [p for p in posts if p["id"].startswith("d")]
+        live = [p for p in posts if p["id"].startswith("live")]
+        print(f"partly covered window: {len(stored)} stored + {len(live)} scraped, {len(reddit.requests)} request(s)")
+        assert len(posts) == 20 and len(stored) == 10, "the store's share is not proportional to its coverage"
+        assert reddit.requests, "the uncovered span was never scraped"
+        live_times = [datetime.strptime(p["timestamp"], "%Y-%m-%dT%H:%M:%SZ") for p in live]
+        assert all(t >= middle for t in live_times), "posts of the covered span were scraped again"
+
+
+def main():
+    print("=" * 60)
+    print("CollectPosts - Reddit Store-First Test")
+    print("=" * 60)
+
+    results = []
+    for test in [test_covered_window_is_served_locally, test_recent_stream_window_is_served_locally,
+                 test_partly_covered_window_scrapes_the_gaps]:
+        try:
+            test()
+            results.append((test.__name__, True))
+        except AssertionError as e:
+            print(f"FAIL: {e}")
+            results.append((test.__name__, False))
+
+    print("=" * 60)
+    for name, ok in results:
+        print(f"{name:48} {'PASS' if ok else 'FAIL'}")
+    print("=" * 60)
+    return 0 if all(ok for _, ok in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+CollectPosts - Reddit Strategy Planner Test
+Steps are ordered by the in-range posts per call they produced before, a
+step that keeps coming back empty is skipped (but still explored every
+EXPLORE_EVERY plans), a plan is never empty, and the statistics survive a
+reload from disk.
+"""
+
+import os
+import sys
+import tempfile
+
+from reddit_strategy_planner import EXPLORE_EVERY, MIN_RUNS_TO_SKIP, StrategyPlanner
+
+SEARCH = ("search", "all", "new")
+TOP_ALL = ("top", "all", "")
+TOP_YEAR = ("top", "year", "")
+SHAPE = "historical"
+
+
+def test_cold_start_keeps_rule_order():
+    """Without statistics every step runs in the order the rules listed them"""
+    with tempfile.TemporaryDirectory() as tmp:
+        planner = StrategyPlanner(os.path.join(tmp, "strategy_stats.json"))
+        plan, skipped = planner.plan([SEARCH, TOP_ALL, TOP_YEAR], SHAPE)
+        assert plan == [SEARCH, TOP_ALL, TOP_YEAR] and not skipped, f"cold plan reordered: {plan}"
+
+
+def test_productive_steps_first_and_persisted():
+    """Recorded yields reorder the plan, also for a planner loaded from the saved file"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "strategy_stats.json")
+        planner = StrategyPlanner(path)
+        planner.record(SEARCH, SHAPE, calls=10, posts=5)
+        planner.record(TOP_YEAR, SHAPE, calls=10, posts=300)
+        planner.record(TOP_ALL, SHAPE, calls=0, posts=50)  # served from cache: no cost signal
+        planner.report("python", SHAPE, [])
+
+        reloaded = StrategyPlanner(path)
+        plan, _ = reloaded.plan([SEARCH, TOP_ALL, TOP_YEAR], SHAPE)
+        print(f"plan after reload: {plan}")
+        assert plan[0] == TOP_YEAR, "the most productive step is not first"
+        assert plan.index(TOP_ALL) < plan.index(SEARCH), "untried step ranked below a poor one"
+        assert "top|all||historical" not in reloaded.stats()["steps"], "a cache-only run was counted"
+        other_shape, _ = reloaded.plan([SEARCH, TOP_YEAR], "recent")
+        assert other_shape == [SEARCH, TOP_YEAR], "statistics leaked across window shapes"
+
+
+def test_dead_step_is_skipped_but_explored():
+    """A step with no yield after MIN_RUNS_TO_SKIP runs is skipped, except every EXPLORE_EVERY plans"""
+    with tempfile.TemporaryDirectory() as tmp:
+        planner = StrategyPlanner(os.path.join(tmp, "strategy_stats.json"))
+        for _ in range(MIN_RUNS_TO_SKIP):
+            planner.record(SEARCH, SHAPE, calls=10, posts=0)
+        runs = 0
+        for _ in range(EXPLORE_EVERY):
+            plan, skipped = planner.plan([SEARCH, TOP_ALL], SHAPE)
+            runs += SEARCH in plan
+            assert SEARCH in plan or SEARCH in skipped
+        print(f"dead step ran in {runs} of {EXPLORE_EVERY} plans")
+        assert runs == 1, f"dead step ran {runs} times in {EXPLORE_EVERY} plans"
+
+
+def test_plan_is_never_empty():
+    """When every step is dead the least bad one still runs"""
+    with tempfile.TemporaryDirectory() as tmp:
+        planner = StrategyPlanner(os.path.join(tmp, "strategy_stats.json"))
+        for _ in range(MIN_RUNS_TO_SKIP):
+            planner.record(SEARCH, SHAPE, calls=10, posts=0)
+            planner.record(TOP_ALL, SHAPE, calls=10, posts=1)
+        plan, skipped = planner.plan([SEARCH, TOP_ALL], SHAPE)
+        assert plan == [TOP_ALL] and skipped == [SEARCH], f"unexpected fallback plan {plan}, skipped {skipped}"
+
+
+def main():
+    print("=" * 60)
+    print("CollectPosts - Reddit Strategy Planner Test")
+    print("=" * 60)
+
+    results = []
+    for test in [test_cold_start_keeps_rule_order, test_productive_steps_first_and_persisted,
+                 test_dead_step_is_skipped_but_explored, test_plan_is_never_empty]:
+        try:
+            test()
+            results.append((test.__name__, True))
+        except AssertionError as e:
+            print(f"FAIL: {e}")
+            results.append((test.__name__, False))
+
+    print("=" * 60)
+    for name, ok in results:
+        print(f"{name:48} {'PASS' if ok else 'FAIL'}")
+    print("=" * 60)
+    return 0 if all(ok for _, ok in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+CollectPosts - Reddit Stream Worker Test
+Polled /new pages are stored once per post, coverage is recorded only for
+runs of connected polls (a full page of unseen posts ends the run and leaves
+a gap), and stream posts whose scores were never refreshed are taken by
+recency, in proportion to their share of a window, instead of by score.
+Reddit is replaced with a scripted stand-in and the worker's clock is
+simulated, so the test runs instantly and offline.
+"""
+
+import os
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+
+import reddit_stream_worker
+from post_store import SCORE_SETTLE_SECONDS, PostStore
+from reddit_stream_worker import POLL_LIMIT, StreamWorker
+
+POLL_GAP = 60
+
+
+class FakeClock:
+    def __init__(self, now):
+        self.now = now
+
+    def time(self) -> float:
+        return self.now
+
+
+class ScriptedReddit:
+    """Serves one scripted /new page per poll, then stops the worker"""
+
+    def __init__(self, pages, clock, worker):
+        self.pages = list(pages)
+        self.clock = clock
+        self.worker = worker
+        self.paths = []
+
+    def request(self, method, path, params):
+        self.paths.append(path)
+        ids = self.pages.pop(0)
+        children = [{"kind": "t3", "data": {"id": post_id, "subreddit": "python", "title": post_id,
+                                            "created_utc": self.clock.now, "score": 1}} for post_id in ids]
+        if not self.pages:
+            self.worker.stop_event.set()
+        self.clock.now += POLL_GAP
+        return {"data": {"children": children}}
+
+
+class FakePool:
+    def __init__(self, reddit):
+        self.reddit = reddit
+        self.released = []
+
+    def acquire(self):
+        return self.reddit
+
+    def release(self, reddit, failed=False):
+        self.released.append(failed)
+
+
+def follow(pages, store, clock):
+    """Run one stream group over the scripted pages; returns the stand-in Reddit"""
+    names = ("get_post_store", "get_reddit_pool", "get_rate_limiter", "POLL_SECONDS", "time")
+    original = {name: getattr(reddit_stream_worker, name) for name in names}
+    reddit_stream_worker.get_post_store = lambda create=False: store
+    try:
+        worker = StreamWorker(["python", "rust"])
+        reddit = ScriptedReddit(pages, clock, worker)
+        pool = FakePool(reddit)
+        reddit_stream_worker.get_reddit_pool = lambda: pool
+        reddit_stream_worker.get_rate_limiter = lambda: SimpleNamespace(acquire=lambda tokens: None)
+        reddit_stream_worker.POLL_SECONDS = 0
+        reddit_stream_worker.time = SimpleNamespace(time=clock.time)
+        worker._follow(0, ["python", "rust"])
+    finally:
+        for name, value in original.items():
+            setattr(reddit_stream_worker, name, value)
+    assert pool.released == [False], f"client lease not returned cleanly: {pool.released}"
+    return worker, reddit
+
+
+def test_connected_polls_form_coverage_runs():
+    """A full page of unseen posts ends the covered run; later connected polls start a new one"""
+    start = int(time.time())
+    pages = [
+        ["a", "b", "c"],                              # first poll starts run 1
+        ["d", "a", "b", "c"],                         # reaches back to seen posts: run 1 grows
+        [f"burst{i}" for i in range(POLL_LIMIT)],     # all unseen: posts may be missing, run 2 starts
+        ["e", "f", "burst0", "burst1"],               # connected again: run 2 grows
+    ]
+    with tempfile.TemporaryDirectory() as tmp:
+        store = PostStore(os.path.join(tmp, "posts.sqlite3"))
+        worker, reddit = follow(pages, store, FakeClock(start))
+        runs = store._connection().execute(
+            "SELECT subreddit, begin_utc, end_utc FROM coverage ORDER BY begin_utc, subreddit").fetchall()
+        print(f"ingested {worker.ingested}, runs: {[tuple(run) for run in runs]}")
+        assert reddit.paths[0] == "r/python+rust/new", f"unexpected stream path {reddit.paths[0]}"
+        assert worker.ingested == store.stats()["posts"] == 4 + POLL_LIMIT + 2, "posts were lost or duplicated"
+        assert [tuple(run) for run in runs] == [
+            ("python", start, start + POLL_GAP), ("rust", start, start + POLL_GAP),
+            ("python", start + 2 * POLL_GAP, start + 3 * POLL_GAP), ("rust", start + 2 * POLL_GAP, start + 3 * POLL_GAP),
+        ], "coverage runs do not follow the connected polls"
+        assert store.covers("rust", start, start + POLL_GAP, slack_seconds=0)
+        assert not store.covers("python", start, start + 3 * POLL_GAP, slack_seconds=0), "the burst gap was covered"
+
+
+def test_unsettled_posts_are_taken_by_recency():
+    """Fresh stream posts fill their share of a window newest first; refreshed ones rank by score"""
+    start = int(time.time())
+    with tempfile.TemporaryDirectory() as tmp:
+        store = PostStore(os.path.join(tmp, "posts.sqlite3"))
+        follow([["a", "b"], ["c", "a", "b"], ["d", "c"]], store, FakeClock(start))
+        # "a" was already refreshed and is popular; "b".."d" still carry creation-time scores
+        store.update_stats([{"id": "a", "score": 500, "num_comments": 0, "removed": 0,
+                             "updated_utc": start + SCORE_SETTLE_SECONDS}])
+        store.update_stats([{"id": "b", "score": 900, "num_comments": 0, "removed": 0, "updated_utc": start}])
+        posts, covered = store.window("python", start, start + 2 * POLL_GAP, limit=2)
+        print(f"window of 2: {[(p['id'], p['score']) for p in posts]}")
+        assert covered, "the stream run does not cover the window"
+        # 3 of 4 posts are unsettled: round(2 * 3/4) = 2 slots, newest first; "b"'s stale 900 does not count
+        assert [p["id"] for p in posts] == ["d", "c"], f"unexpected window {posts}"
+
+        posts, _ = store.window("python", start, start + 2 * POLL_GAP, limit=4)
+        assert [p["id"] for p in posts] == ["a", "d", "c", "b"], "settled posts are not ranked first by score"
+
+        store.update_stats([{"id": post_id, "score": score, "num_comments": 0, "removed": 0,
+                             "updated_utc": start + 2 * POLL_GAP + SCORE_SETTLE_SECONDS}
+                            for post_id, score in (("b", 3), ("c", 40), ("d", 7))])
+        posts, _ = store.window("python", start, start + 2 * POLL_GAP, limit=2)
+        print(f"after refresh: {[(p['id'], p['score']) for p in posts]}")
+        assert [p["id"] for p in posts] == ["a", "c"], "refreshed posts are not ranked by score"
+
+
+def main():
+    print("=" * 60)
+    print("CollectPosts - Reddit Stream Worker Test")
+    print("=" * 60)
+
+    results = []
+    for test in [test_connected_polls_form_coverage_runs, test_unsettled_posts_are_taken_by_recency]:
+        try:
+            test()
+            results.append((test.__name__, True))
+        except AssertionError as e:
+            print(f"FAIL: {e}")
+            results.append((test.__name__, False))
+
+    print("=" * 60)
+    for name, ok in results:
+        print(f"{name:48} {'PASS' if ok else 'FAIL'}")
+    print("=" * 60)
+    return 0 if all(ok for _, ok in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+CollectPosts - Score Refresh Test
+Stale stored posts are refreshed through /api/info, 100 IDs per call: only
+posts last updated before the cutoff (and not already removed) are sent,
+removed and deleted posts are marked, IDs missing from an answer keep their
+old stats for the next run, and a failed call is counted without stopping
+the other batches. Reddit is replaced with a stand-in answering from a table.
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+from types import SimpleNamespace
+
+import refresh_scores
+from post_store import PostStore, post_row
+from refresh_scores import INFO_BATCH_SIZE, refresh_stored_posts
+
+HOUR = 3600
+
+
+class InfoReddit:
+    """/api/info stand-in: answers IDs in `answers` (id -> data), leaves others out, fails on `failing` IDs"""
+
+    def __init__(self, answers, failing=()):
+        self.answers = answers
+        self.failing = set(failing)
+        self.batches = []
+        self._lock = threading.Lock()
+
+    def request(self, method, path, params):
+        assert path == "api/info"
+        ids = [full_name[len("t3_"):] for full_name in params["id"].split(",")]
+        with self._lock:
+            self.batches.append(ids)
+        if self.failing & set(ids):
+            raise RuntimeError("503 Service Unavailable")
+        return {"data": {"children": [{"kind": "t3", "data": {"id": post_id, **self.answers[post_id]}}
+                                      for post_id in ids if post_id in self.answers]}}
+
+
+class FakePool:
+    def __init__(self, reddit):
+        self.reddit = reddit
+        self.released = []
+
+    def acquire(self):
+        return self.reddit
+
+    def release(self, reddit, failed=False):
+        self.released.append(failed)
+
+
+def refresh(store, reddit, **kwargs):
+    """refresh_stored_posts with the store, client pool and rate limiter replaced; returns (summary, pool)"""
+    pool = FakePool(reddit)
+    names = ("get_post_store", "get_reddit_pool", "get_rate_limiter")
+    original = {name: getattr(refresh_scores, name) for name in names}
+    refresh_scores.get_post_store = lambda create=False: store
+    refresh_scores.get_reddit_pool = lambda: pool
+    refresh_scores.get_rate_limiter = lambda: SimpleNamespace(acquire=lambda tokens: None)
+    try:
+        return refresh_stored_posts(**kwargs), pool
+    finally:
+        for name, value in original.items():
+            setattr(refresh_scores, name, value)
+
+
+def stored(store, post_id):
+    return store._connection().execute(
+        "SELECT score, num_comments, removed, updated_utc FROM posts WHERE id = ?", (post_id,)).fetchone()
+
+
+def fill(store, now):
+    """230 stale posts, 20 recently refreshed ones and one stale post already marked removed"""
+    rows = [post_row({"id": f"s{i}", "subreddit": "python", "created_utc": now - 48 * HOUR, "score": 1},
+                     "dump", updated_utc=now - 7 * HOUR - i) for i in range(230)]
+    rows += [post_row({"id": f"f{i}", "subreddit": "python", "created_utc": now - 48 * HOUR, "score": 1},
+                      "dump", updated_utc=now - HOUR) for i in range(20)]
+    rows.append(post_row({"id": "gone", "subreddit": "python", "created_utc": now - 48 * HOUR,
+                          "removed_by_category": "moderator"}, "dump", updated_utc=now - 30 * HOUR))
+    store.upsert_posts(rows)
+
+
+def test_stale_posts_refreshed_100_per_call():
+    """230 stale posts take three calls of at most 100 IDs; fresh and removed posts are not sent"""
+    now = int(time.time())
+    with tempfile.TemporaryDirectory() as tmp:
+        store = PostStore(os.path.join(tmp, "posts.sqlite3"))
+        fill(store, now)
+        answers = {f"s{i}": {"score": 100 + i, "num_comments": i} for i in range(230)}
+        reddit = InfoReddit(answers)
+        summary, pool = refresh(store, reddit, max_age_hours=6, workers=2)
+        sizes = sorted(len(batch) for batch in reddit.batches)
+        print(f"batches: {sizes}, summary: {summary}")
+        assert sizes == [30, INFO_BATCH_SIZE, INFO_BATCH_SIZE], "IDs were not sent 100 per call"
+        sent = {post_id for batch in reddit.batches for post_id in batch}
+        assert sent == set(answers), "fresh or already removed posts were refreshed"
+        assert (summary["posts"], summary["calls"], summary["updated"], summary["missing"]) == (230, 3, 230, 0)
+        assert pool.released == [False] * 3
+        score, comments, removed, updated = stored(store, "s7")
+        assert (score, comments, removed) == (107, 7, 0) and updated >= now
+        assert stored(store, "f0")[0] == 1
+        assert store.stale_ids(now - 6 * HOUR, 1000) == [], "refreshed posts are still stale"
+
+
+def test_limit_takes_the_stalest_first():
+    """With a limit, the posts refreshed longest ago go first"""
+    now = int(time.time())
+    with tempfile.TemporaryDirectory() as tmp:
+        store = PostStore(os.path.join(tmp, "posts.sqlite3"))
+        fill(store, now)
+        reddit = InfoReddit({})
+        refresh(store, reddit, max_age_hours=6, limit=5)
+        assert reddit.batches == [["s229", "s228", "s227", "s226", "s225"]], f"unexpected batch {reddit.batches}"
+
+
+def test_removed_deleted_and_missing_posts():
+    """Removed and deleted posts are marked; IDs left out of the answer keep their stats"""
+    now = int(time.time())
+    with tempfile.TemporaryDirectory() as tmp:
+        store = PostStore(os.path.join(tmp, "posts.sqlite3"))
+        fill(store, now)
+        answers = {f"s{i}": {"score": 5} for i in range(230) if i not in (3, 4)}
+        answers["s0"] = {"score": 2, "removed_by_category": "moderator"}
+        answers["s1"] = {"score": 2, "selftext": "[deleted]"}
+        answers["s2"] = {"score": 2, "selftext": "[removed]"}
+        before = stored(store, "s3")
+        summary, _ = refresh(store, InfoReddit(answers), max_age_hours=6)
+        print(f"summary: {summary}")
+        assert [stored(store, f"s{i}")[2] for i in range(3)] == [1, 1, 1], "removed or deleted posts not marked"
+        assert stored(store, "s5")[2] == 0
+        assert (summary["removed"], summary["missing"], summary["updated"]) == (3, 2, 228)
+        assert stored(store, "s3") == before, "a post missing from the answer was changed"
+        assert set(store.stale_ids(now - 6 * HOUR, 1000)) == {"s3", "s4"}, "missing posts are not retried next run"
+
+
+def test_failed_batch_does_not_stop_the_others():
+    """A failing call is counted and its client lease returned as failed; other batches still apply"""
+    now = int(time.time())
+    with tempfile.TemporaryDirectory() as tmp:
+        store = PostStore(os.path.join(tmp, "posts.sqlite3"))
+        fill(store, now)
+        answers = {f"s{i}": {"score": 9} for i in range(230)}
+        reddit = InfoReddit(answers, failing={"s229"})
+        summary, pool = refresh(store, reddit, max_age_hours=6, workers=1)
+        print(f"summary: {summary}, leases released failed: {pool.released}")
+        assert summary["failed_batches"] == 1 and summary["updated"] == 130
+        assert sorted(pool.released) == [False, False, True]
+        assert len(store.stale_ids(now - 6 * HOUR, 1000)) == 100
+
+
+def main():
+    print("=" * 60)
+    print("CollectPosts - Score Refresh Test")
+    print("=" * 60)
+
+    results = []
+    for test in [test_stale_posts_refreshed_100_per_call, test_limit_takes_the_stalest_first,
+                 test_removed_deleted_and_missing_posts, test_failed_batch_does_not_stop_the_others]:
+        try:
+            test()
+            results.append((test.__name__, True))
+        except AssertionError as e:
+            print(f"FAIL: {e}")
+            results.append((test.__name__, False))
+
+    print("=" * 60)
+    for name, ok in results:
+        print(f"{name:48} {'PASS' if ok else 'FAIL'}")
+    print("=" * 60)
+    return 0 if all(ok for _, ok in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
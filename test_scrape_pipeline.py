@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+CollectPosts - Scrape Pipeline Test
+The hashtag stabilizer settles once its top terms stop changing, the final
+bank reuses its counts only when it has seen exactly the final posts, and
+the pipelined scrape starts the other sources with the early bank, with the
+full Reddit bank when the bank never settles, or with the fallback terms
+when Reddit fails first. Word counts stand in for noun tagging and the
+scrapers are replaced, so the test runs offline in a few seconds.
+"""
+
+import sys
+import threading
+import time
+from collections import Counter
+
+import scrape_pipeline
+from scrape_pipeline import HashtagStabilizer, PipelinedScrape
+
+
+def word_stabilizer(min_posts=10, top_n=2, stable_checks=3):
+    """Stabilizer over the words of post["text"]; returns (stabilizer, counts)"""
+    counts = Counter()
+
+    def ingest(posts):
+        for post in posts:
+            counts.update(post["text"].split())
+
+    def top(k):
+        return [word for word, _ in counts.most_common(k)]
+
+    return HashtagStabilizer(ingest, top, lambda: top(5), min_posts=min_posts, top_n=top_n,
+                             stable_checks=stable_checks), counts
+
+
+def posts(text, count):
+    return [{"text": text, "source": "reddit"} for _ in range(count)]
+
+
+def fast_polls(test):
+    """Run test() with the pipeline polling every 10ms instead of every 0.5s"""
+    def run():
+        original = scrape_pipeline.POLL_SECONDS
+        scrape_pipeline.POLL_SECONDS = 0.01
+        try:
+            test()
+        finally:
+            scrape_pipeline.POLL_SECONDS = original
+    run.__name__, run.__doc__ = test.__name__, test.__doc__
+    return run
+
+
+class RecordingSources:
+    """run_sources stand-in: remembers the bank and answers one batch per source"""
+
+    def __init__(self):
+        self.banks = []
+        self.started = threading.Event()
+
+    def __call__(self, bank):
+        self.banks.append(list(bank))
+        self.started.set()
+        return iter([("youtube", [{"source": "youtube"}], None), ("quora", [], RuntimeError("blocked"))])
+
+
+def test_stabilizer_settles_after_unchanged_checks():
+    """No check before min_posts; stable after stable_checks checks with the same top terms"""
+    stabilizer, _ = word_stabilizer(min_posts=10, top_n=2, stable_checks=3)
+    stabilizer.add_posts(posts("python django", 5))
+    assert not stabilizer.poll() and stabilizer._last_top is None, "checked before min_posts"
+
+    outcomes = []
+    for _ in range(4):
+        stabilizer.add_posts(posts("python django", 5))
+        outcomes.append(stabilizer.poll())
+    print(f"checks: {outcomes}, posts {stabilizer.posts}")
+    assert outcomes == [False, False, False, True], f"unexpected settling {outcomes}"
+
+    # A new leader resets the count
+    stabilizer.add_posts(posts("rust rust rust", 20))
+    assert not stabilizer.poll(), "a changed top stayed stable"
+
+
+def test_stabilizer_needs_top_n_terms():
+    """A sample with fewer distinct terms than top_n never settles"""
+    stabilizer, _ = word_stabilizer(min_posts=5, top_n=3, stable_checks=1)
+    for _ in range(5):
+        stabilizer.add_posts(posts("python django", 5))
+        assert not stabilizer.poll(), "settled on fewer than top_n terms"
+
+
+def test_final_bank_reuses_counts_for_same_posts():
+    """final_bank reads the counts when they cover exactly the final posts, else extracts"""
+    stabilizer, counts = word_stabilizer()
+    collected = posts("python django python", 12)
+    stabilizer.add_posts(collected)
+    extracted = []
+
+    def extract(final_posts):
+        extracted.append(len(final_posts))
+        return ["extracted"]
+
+    # Pending posts are counted first, so every streamed post is included
+    assert stabilizer.final_bank(collected, extract) == ["python", "django"]
+    assert not extracted and counts["python"] == 24, "the sampled counts were not reused"
+
+    # Date filtering or sampling dropped posts: the counts no longer describe them
+    assert stabilizer.final_bank(collected[:8], extract) == ["extracted"]
+    assert extracted == [8]
+
+    def failing(batch):
+        raise RuntimeError("tagger crashed")
+
+    broken = HashtagStabilizer(failing, lambda k: [], lambda: ["stale"], min_posts=1)
+    broken.add_posts(collected)
+    assert broken.final_bank(collected, extract) == ["extracted"], "a failed ingest reused stale counts"
+
+
+@fast_polls
+def test_sources_start_with_the_settled_bank():
+    """Sources start while Reddit keeps collecting; the final bank still covers every post"""
+    stabilizer, _ = word_stabilizer(min_posts=10, top_n=2, stable_checks=2)
+    sources = RecordingSources()
+
+    def collect_reddit(on_posts):
+        collected = []
+        for _ in range(400):
+            batch = posts("python django", 5)
+            collected += batch
+            on_posts(batch)
+            if sources.started.wait(0.01):
+                break
+        assert sources.started.is_set(), "sources never started while Reddit was collecting"
+        late = posts("rust rust rust", 30)
+        collected += late
+        on_posts(late)
+        return collected, stabilizer.final_bank(collected, lambda p: ["extracted"])
+
+    pipeline = PipelinedScrape(collect_reddit, sources, stabilizer, fallback_terms=["python"], max_wait_seconds=60)
+    results = list(pipeline)
+    print(f"started on {pipeline.start_reason} with {pipeline.source_bank}; final bank {pipeline.reddit_bank}")
+    assert pipeline.start_reason == "stable"
+    assert sources.banks == [["python", "django"]] and pipeline.source_bank == ["python", "django"]
+    assert "rust" in pipeline.reddit_bank and "extracted" not in pipeline.reddit_bank, \
+        "the final bank did not reuse the counts of every post"
+    assert sorted(source for source, _, _ in results) == ["quora", "reddit", "youtube"]
+    assert [error for source, _, error in results if source == "quora"][0] is not None
+
+
+@fast_polls
+def test_unsettled_bank_waits_for_reddit():
+    """A sample that never settles starts the sources with the full Reddit bank"""
+    stabilizer, _ = word_stabilizer(min_posts=1000)
+    sources = RecordingSources()
+
+    def collect_reddit(on_posts):
+        collected = posts("python django", 20)
+        on_posts(collected)
+        time.sleep(0.05)
+        return collected, ["#python", "#django", "#flask"]
+
+    pipeline = PipelinedScrape(collect_reddit, sources, stabilizer, fallback_terms=["python"])
+    results = list(pipeline)
+    assert pipeline.start_reason == "reddit_done"
+    assert sources.banks == [["#python", "#django", "#flask"]] and pipeline.reddit_bank == sources.banks[0]
+    assert len(results) == 3
+
+    # An empty Reddit bank falls back to the query
+    empty = PipelinedScrape(lambda on_posts: ([], []), RecordingSources(), word_stabilizer()[0],
+                            fallback_terms=["python"])
+    list(empty)
+    assert empty.source_bank == ["python"] and empty.reddit_bank == []
+
+
+@fast_polls
+def test_reddit_failure_before_settling():
+    """Reddit failing early reports its error and the sources still run on the fallback terms"""
+    sources = RecordingSources()
+
+    def collect_reddit(on_posts):
+        on_posts(posts("python", 3))
+        raise RuntimeError("403 private subreddit")
+
+    pipeline = PipelinedScrape(collect_reddit, sources, word_stabilizer()[0], fallback_terms=["python"])
+    results = list(pipeline)
+    reddit = [result for result in results if result[0] == "reddit"]
+    print(f"reddit result: {reddit}, sources bank {sources.banks}")
+    assert len(reddit) == 1 and reddit[0][1] == [] and str(reddit[0][2]) == "403 private subreddit"
+    assert pipeline.start_reason == "reddit_done" and sources.banks == [["python"]]
+    assert {source for source, _, _ in results} == {"reddit", "youtube", "quora"}
+
+
+def main():
+    print("=" * 60)
+    print("CollectPosts - Scrape Pipeline Test")
+    print("=" * 60)
+
+    results = []
+    for test in [test_stabilizer_settles_after_unchanged_checks, test_stabilizer_needs_top_n_terms,
+                 test_final_bank_reuses_counts_for_same_posts, test_sources_start_with_the_settled_bank,
+                 test_unsettled_bank_waits_for_reddit, test_reddit_failure_before_settling]:
+        try:
+            test()
+            results.append((test.__name__, True))
+        except AssertionError as e:
+            print(f"FAIL: {e}")
+            results.append((test.__name__, False))
+
+    print("=" * 60)
+    for name, ok in results:
+        print(f"{name:48} {'PASS' if ok else 'FAIL'}")
+    print("=" * 60)
+    return 0 if all(ok for _, ok in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+CollectPosts - Source Fan-out Test
+The non-Reddit sources run concurrently: results come back in completion
+order, and a source that misses its deadline is reported with a TimeoutError
+without holding up the others. Scrapers are replaced with sleeping stand-ins,
+so no network access is needed.
+"""
+
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import source_fanout
+from source_query_planner import SourceQueryPlanner
+
+# Seconds each stand-in scraper takes
+DELAYS = {"youtube": 0.3, "instagram": 0.2, "quora": 0.05, "threads": 3.0}
+
+
+def fake_scraper(source, query, hashtags, limit, begin_date, end_date, time_passed="week"):
+    time.sleep(DELAYS[source])
+    if source == "instagram":
+        raise RuntimeError("login required")
+    return [{"source": source, "title": f"{query} {term}", "content": ""} for term in hashtags[:limit]]
+
+
+def run_fanout(deadlines):
+    """(source, posts, error) tuples and the wall time of one fan-out over all four sources"""
+    original_scraper, original_planner = source_fanout.run_source_scraper, source_fanout.query_planner
+    with tempfile.TemporaryDirectory() as tmp:
+        source_fanout.run_source_scraper = fake_scraper
+        source_fanout.query_planner = SourceQueryPlanner(os.path.join(tmp, "source_query_stats.json"))
+        try:
+            started = time.monotonic()
+            results = list(source_fanout.iter_source_results(
+                sources=["youtube", "instagram", "quora", "threads", "reddit"],
+                query="laptop",
+                hashtags=["battery", "charger", "keyboard"],
+                limits={source: 5 for source in DELAYS},
+                begin_date=datetime(2024, 1, 1),
+                end_date=datetime(2024, 1, 8),
+                deadlines=deadlines
+            ))
+            return results, time.monotonic() - started
+        finally:
+            source_fanout.run_source_scraper = original_scraper
+            source_fanout.query_planner = original_planner
+
+
+def test_results_arrive_in_completion_order():
+    """Fast sources are yielded first, failures carry their exception, reddit is not fanned out"""
+    results, elapsed = run_fanout({"threads": 0.5})
+    order = [source for source, _, _ in results]
+    print(f"completion order: {order} in {elapsed:.2f}s")
+    assert order[:3] == ["quora", "instagram", "youtube"], f"not in completion order: {order}"
+    assert "reddit" not in order, "reddit was run by the fan-out"
+    errors = {source: error for source, _, error in results}
+    assert isinstance(errors["instagram"], RuntimeError), "scraper failure was not reported"
+    posts = {source: posts for source, posts, _ in results}
+    assert posts["quora"] and all(post["source"] == "quora" for post in posts["quora"]), "quora posts missing"
+
+
+def test_missed_deadline_yields_timeout():
+    """A straggler is reported at its deadline and does not set the wall time"""
+    results, elapsed = run_fanout({"threads": 0.5})
+    errors = {source: error for source, _, error in results}
+    print(f"threads: {errors['threads']!r} after {elapsed:.2f}s")
+    assert isinstance(errors["threads"], TimeoutError), "missed deadline was not reported as a TimeoutError"
+    assert elapsed < DELAYS["threads"] - 1, f"fan-out waited {elapsed:.2f}s for the straggler"
+    assert elapsed < sum(DELAYS.values()), "sources ran one after another"
+
+
+def main():
+    print("=" * 60)
+    print("CollectPosts - Source Fan-out Test")
+    print("=" * 60)
+
+    results = []
+    for test in [test_results_arrive_in_completion_order, test_missed_deadline_yields_timeout]:
+        try:
+            test()
+            results.append((test.__name__, True))
+        except AssertionError as e:
+            print(f"FAIL: {e}")
+            results.append((test.__name__, False))
+
+    print("=" * 60)
+    for name, ok in results:
+        print(f"{name:48} {'PASS' if ok else 'FAIL'}")
+    print("=" * 60)
+    return 0 if all(ok for _, ok in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+CollectPosts - Source Query Planner Test
+Plans stay within each source's call budget (never above what the scraper
+can query), charge a YouTube term every page it may fetch, take every term
+once, rank untried generic words below specific ones and expect calls to stop
+at the post limit. Returned posts are credited to the terms they mention, and
+the statistics reorder later plans, also for a planner loaded from the saved
+file. Every test uses a temporary stats file.
+"""
+
+import os
+import sys
+import tempfile
+
+from source_query_planner import MAX_TERMS, TERM_CALLS, SourceQueryPlanner, get_call_budget, term_call_cost
+
+BANK = ["#graphics", "#drivers", "#benchmarks", "#overclocking", "#thermals", "#monitors",
+        "#keyboards", "#firmware", "#chipsets", "#silicon", "#foundry", "#wafers"]
+
+
+def with_budget(source, value):
+    """Run a test with SOURCE_CALL_BUDGET_<SOURCE> set, restoring the environment after"""
+    def wrap(test):
+        def run():
+            name = f"SOURCE_CALL_BUDGET_{source.upper()}"
+            original = os.environ.get(name)
+            os.environ[name] = value
+            try:
+                test()
+            finally:
+                if original is None:
+                    os.environ.pop(name, None)
+                else:
+                    os.environ[name] = original
+        run.__name__, run.__doc__ = test.__name__, test.__doc__
+        return run
+    return wrap
+
+
+@with_budget("youtube", "1000")
+def test_budget_is_clamped_to_what_the_scraper_queries():
+    """A budget above MAX_TERMS x the term cost plans no more terms than the scraper takes"""
+    with tempfile.TemporaryDirectory() as tmp:
+        planner = SourceQueryPlanner(os.path.join(tmp, "stats.json"))
+        terms, summary = planner.plan("youtube", BANK, limit=1000)
+        print(f"youtube: {len(terms)} terms, {summary['planned_calls']} calls of budget {summary['budget_calls']}")
+        assert get_call_budget("youtube") == 1000
+        assert len(terms) == MAX_TERMS["youtube"], f"planned {len(terms)} terms"
+        clamp = MAX_TERMS["youtube"] * term_call_cost("youtube", 1000)
+        assert summary["budget_calls"] == summary["planned_calls"] == clamp
+
+
+@with_budget("youtube", "7")
+def test_small_budget_buys_whole_terms_only():
+    """A term costing 3 calls is only planned when all 3 fit"""
+    with tempfile.TemporaryDirectory() as tmp:
+        planner = SourceQueryPlanner(os.path.join(tmp, "stats.json"))
+        terms, summary = planner.plan("youtube", BANK, limit=40)
+        assert len(terms) == 2 and summary["planned_calls"] == 6, f"planned {terms} for {summary['planned_calls']} calls"
+
+
+@with_budget("youtube", "12")
+def test_youtube_pages_count_toward_the_budget():
+    """Above 50 posts each order pages further, and every page is charged to the budget"""
+    with tempfile.TemporaryDirectory() as tmp:
+        planner = SourceQueryPlanner(os.path.join(tmp, "stats.json"))
+        # limit 120 -> up to 3 pages per order, 9 calls per term
+        terms, summary = planner.plan("youtube", BANK, limit=120)
+        print(f"youtube limit 120: {len(terms)} term(s), {summary['term_calls']} calls each")
+        assert summary["term_calls"] == TERM_CALLS["youtube"] * 3
+        assert len(terms) == 1 and summary["planned_calls"] == 9, f"planned {terms} for {summary['planned_calls']} calls"
+
+        report = planner.record("youtube", terms, [{"title": "graphics", "content": ""}] * 5, limit=120)
+        assert report["calls"] == 9, f"pages were not counted: {report}"
+        # Instagram, Quora and Threads make one call per term whatever the limit
+        assert term_call_cost("quora", 1000) == 1
+
+
+def test_bank_is_deduplicated_and_ranked_by_specificity():
+    """Case and '#' variants count once; untried generic words rank below specific ones"""
+    with tempfile.TemporaryDirectory() as tmp:
+        planner = SourceQueryPlanner(os.path.join(tmp, "stats.json"))
+        terms, summary = planner.plan("instagram", ["#news", "#Overclocking", "overclocking", "#OVERCLOCKING", "#gpus"],
+                                      limit=100)
+        print(f"instagram plan: {terms}")
+        assert terms == ["#Overclocking", "#gpus", "#news"], f"unexpected plan {terms}"
+        assert summary["candidates"] == 3
+        empty, summary = planner.plan("instagram", ["#", "  "], limit=100)
+        assert empty == [] and summary["planned_calls"] == 0, "an empty bank planned queries"
+
+
+def test_expected_calls_stop_at_limit():
+    """Expected cost counts only the terms needed to reach the post limit"""
+    with tempfile.TemporaryDirectory() as tmp:
+        planner = SourceQueryPlanner(os.path.join(tmp, "stats.json"))
+        _, few = planner.plan("quora", BANK, limit=1)
+        _, many = planner.plan("quora", BANK, limit=1000)
+        print(f"expected calls: limit 1 -> {few['expected_calls']:g}, limit 1000 -> {many['expected_calls']:g}")
+        assert few["expected_calls"] == 1 and few["expected_posts"] == 1
+        assert many["expected_calls"] == many["planned_calls"] == MAX_TERMS["quora"]
+
+
+def test_record_credits_mentioned_terms():
+    """Posts are credited to the terms they mention; unmatched posts are spread over the queried terms"""
+    with tempfile.TemporaryDirectory() as tmp:
+        planner = SourceQueryPlanner(os.path.join(tmp, "stats.json"))
+        posts = [
+            {"title": "Rust 2.0 released", "content": ""},
+            {"title": "Why rust", "content": "memory safety"},
+            {"title": "Rust vs Python", "content": ""},
+            {"title": "Unrelated", "content": "nothing here"},
+        ]
+        report = planner.record("threads", ["#rust", "#python", "#golang"], posts, limit=10)
+        print(f"credited: {report['terms']}")
+        assert report["calls"] == 3 and report["posts"] == 4
+        assert report["terms"] == {"#rust": 2.8, "#python": 0.8, "#golang": 0.3}, report["terms"]
+
+        # At the limit the scraper stopped early: terms after the last hit were never queried
+        report = planner.record("threads", ["#rust", "#python", "#golang"], posts[:2], limit=2)
+        assert list(report["terms"]) == ["#rust"] and report["calls"] == 1, f"uncredited terms counted: {report}"
+        assert planner.stats()["terms"]["threads|golang"]["runs"] == 1
+        assert planner.record("threads", [], posts, limit=10) == {}
+
+
+def test_statistics_reorder_plans_after_reload():
+    """A term that returned many posts leads the next plan, also from the saved file"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "stats.json")
+        planner = SourceQueryPlanner(path)
+        posts = [{"title": f"wafers report {i}", "content": ""} for i in range(40)]
+        planner.record("instagram", ["#wafers"], posts, limit=100)
+        planner.record("instagram", ["#graphics"], [], limit=100)
+
+        reloaded = SourceQueryPlanner(path)
+        terms, _ = reloaded.plan("instagram", BANK, limit=100)
+        print(f"plan after reload: {terms}")
+        assert terms[0] == "#wafers", "the productive term is not first"
+        assert "#graphics" not in terms, "a term that returned nothing kept its place"
+        # The other sources inherit the term's relative yield as their prior
+        assert reloaded.expected_yield("quora", "#wafers") > reloaded.expected_yield("quora", "#foundry")
+
+
+def main():
+    print("=" * 60)
+    print("CollectPosts - Source Query Planner Test")
+    print("=" * 60)
+
+    results = []
+    for test in [test_budget_is_clamped_to_what_the_scraper_queries, test_small_budget_buys_whole_terms_only,
+                 test_youtube_pages_count_toward_the_budget,
+                 test_bank_is_deduplicated_and_ranked_by_specificity, test_expected_calls_stop_at_limit,
+                 test_record_credits_mentioned_terms, test_statistics_reorder_plans_after_reload]:
+        try:
+            test()
+            results.append((test.__name__, True))
+        except AssertionError as e:
+            print(f"FAIL: {e}")
+            results.append((test.__name__, False))
+
+    print("=" * 60)
+    for name, ok in results:
+        print(f"{name:48} {'PASS' if ok else 'FAIL'}")
+    print("=" * 60)
+    return 0 if all(ok for _, ok in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+CollectPosts - Subreddit Metadata Test
+Names are looked up 100 at a time with /api/info?sr_name, names missing from
+that answer are confirmed one by one with /r/<name>/about (at most
+MAX_ABOUT_CHECKS per refresh; the rest stay unverified and uncached), the
+last activity of every live subreddit comes from combined r/a+b/new
+listings, and entries expire after LIVE_TTL or DEAD_TTL. Reddit is replaced
+with a scripted stand-in and the cache clock is simulated.
+"""
+
+import os
+import sys
+import tempfile
+from types import SimpleNamespace
+
+from prawcore.exceptions import Forbidden, NotFound, Redirect
+
+import subreddit_metadata
+from subreddit_metadata import (ACTIVITY_BATCH_SIZE, DEAD_TTL, INFO_BATCH_SIZE, LIVE_TTL, MAX_ABOUT_CHECKS,
+                                SubredditMetadataCache)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_700_000_000.0
+
+    def time(self) -> float:
+        return self.now
+
+
+def forbidden(reason):
+    return Forbidden(SimpleNamespace(status_code=403, headers={}, json=lambda: {"reason": reason}))
+
+
+class ScriptedReddit:
+    """
+    /api/info answers the names in `live` (display names as given), /about
+    raises or answers from `about`, /new lists `posts` (subreddit, created_utc)
+    """
+
+    def __init__(self, live=(), about=None, posts=()):
+        self.live = {name.lower(): name for name in live}
+        self.about = about or {}
+        self.posts = list(posts)
+        self.calls = []
+
+    def request(self, method, path, params=None):
+        self.calls.append((path, params))
+        if path == "api/info":
+            names = params["sr_name"].split(",")
+            children = [{"kind": "t5", "data": {"display_name": self.live[name.lower()], "subscribers": 10,
+                                                "over18": False, "subreddit_type": "public"}}
+                        for name in names if name.lower() in self.live]
+            return {"data": {"children": children}}
+        if path.endswith("/about"):
+            answer = self.about[path.split("/")[1]]
+            if isinstance(answer, Exception):
+                raise answer
+            return answer
+        if path.endswith("/new"):
+            wanted = {name.lower() for name in path.split("/")[1].split("+")}
+            return {"data": {"children": [{"kind": "t3", "data": {"subreddit": sub, "created_utc": created}}
+                                          for sub, created in self.posts if sub.lower() in wanted]}}
+        raise AssertionError(f"unexpected request {path}")
+
+    def paths(self, suffix):
+        return [path for path, _ in self.calls if path.endswith(suffix)]
+
+
+def with_cache(test):
+    """Run test(cache, clock, path) with a cache on a temporary file and a simulated clock"""
+    def run():
+        clock = FakeClock()
+        original = subreddit_metadata.time
+        subreddit_metadata.time = SimpleNamespace(time=clock.time)
+        try:
+            with tempfile.TemporaryDirectory() as tmp:
+                path = os.path.join(tmp, "subreddit_metadata.json")
+                test(SubredditMetadataCache(path), clock, path)
+        finally:
+            subreddit_metadata.time = original
+    run.__name__, run.__doc__ = test.__name__, test.__doc__
+    return run
+
+
+@with_cache
+def test_bulk_info_lookup(cache, clock, path):
+    """120 live names take two /api/info calls, no /about calls and three /new listings"""
+    names = [f"Sub{i}" for i in range(120)]
+    reddit = ScriptedReddit(live=names)
+    metadata = cache.lookup(reddit, names + ["not a name!"])
+    info_batches = [len(params["sr_name"].split(",")) for path, params in reddit.calls if path == "api/info"]
+    print(f"/api/info batches: {info_batches}, /new listings: {len(reddit.paths('/new'))}")
+    assert info_batches == [INFO_BATCH_SIZE, 20], "names were not looked up in bulk"
+    assert not reddit.paths("/about"), "live names were checked one by one"
+    assert len(reddit.paths("/new")) == -(-120 // ACTIVITY_BATCH_SIZE)
+    assert all(metadata[name]["status"] == "ok" and metadata[name]["subscribers"] == 10 for name in names)
+    assert metadata["not a name!"]["status"] == "invalid"
+
+
+@with_cache
+def test_missing_names_are_confirmed_with_about(cache, clock, path):
+    """Each /about outcome maps to a status; inconclusive answers stay unverified and uncached"""
+    reddit = ScriptedReddit(live=["python"], about={
+        "gone": NotFound(SimpleNamespace(status_code=404)),
+        "typo": Redirect(SimpleNamespace(status_code=302, headers={"location": "/subreddits/search.json"})),
+        "secret": forbidden("private"),
+        "edgy": forbidden("quarantined"),
+        "removed": forbidden("banned"),
+        "hidden": {"kind": "t5", "data": {"quarantine": True, "subscribers": 5}},
+        "flaky": RuntimeError("connection reset"),
+        "odd403": forbidden(None),
+    })
+    names = ["python", "gone", "typo", "secret", "edgy", "removed", "hidden", "flaky", "odd403"]
+    metadata = cache.lookup(reddit, names)
+    statuses = {name: metadata[name]["status"] for name in names}
+    print(f"statuses: {statuses}")
+    assert statuses == {"python": "ok", "gone": "not_found", "typo": "not_found", "secret": "private",
+                        "edgy": "quarantined", "removed": "not_found", "hidden": "quarantined",
+                        "flaky": "unverified", "odd403": "unverified"}
+    assert len(reddit.paths("/about")) == len(names) - 1
+    cached = set(SubredditMetadataCache(path)._entries)
+    assert cached == set(names) - {"flaky", "odd403"}, "unverified names were cached or dead ones lost"
+
+
+@with_cache
+def test_about_checks_are_capped(cache, clock, path):
+    """Beyond MAX_ABOUT_CHECKS missing names are left unverified without a request"""
+    missing = [f"ghost{i}" for i in range(MAX_ABOUT_CHECKS + 5)]
+    reddit = ScriptedReddit(about={name: NotFound(SimpleNamespace(status_code=404)) for name in missing})
+    metadata = cache.lookup(reddit, missing)
+    statuses = [metadata[name]["status"] for name in missing]
+    print(f"{len(reddit.paths('/about'))} /about call(s) for {len(missing)} missing names")
+    assert len(reddit.paths("/about")) == MAX_ABOUT_CHECKS
+    assert statuses == ["not_found"] * MAX_ABOUT_CHECKS + ["unverified"] * 5
+    # The unchecked names are retried on the next lookup
+    cache.lookup(reddit, missing)
+    assert len(reddit.paths("/about")) == MAX_ABOUT_CHECKS + 5
+
+
+@with_cache
+def test_activity_from_combined_listing(cache, clock, path):
+    """One r/a+b/new listing gives each live subreddit its newest post time"""
+    reddit = ScriptedReddit(live=["Python", "rust", "quiet"],
+                            posts=[("python", 100.0), ("Python", 300.0), ("rust", 200.0), ("elsewhere", 900.0)])
+    metadata = cache.lookup(reddit, ["Python", "rust", "quiet"])
+    print(f"/new paths: {reddit.paths('/new')}")
+    assert reddit.paths("/new") == ["r/Python+rust+quiet/new"]
+    assert metadata["Python"]["last_activity"] == 300.0
+    assert metadata["rust"]["last_activity"] == 200.0
+    assert metadata["quiet"]["last_activity"] is None
+
+
+@with_cache
+def test_entries_expire_after_their_ttl(cache, clock, path):
+    """Live entries are served for LIVE_TTL, dead ones for DEAD_TTL, also from disk"""
+    reddit = ScriptedReddit(live=["python"], about={"gone": NotFound(SimpleNamespace(status_code=404))})
+    cache.lookup(reddit, ["python", "gone"])
+    calls = len(reddit.calls)
+
+    clock.now += LIVE_TTL - 1
+    reloaded = SubredditMetadataCache(path)
+    assert reloaded.lookup(reddit, ["python", "gone"])["gone"]["status"] == "not_found"
+    assert len(reddit.calls) == calls, "fresh entries were fetched again"
+    assert reloaded.stats()["hit_rate"] == 1.0
+
+    clock.now += 2
+    reloaded.lookup(reddit, ["python", "gone"])
+    refreshed = [params["sr_name"] for path, params in reddit.calls[calls:] if path == "api/info"]
+    print(f"after LIVE_TTL: refreshed {refreshed}")
+    assert refreshed == ["python"], "only the live entry should have expired"
+
+    clock.now += DEAD_TTL
+    calls = len(reddit.calls)
+    reloaded.lookup(reddit, ["gone"])
+    assert reddit.paths("/about")[-1] == "r/gone/about" and len(reddit.calls) > calls, "a dead entry outlived DEAD_TTL"
+
+
+def main():
+    print("=" * 60)
+    print("CollectPosts - Subreddit Metadata Test")
+    print("=" * 60)
+
+    results = []
+    for test in [test_bulk_info_lookup, test_missing_names_are_confirmed_with_about, test_about_checks_are_capped,
+                 test_activity_from_combined_listing, test_entries_expire_after_their_ttl]:
+        try:
+            test()
+            results.append((test.__name__, True))
+        except AssertionError as e:
+            print(f"FAIL: {e}")
+            results.append((test.__name__, False))
+
+    print("=" * 60)
+    for name, ok in results:
+        print(f"{name:48} {'PASS' if ok else 'FAIL'}")
+    print("=" * 60)
+    return 0 if all(ok for _, ok in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
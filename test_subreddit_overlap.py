@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+CollectPosts - Subreddit Overlap Test
+Vectorized overlap multipliers must match the plain per-subreddit ratio
+(share among the subreddit's users / global share), ignore globally rare
+subreddits, and a repeated overlapper call must be served from the on-disk
+caches without requests. subredditstats.com is replaced with a counting
+stand-in, so no network access is needed.
+"""
+
+import os
+import sys
+import tempfile
+
+import subreddit_overlap
+from subreddit_overlap import MIN_GLOBAL_SHARE, _histogram_arrays, get_overlap_scores, score_overlaps
+
+GLOBAL_HIST = {"a1": 50000, "b2": 30000, "c3": 15000, "d4": 4999, "e5": 1}
+NAMES = {"a1": "news", "b2": "politics", "c3": "technology", "d4": "python", "e5": "tinysub"}
+SUBREDDIT_HIST = {"a1": 100, "b2": 300, "c3": 450, "d4": 150, "e5": 50, "zz": 10}
+
+
+def reference_scores(subreddit_hist, global_hist):
+    """The original dict loop: multiplier = local share / global share"""
+    local_total, global_total = sum(subreddit_hist.values()), sum(global_hist.values())
+    scores = {}
+    for sid, count in subreddit_hist.items():
+        global_share = global_hist.get(sid, 0) / global_total
+        if global_share >= MIN_GLOBAL_SHARE:
+            scores[sid] = (count / local_total) / global_share
+    return sorted(scores.items(), key=lambda item: -item[1])
+
+
+class FakeResponse:
+    def __init__(self, data):
+        self.data = data
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.data
+
+
+class CountingSession:
+    """subredditstats endpoints backed by the fixtures above"""
+
+    def __init__(self):
+        self.requests = []
+
+    def get(self, url, params=None, timeout=None):
+        self.requests.append(url.rsplit("/", 1)[-1])
+        return FakeResponse(GLOBAL_HIST if url.endswith("globalSubredditsIdHist") else SUBREDDIT_HIST)
+
+    def post(self, url, json=None, headers=None, timeout=None):
+        self.requests.append(url.rsplit("/", 1)[-1])
+        return FakeResponse([NAMES.get(sid) for sid in json["subredditIds"]])
+
+
+def test_vectorized_scores_match_reference():
+    """searchsorted scoring gives the dict loop's multipliers and order"""
+    ids, probs = _histogram_arrays(GLOBAL_HIST)
+    scored = score_overlaps(SUBREDDIT_HIST, ids, probs)
+    expected = reference_scores(SUBREDDIT_HIST, GLOBAL_HIST)
+    print(f"scores: {[(sid, round(score, 3)) for sid, score in scored]}")
+    assert [sid for sid, _ in scored] == [sid for sid, _ in expected], "order differs from the reference"
+    for (_, score), (_, reference) in zip(scored, expected):
+        assert abs(score - reference) < 1e-9, f"multiplier {score} != {reference}"
+    assert "e5" not in dict(scored) and "zz" not in dict(scored), "rare or unknown subreddits were scored"
+    assert score_overlaps({}, ids, probs) == []
+
+
+def test_repeat_call_is_served_from_cache():
+    """A second overlapper call for the same subreddit makes no requests"""
+    session = CountingSession()
+    original = (subreddit_overlap.CACHE_DIR, subreddit_overlap._session, subreddit_overlap._global,
+                subreddit_overlap._names)
+    with tempfile.TemporaryDirectory() as tmp:
+        subreddit_overlap.CACHE_DIR = os.path.join(tmp, "overlap")
+        subreddit_overlap._session = lambda base_subreddit: session
+        subreddit_overlap._global = subreddit_overlap._names = None
+        try:
+            first = get_overlap_scores("python", top_n=2)
+            cold_requests = list(session.requests)
+            # Drop the in-memory copies so the second call must read the disk cache
+            subreddit_overlap._global = subreddit_overlap._names = None
+            second = get_overlap_scores("python", top_n=2)
+        finally:
+            (subreddit_overlap.CACHE_DIR, subreddit_overlap._session, subreddit_overlap._global,
+             subreddit_overlap._names) = original
+    print(f"overlaps: {first}; cold requests {cold_requests}, warm requests {session.requests[len(cold_requests):]}")
+    expected = [(NAMES[sid], round(score, 3)) for sid, score in reference_scores(SUBREDDIT_HIST, GLOBAL_HIST)[:2]]
+    assert first == second == expected, f"overlaps {first} != {expected}"
+    assert cold_requests == ["globalSubredditsIdHist", "subredditNameToSubredditsHist",
+                             "specificSubredditIdsToNames"], f"unexpected cold requests {cold_requests}"
+    assert len(session.requests) == len(cold_requests), "a cached overlap lookup went to the network"
+
+
+def main():
+    print("=" * 60)
+    print("CollectPosts - Subreddit Overlap Test")
+    print("=" * 60)
+
+    results = []
+    for test in [test_vectorized_scores_match_reference, test_repeat_call_is_served_from_cache]:
+        try:
+            test()
+            results.append((test.__name__, True))
+        except AssertionError as e:
+            print(f"FAIL: {e}")
+            results.append((test.__name__, False))
+
+    print("=" * 60)
+    for name, ok in results:
+        print(f"{name:48} {'PASS' if ok else 'FAIL'}")
+    print("=" * 60)
+    return 0 if all(ok for _, ok in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())